@@ -1,31 +1,51 @@
-from django.contrib import admin
-
-# Register your models here.
-from django.contrib import admin
-from .models import Board, Column, Card, CardLog
-
-
-
-@admin.register(Board)
-class BoardAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "image", "background_image", "background_url")
-
-
-@admin.register(Column)
-class ColumnAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "board", "position", "theme")
-    list_filter = ("board", "theme")
-    search_fields = ("name",)
-
-
-@admin.register(Card)
-class CardAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "column", "position", "is_deleted")
-    list_filter = ("column", "is_deleted")
-    search_fields = ("title", "tags")
-
-
-@admin.register(CardLog)
-class CardLogAdmin(admin.ModelAdmin):
-    list_display = ("id", "card", "created_at")
-    search_fields = ("content",)
+from django.contrib import admin
+
+# Register your models here.
+from django.contrib import admin
+from django.utils import timezone
+from .models import Board, Column, Card, CardLog, NotificationOutbox
+
+
+
+@admin.register(Board)
+class BoardAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "image", "background_image", "background_url")
+
+
+@admin.register(Column)
+class ColumnAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "board", "position", "theme")
+    list_filter = ("board", "theme")
+    search_fields = ("name",)
+
+
+@admin.register(Card)
+class CardAdmin(admin.ModelAdmin):
+    list_display = ("id", "title", "column", "position", "is_deleted")
+    list_filter = ("column", "is_deleted")
+    search_fields = ("title", "tags")
+
+
+@admin.register(CardLog)
+class CardLogAdmin(admin.ModelAdmin):
+    list_display = ("id", "card", "created_at")
+    search_fields = ("content",)
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "channel", "kind", "recipient", "status", "attempts", "available_at", "sent_at")
+    list_filter = ("status", "channel", "kind")
+    search_fields = ("recipient", "subject", "last_error")
+    actions = ["requeue"]
+
+    @admin.action(description="Reenfileirar (zera tentativas)")
+    def requeue(self, request, queryset):
+        n = queryset.exclude(status=NotificationOutbox.Status.SENT).update(
+            status=NotificationOutbox.Status.PENDING,
+            attempts=0,
+            available_at=timezone.now(),
+            locked_at=None,
+            locked_by="",
+        )
+        self.message_user(request, f"{n} item(ns) reenfileirado(s).")
@@ -0,0 +1,101 @@
+# boards/management/commands/backfill_cardlog_actor.py
+
+from __future__ import annotations
+
+import html
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.html import strip_tags
+
+from boards.models import CardLog, UserProfile
+
+# os logs gerados pelo sistema começam com "<p><strong>{_actor_label}</strong> ..."
+# (ou <strong>{_actor_html}</strong>, com o <a class='user-link'> dentro).
+# Só o prefixo conta: <strong> no meio do texto é menção/ênfase, não o autor.
+_RE_ACTOR = re.compile(r"^\s*<p>\s*<strong>(.*?)</strong>", flags=re.IGNORECASE | re.DOTALL)
+
+
+def _label_index() -> dict[str, int | None]:
+    """
+    label (minúsculo) -> user_id, com as mesmas formas do _actor_label:
+    "@handle", display_name, username, email. Label de mais de um usuário
+    fica None (ambíguo: não preenche).
+    """
+    index: dict[str, int | None] = {}
+
+    def add(label, user_id):
+        key = (label or "").strip().lower()
+        if not key:
+            return
+        if key in index and index[key] != user_id:
+            index[key] = None
+        else:
+            index[key] = user_id
+
+    for user_id, handle, display_name in UserProfile.objects.values_list("user_id", "handle", "display_name"):
+        if handle:
+            add("@" + handle, user_id)
+        add(display_name, user_id)
+
+    User = get_user_model()
+    for user_id, username, email in User.objects.values_list("id", User.USERNAME_FIELD, "email"):
+        add(username, user_id)
+        add(email, user_id)
+
+    return index
+
+
+class Command(BaseCommand):
+    help = (
+        "Preenche CardLog.actor dos logs antigos (sem autor) lendo o nome em "
+        "<strong> do início do HTML gravado. Só grava quando o nome aponta p/ um único usuário."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Só conta, não grava.")
+
+    def handle(self, *args, **opts):
+        batch_size = max(1, int(opts["batch_size"]))
+        dry_run = opts["dry_run"]
+        index = _label_index()
+
+        scanned = 0
+        filled = 0
+        last_id = 0
+        while True:
+            # keyset por id: cada lote é uma query curta, sem OFFSET
+            batch = list(
+                CardLog.objects
+                .filter(actor__isnull=True, id__gt=last_id)
+                .order_by("id")
+                .only("id", "content")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            scanned += len(batch)
+
+            changed = []
+            for log in batch:
+                m = _RE_ACTOR.match(log.content or "")
+                if not m:
+                    continue
+                label = html.unescape(strip_tags(m.group(1)))
+                user_id = index.get(label.strip().lower())
+                if user_id:
+                    log.actor_id = user_id
+                    changed.append(log)
+
+            if changed and not dry_run:
+                with transaction.atomic():
+                    CardLog.objects.bulk_update(changed, ["actor"])
+            filled += len(changed)
+
+        verb = "seriam preenchidos" if dry_run else "preenchidos"
+        self.stdout.write(self.style.SUCCESS(f"OK: {filled} de {scanned} log(s) sem autor {verb}."))
+        if filled and not dry_run:
+            self.stdout.write("Rode também: python manage.py rebuild_unread_counters")
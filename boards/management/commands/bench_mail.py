@@ -0,0 +1,80 @@
+# boards/management/commands/bench_mail.py
+
+from __future__ import annotations
+
+import io
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from boards.services.mail import build_message, send_messages_batched
+
+BACKENDS = {
+    "locmem": "django.core.mail.backends.locmem.EmailBackend",
+    "console": "django.core.mail.backends.console.EmailBackend",
+    # usa EMAIL_HOST/PORT do settings — aponte para um sink local, não o SMTP real
+    "smtp": "django.core.mail.backends.smtp.EmailBackend",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de envio de e-mail: 1 conexão por mensagem (como send_mail) "
+        "vs. lote (boards/services/mail.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=500)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--backend",
+            action="append",
+            choices=sorted(BACKENDS),
+            help="Pode repetir. Default: locmem e console.",
+        )
+
+    def handle(self, *args, **opts):
+        count = max(1, opts["count"])
+        batch_size = max(1, opts["batch_size"])
+
+        for name in opts["backend"] or ["locmem", "console"]:
+            backend = BACKENDS[name]
+            # console escreve num buffer (não inunda o terminal)
+            kwargs = {"stream": io.StringIO()} if name == "console" else {}
+
+            messages = self._messages(count)
+            started = time.perf_counter()
+            for msg in messages:
+                get_connection(backend, fail_silently=False, **kwargs).send_messages([msg])
+            per_message = time.perf_counter() - started
+
+            messages = self._messages(count)
+            started = time.perf_counter()
+            errors = send_messages_batched(
+                messages,
+                batch_size=batch_size,
+                throttle_seconds=0,
+                backend=backend,
+                connection_kwargs=kwargs,
+                rate_limit=False,
+            )
+            batched = time.perf_counter() - started
+            failed = sum(1 for e in errors if e is not None)
+
+            self.stdout.write(
+                f"{name}: {count} msgs | por mensagem {per_message:.3f}s ({count / per_message:.0f} msg/s) | "
+                f"lote({batch_size}) {batched:.3f}s ({count / batched:.0f} msg/s) | falhas={failed}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("OK"))
+
+    def _messages(self, count):
+        return [
+            build_message(
+                to=f"bench{i}@example.invalid",
+                subject=f"[bench] mensagem {i}",
+                body="Benchmark do envio em lote.\n",
+            )
+            for i in range(count)
+        ]
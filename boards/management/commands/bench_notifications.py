@@ -0,0 +1,222 @@
+# boards/management/commands/bench_notifications.py
+
+from __future__ import annotations
+
+import logging
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from boards.models import Board, BoardMembership, Card, CardFollow, Column, NotificationOutbox
+from boards.services.fake_servers import FakePressTicketServer, FakeSMTPServer
+from boards.services.outbox import process_batch
+from boards.views.helpers import process_mentions_and_notify
+from tracktime.models import ActivityType, Project
+from tracktime.services.pressticket import PressTicketMetrics, get_client
+
+PREFIX = "bench-notify"
+
+# logs INFO por mensagem distorcem a medição
+QUIET_LOGGERS = ("tracktime.services.pressticket", "boards.services.notifications", "boards.services.outbox")
+
+
+def _p95(values):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark das notificações contra PressTicket/SMTP falsos locais: "
+        "notify_cards_due, menções e start/stop do tracktime, drenando a outbox. "
+        "Roda num banco de teste descartável (como o manage.py test), nunca no banco real."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--cards", type=int, default=20)
+        parser.add_argument("--mentions-per-card", type=int, default=10)
+        parser.add_argument("--timers", type=int, default=30, help="Usuários que fazem start/stop.")
+        parser.add_argument("--latency-ms", type=float, default=50, help="Latência do PressTicket falso.")
+        parser.add_argument("--jitter-ms", type=float, default=20)
+        parser.add_argument("--failure-rate", type=float, default=0.0, help="PressTicket falso (0..1).")
+        parser.add_argument("--smtp-latency-ms", type=float, default=10)
+        parser.add_argument("--smtp-failure-rate", type=float, default=0.0)
+        parser.add_argument("--batch-size", type=int, default=100, help="Itens por process_batch.")
+        parser.add_argument("--rate-limit", action="store_true", help="Mantém OUTBOUND_RATE_LIMITS (default: desliga).")
+
+    def handle(self, *args, **opts):
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+        pressticket = FakePressTicketServer(
+            latency_ms=opts["latency_ms"], jitter_ms=opts["jitter_ms"], failure_rate=opts["failure_rate"]
+        )
+        smtp = FakeSMTPServer(latency_ms=opts["smtp_latency_ms"], failure_rate=opts["smtp_failure_rate"])
+
+        with pressticket, smtp:
+            overrides = {
+                "ALLOWED_HOSTS": ["*"],
+                "NOTIFICATION_OUTBOX_ENABLED": True,
+                "PRESSTICKET_BASE_URL": pressticket.url,
+                "PRESSTICKET_TOKEN": "bench",
+                "PRESSTICKET_USER_ID": 1,
+                "PRESSTICKET_QUEUE_ID": 1,
+                "PRESSTICKET_WHATSAPP_ID": 1,
+                "EMAIL_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+                "EMAIL_HOST": smtp.host,
+                "EMAIL_PORT": smtp.port,
+                "EMAIL_HOST_USER": "",
+                "EMAIL_HOST_PASSWORD": "",
+                "EMAIL_USE_TLS": False,
+                "EMAIL_USE_SSL": False,
+                # buckets/snapshots do bench não vão p/ o Redis real
+                "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": PREFIX}},
+            }
+            if not opts["rate_limit"]:
+                overrides["OUTBOUND_RATE_LIMITS"] = {}
+
+            # banco de teste: notify_cards_due e a drenagem da outbox só
+            # enxergam os dados do bench; some inteiro no fim
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                with override_settings(**overrides):
+                    data = self._setup(opts)
+                    self._phase("notify_cards_due", opts, lambda: call_command("notify_cards_due", kind="due", stdout=self.stdout))
+                    self._phase("mentions", opts, lambda: self._mentions(data, opts))
+                    self._phase("tracktime start/stop", opts, lambda: self._tracktime(data, opts))
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+            self.stdout.write(
+                f"fake pressticket: recebidas={pressticket.counters.received} falhas={pressticket.counters.failed} | "
+                f"fake smtp: recebidas={smtp.counters.received} falhas={smtp.counters.failed}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("OK"))
+
+    # ------------------------------------------------------------
+    # dados
+    # ------------------------------------------------------------
+    def _setup(self, opts):
+        User = get_user_model()
+        n_users = max(1, opts["users"])
+        today = timezone.localdate()
+
+        with transaction.atomic():
+            users = []
+            for i in range(n_users):
+                u = User.objects.create_user(
+                    username=f"{PREFIX}-{i}",
+                    email=f"{PREFIX}-{i}@example.invalid",
+                    password=None,
+                )
+                prof = u.profile
+                prof.telefone = f"2199{i:07d}"
+                prof.notify_whatsapp = True
+                prof.notify_email = True
+                prof.notify_digest = False
+                prof.save(update_fields=["telefone", "notify_whatsapp", "notify_email", "notify_digest"])
+                users.append(u)
+
+            board = Board.objects.create(name=f"{PREFIX} board", created_by=users[0])
+            column = Column.objects.create(board=board, name="Bench", position=0)
+            BoardMembership.objects.bulk_create(
+                [BoardMembership(board=board, user=u, role=BoardMembership.Role.EDITOR) for u in users]
+            )
+            cards = [
+                Card.objects.create(
+                    column=column,
+                    title=f"Card bench {i}",
+                    position=i,
+                    due_date=today,
+                    due_notify=True,
+                    created_by=users[0],
+                )
+                for i in range(max(1, opts["cards"]))
+            ]
+            CardFollow.objects.bulk_create([CardFollow(card=c, user=u) for c in cards for u in users])
+
+            projects = {}
+            activities = {}
+            for u in users[: max(0, opts["timers"])]:
+                projects[u.id] = Project.objects.create(name="Bench", created_by=u)
+                activities[u.id] = ActivityType.objects.create(name="Bench", created_by=u)
+
+        self.stdout.write(f"dados: {len(users)} usuários, {len(cards)} cards no board {board.id}")
+        return {"users": users, "board": board, "cards": cards, "projects": projects, "activities": activities}
+
+    # ------------------------------------------------------------
+    # cenários
+    # ------------------------------------------------------------
+    def _mentions(self, data, opts):
+        rf = RequestFactory()
+        users = data["users"]
+        per_card = max(1, min(opts["mentions_per_card"], len(users) - 1))
+        for i, card in enumerate(data["cards"]):
+            actor = users[i % len(users)]
+            mentioned = [u for u in users if u.id != actor.id][:per_card]
+            text = "".join(f'<span class="mention" data-id="{u.id}">@{u.username}</span> ' for u in mentioned)
+            request = rf.post("/")
+            request.user = actor
+            with transaction.atomic():
+                process_mentions_and_notify(request=request, board=data["board"], card=card, source="activity", raw_text=text)
+
+    def _tracktime(self, data, opts):
+        cards = data["cards"]
+        for i, user in enumerate(data["users"][: max(0, opts["timers"])]):
+            card = cards[i % len(cards)]
+            client = Client()
+            client.force_login(user)
+            client.post(
+                reverse("tracktime:card_start", kwargs={"card_id": card.id}),
+                {"project": data["projects"][user.id].id, "activity": data["activities"][user.id].id},
+            )
+            client.post(reverse("tracktime:card_stop", kwargs={"card_id": card.id}))
+
+    # ------------------------------------------------------------
+    # medição: tempo p/ enfileirar + tempo p/ drenar a outbox
+    # ------------------------------------------------------------
+    def _phase(self, name, opts, run):
+        floor = NotificationOutbox.objects.aggregate(m=Max("id"))["m"] or 0
+        client = get_client()
+        client.metrics = PressTicketMetrics()
+
+        started = time.perf_counter()
+        run()
+        enqueue_s = time.perf_counter() - started
+
+        totals = {"sent": 0, "retry": 0, "dead": 0, "deferred": 0}
+        started = time.perf_counter()
+        while True:
+            stats = process_batch(max(1, opts["batch_size"]))
+            for k, v in stats.items():
+                totals[k] += v
+            if not sum(stats.values()):
+                break
+        drain_s = time.perf_counter() - started
+
+        delivery_ms = [
+            (sent_at - created_at).total_seconds() * 1000
+            for created_at, sent_at in NotificationOutbox.objects
+            .filter(id__gt=floor, status=NotificationOutbox.Status.SENT)
+            .values_list("created_at", "sent_at")
+        ]
+        handled = totals["sent"] + totals["retry"] + totals["dead"]
+        m = client.metrics.snapshot()
+
+        self.stdout.write(
+            f"[{name}] enfileirar {enqueue_s:.2f}s | drenar {drain_s:.2f}s "
+            f"({handled / drain_s if drain_s else 0:.0f} msg/s) | "
+            f"sent={totals['sent']} retry={totals['retry']} dead={totals['dead']} deferred={totals['deferred']} | "
+            f"entrega p95={_p95(delivery_ms):.0f}ms | whatsapp http p50={m['p50_ms']}ms p95={m['p95_ms']}ms"
+        )
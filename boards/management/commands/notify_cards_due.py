@@ -4,17 +4,21 @@ from __future__ import annotations
 
 import datetime
 import logging
+import uuid
+from collections import defaultdict
 
+from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
-from django.db.models import Q
+from django.db import transaction
 from django.utils import timezone
 
-from boards.models import Card, CardNotificationLog
+from boards.models import BoardMembership, Card, CardNotificationLog, NotificationDigestItem
+from boards.services.digest import wants_digest
 from boards.services.notifications import (
-    get_board_recipients_for_card,
+    allowed_user_ids_by_card,
     build_card_snapshot,
     format_card_message,
-    notify_users_for_card,
+    notify_user_for_card,
 )
 
 logger = logging.getLogger(__name__)
@@ -49,45 +53,111 @@ class Command(BaseCommand):
             title = "⛔ Vencimento do Card (hoje)"
 
         # Só cards vivos e boards vivos
-        qs = qs.filter(
-            is_deleted=False,
-            is_archived=False,
-            column__is_deleted=False,
-            column__board__is_deleted=False,
-            column__board__is_archived=False,
-        ).select_related("column", "column__board")
-
-        sent = 0
-        skipped = 0
+        cards = list(
+            qs.filter(
+                is_deleted=False,
+                is_archived=False,
+                column__is_deleted=False,
+                column__board__is_deleted=False,
+                column__board__is_archived=False,
+            ).select_related("column", "column__board")
+        )
+        if not cards:
+            self.stdout.write(self.style.SUCCESS(f"done kind={kind} sent=0 skipped=0"))
+            return
+
+        card_ids = [c.id for c in cards]
+
+        # ------------------------------------------------------------
+        # pré-carrega tudo do lote (poucas queries, não por card/usuário)
+        # ------------------------------------------------------------
+        members_by_board = defaultdict(list)
+        for board_id, user_id in BoardMembership.objects.filter(
+            board_id__in={c.column.board_id for c in cards}
+        ).values_list("board_id", "user_id"):
+            members_by_board[board_id].append(user_id)
+
+        user_ids = {uid for ids in members_by_board.values() for uid in ids}
+        users = {
+            u.id: u
+            for u in get_user_model().objects.filter(id__in=user_ids).select_related("profile")
+        }
+
+        allowed = allowed_user_ids_by_card(cards)
+
+        # idempotência por usuário/card/kind/dia (pré-filtro; quem decide é o insert)
+        already = set(
+            CardNotificationLog.objects
+            .filter(kind=kind, run_date=today, card_id__in=card_ids)
+            .values_list("card_id", "user_id")
+        )
 
-        for card in qs.iterator():
-            recipients = get_board_recipients_for_card(card=card)
-            snap = build_card_snapshot(card=card)
+        pending = []
+        skipped = 0
+        for card in cards:
+            for user_id in members_by_board.get(card.column.board_id, []):
+                if user_id not in users:
+                    continue
+                if (card.id, user_id) in already:
+                    skipped += 1
+                    continue
+                pending.append((card, user_id))
+
+        # ------------------------------------------------------------
+        # grava o lote de logs + enfileira os envios numa transação só
+        # (a outbox/run_outbox envia em paralelo)
+        # ------------------------------------------------------------
+        run_id = uuid.uuid4().hex
+        with transaction.atomic():
+            CardNotificationLog.objects.bulk_create(
+                [
+                    CardNotificationLog(card=card, user_id=user_id, kind=kind, run_date=today, run_id=run_id)
+                    for card, user_id in pending
+                ],
+                ignore_conflicts=True,
+                batch_size=500,
+            )
 
-            msg = format_card_message(
-                title_prefix=title,
-                snap=snap,
+            # ignore_conflicts não diz o que entrou: outra execução em paralelo
+            # (cron sobreposto, --loop + manual) pode ter gravado o par depois
+            # do pré-filtro. Só notifica as linhas gravadas por esta execução.
+            created = set(
+                CardNotificationLog.objects
+                .filter(run_id=run_id, kind=kind, run_date=today, card_id__in=card_ids)
+                .values_list("card_id", "user_id")
             )
+            skipped += len(pending) - len(created)
+            pending = [(card, user_id) for card, user_id in pending if (card.id, user_id) in created]
 
-            for u in recipients:
-                # idempotência por usuário/card/kind/dia
-                obj, created = CardNotificationLog.objects.get_or_create(
-                    card=card,
-                    user=u,
-                    kind=kind,
-                    run_date=today,
-                )
-                if not created:
-                    skipped += 1
+            messages = {}
+            digest_items = []
+            for card, user_id in pending:
+                if user_id not in allowed.get(card.id, ()):
                     continue
 
-                notify_users_for_card(
-                    card=card,
-                    recipients=[u],
-                    subject=f"{title}: {snap.title}",
-                    message=msg,
-                    include_link_as_second_whatsapp_message=True,
-                )
-                sent += 1
+                user = users[user_id]
+                if wants_digest(user):
+                    # vai no resumo diário (send_daily_digest), não manda agora
+                    digest_items.append(NotificationDigestItem(user=user, card=card, kind=kind))
+                    continue
 
-        self.stdout.write(self.style.SUCCESS(f"done kind={kind} sent={sent} skipped={skipped}"))
+                if card.id not in messages:
+                    snap = build_card_snapshot(card=card)
+                    messages[card.id] = (snap, format_card_message(title_prefix=title, snap=snap))
+                snap, msg = messages[card.id]
+
+                try:
+                    notify_user_for_card(
+                        card=card,
+                        user=user,
+                        snap=snap,
+                        subject=f"{title}: {snap.title}",
+                        message=msg,
+                        include_link_as_second_whatsapp_message=True,
+                    )
+                except Exception:
+                    logger.exception("notify_cards_due: falha user_id=%s card_id=%s", user_id, card.id)
+
+            NotificationDigestItem.objects.bulk_create(digest_items, batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f"done kind={kind} sent={len(pending)} skipped={skipped}"))
@@ -0,0 +1,24 @@
+# boards/management/commands/prune_board_changes.py
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from boards.services.board_version import prune_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga o journal de mudanças dos boards (BoardChange) mais velho que "
+        "BOARD_CHANGES_RETENTION_HOURS. O tracktime_tick já roda isso 1x/hora."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=None, help="Retenção (h); default: settings.")
+
+    def handle(self, *args, **opts):
+        retention = timedelta(hours=opts["hours"]) if opts["hours"] is not None else None
+        deleted = prune_changes(retention=retention)
+        self.stdout.write(self.style.SUCCESS(f"OK: {deleted} entrada(s) do journal apagada(s)."))
@@ -0,0 +1,37 @@
+# boards/management/commands/rebalance_card_positions.py
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from boards.models import Column
+from boards.services.card_positions import rebalance_column
+
+
+class Command(BaseCommand):
+    help = (
+        "Reespaça as posições dos cards (GAP entre vizinhos). "
+        "O move_card já faz isso sozinho quando falta espaço; rode fora do horário "
+        "p/ converter colunas antigas (0,1,2...) de uma vez."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board", type=int, default=None, help="Só as colunas deste board.")
+
+    def handle(self, *args, **opts):
+        qs = Column.objects.all().order_by("id")
+        if opts["board"]:
+            qs = qs.filter(board_id=opts["board"])
+
+        columns = 0
+        cards = 0
+        for column in qs.iterator():
+            # 1 transação curta por coluna (não segura o lock de escrita do SQLite)
+            with transaction.atomic():
+                changed = rebalance_column(column)
+            if changed:
+                columns += 1
+                cards += changed
+
+        self.stdout.write(self.style.SUCCESS(f"OK: {cards} card(s) reposicionado(s) em {columns} coluna(s)."))
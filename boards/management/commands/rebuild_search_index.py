@@ -0,0 +1,20 @@
+# boards/management/commands/rebuild_search_index.py
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from boards.services import search_index
+
+
+class Command(BaseCommand):
+    help = "Recria os índices FTS5 da busca (1 documento por card) e das @menções (1 por usuário)."
+
+    def handle(self, *args, **opts):
+        if not search_index.create_fts_table(connection):
+            self.stdout.write(self.style.WARNING("FTS5 indisponível neste banco; busca segue em icontains."))
+            return
+
+        total = search_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"OK: {total} card(s) indexado(s)."))
@@ -0,0 +1,31 @@
+# boards/management/commands/rebuild_unread_counters.py
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from boards.models import Board
+from boards.services.unread import rebuild_board_counters
+
+
+class Command(BaseCommand):
+    help = "Recalcula UnreadCounter (não lidos por usuário/card) a partir de CardLog/CardSeen/BoardActivityReadState."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board", type=int, default=None, help="Só este board.")
+
+    def handle(self, *args, **opts):
+        qs = Board.all_objects.filter(is_deleted=False).order_by("id")
+        if opts["board"]:
+            qs = qs.filter(id=opts["board"])
+
+        boards = 0
+        rows = 0
+        for board in qs.iterator():
+            # 1 transação por board (não segura o lock de escrita do SQLite)
+            with transaction.atomic():
+                rows += rebuild_board_counters(board)
+            boards += 1
+
+        self.stdout.write(self.style.SUCCESS(f"OK: {rows} contador(es) em {boards} board(s)."))
@@ -0,0 +1,60 @@
+# boards/management/commands/run_fake_notify_servers.py
+
+from __future__ import annotations
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from boards.services.fake_servers import FakePressTicketServer, FakeSMTPServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Sobe PressTicket e SMTP falsos (teste de carga manual: aponte "
+        "PRESSTICKET_BASE_URL/EMAIL_HOST para eles e rode o app + run_outbox)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--pressticket-port", type=int, default=8025)
+        parser.add_argument("--smtp-port", type=int, default=2525)
+        parser.add_argument("--latency-ms", type=float, default=50)
+        parser.add_argument("--jitter-ms", type=float, default=20)
+        parser.add_argument("--failure-rate", type=float, default=0.0)
+        parser.add_argument("--smtp-latency-ms", type=float, default=10)
+        parser.add_argument("--smtp-failure-rate", type=float, default=0.0)
+
+    def handle(self, *args, **opts):
+        pressticket = FakePressTicketServer(
+            host=opts["host"],
+            port=opts["pressticket_port"],
+            latency_ms=opts["latency_ms"],
+            jitter_ms=opts["jitter_ms"],
+            failure_rate=opts["failure_rate"],
+        )
+        smtp = FakeSMTPServer(
+            host=opts["host"],
+            port=opts["smtp_port"],
+            latency_ms=opts["smtp_latency_ms"],
+            failure_rate=opts["smtp_failure_rate"],
+        )
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+        with pressticket, smtp:
+            self.stdout.write(
+                f"PRESSTICKET_BASE_URL={pressticket.url} PRESSTICKET_TOKEN=fake "
+                f"PRESSTICKET_USER_ID=1 PRESSTICKET_QUEUE_ID=1 PRESSTICKET_WHATSAPP_ID=1\n"
+                f"EMAIL_HOST={smtp.host} EMAIL_PORT={smtp.port} EMAIL_USE_TLS=0 EMAIL_USE_SSL=0"
+            )
+            while not stop.wait(10):
+                self.stdout.write(
+                    f"pressticket recebidas={pressticket.counters.received} falhas={pressticket.counters.failed} | "
+                    f"smtp recebidas={smtp.counters.received} falhas={smtp.counters.failed}"
+                )
+
+        self.stdout.write(self.style.SUCCESS("parado"))
@@ -0,0 +1,64 @@
+# boards/management/commands/run_outbox.py
+
+from __future__ import annotations
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from boards.services.outbox import process_batch
+from boards.services.rate_limit import stats as rate_limit_stats
+from tracktime.services.pressticket import get_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker da outbox de notificações (WhatsApp/e-mail): envia o que as views "
+        "enfileiraram, com retry/backoff e dead-letter. Rode como serviço separado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drena o que estiver vencido e sai.")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--idle-sleep", type=float, default=2.0, help="Espera (s) quando a fila está vazia.")
+
+    def handle(self, *args, **opts):
+        batch_size = max(1, int(opts["batch_size"]))
+        idle_sleep = max(0.1, float(opts["idle_sleep"]))
+
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        totals = {"sent": 0, "retry": 0, "dead": 0, "deferred": 0}
+        while not self._stop:
+            close_old_connections()
+            stats = process_batch(batch_size)
+            for k, v in stats.items():
+                totals[k] += v
+
+            handled = sum(stats.values())
+            if opts["once"]:
+                if handled < batch_size:
+                    break
+                continue
+            if not handled:
+                time.sleep(idle_sleep)
+
+        m = get_client().metrics.snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"run_outbox: sent={totals['sent']} retry={totals['retry']} dead={totals['dead']} "
+            f"deferred={totals['deferred']} "
+            f"whatsapp_p50={m['p50_ms']}ms whatsapp_p95={m['p95_ms']}ms"
+        ))
+        # contadores do limitador (compartilhados entre processos via cache)
+        for channel, c in rate_limit_stats().items():
+            self.stdout.write(
+                f"rate_limit {channel}: sent={c['sent']} delayed={c['delayed']} dropped={c['dropped']}"
+            )
+
+    def _request_stop(self, *_):
+        # termina o lote atual e sai (docker stop / Ctrl+C)
+        self._stop = True
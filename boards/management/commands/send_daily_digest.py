@@ -0,0 +1,18 @@
+# boards/management/commands/send_daily_digest.py
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from boards.services.digest import send_pending_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Envia o resumo diário (avisos/vencimentos/menções) de quem marcou "
+        "notify_digest no perfil - rodar depois dos notify_cards_due das 08:00."
+    )
+
+    def handle(self, *args, **opts):
+        users, items = send_pending_digests()
+        self.stdout.write(self.style.SUCCESS(f"send_daily_digest: users={users} items={items}"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0047_column_version_card_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('entity', models.CharField(choices=[('board', 'Board'), ('column', 'Coluna'), ('card', 'Card')], max_length=10)),
+                ('entity_id', models.PositiveIntegerField()),
+                ('op', models.CharField(default='update', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='boards.board')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board', 'version'], name='boards_boar_board_i_1fce99_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Índice FTS5 da busca (boards/services/search_index.py)
+#
+# Tudo congelado aqui (nome/colunas da tabela, montagem do documento) e lido
+# pelos modelos históricos: mudanças futuras em Card/CardLog ou no serviço
+# não quebram o migrate de um banco novo.
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+FTS_TABLE = "boards_card_fts"
+FTS_COLUMNS = ("title", "description", "tags", "attachments", "checklists", "activity")
+BATCH = 500
+
+
+def _text(html_or_text):
+    return " ".join(strip_tags(html_or_text or "").split())
+
+
+def _documents(apps, card_ids):
+    Card = apps.get_model("boards", "Card")
+    CardAttachment = apps.get_model("boards", "CardAttachment")
+    Checklist = apps.get_model("boards", "Checklist")
+    ChecklistItem = apps.get_model("boards", "ChecklistItem")
+    CardLog = apps.get_model("boards", "CardLog")
+
+    attachments = defaultdict(list)
+    for card_id, name, desc in CardAttachment._base_manager.filter(card_id__in=card_ids).values_list(
+        "card_id", "file", "description"
+    ):
+        attachments[card_id].append(" ".join(p for p in ((name or "").split("/")[-1], desc or "") if p))
+
+    checklists = defaultdict(list)
+    for card_id, title in Checklist._base_manager.filter(card_id__in=card_ids).values_list("card_id", "title"):
+        checklists[card_id].append(title or "")
+    for card_id, text in ChecklistItem._base_manager.filter(card_id__in=card_ids).values_list("card_id", "text"):
+        checklists[card_id].append(text or "")
+
+    activity = defaultdict(list)
+    for card_id, text, html in (
+        CardLog._base_manager.filter(card_id__in=card_ids)
+        .order_by("created_at")
+        .values_list("card_id", "content_text", "content")
+    ):
+        activity[card_id].append(text or _text(html))
+
+    for cid, title, desc, tags in Card._base_manager.filter(id__in=card_ids).values_list(
+        "id", "title", "description", "tags"
+    ):
+        yield (
+            cid,
+            title or "",
+            _text(desc),
+            tags or "",
+            "\n".join(attachments[cid]),
+            "\n".join(checklists[cid]),
+            "\n".join(activity[cid]),
+        )
+
+
+def forward_create_and_fill(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != "sqlite":
+        return  # sem FTS5: a busca segue no fallback (icontains)
+
+    cols = ", ".join(FTS_COLUMNS)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5({cols}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+    except Exception:
+        return  # SQLite sem FTS5
+
+    Card = apps.get_model("boards", "Card")
+    ids = list(Card._base_manager.order_by("id").values_list("id", flat=True))
+    values = ", ".join(["%s"] * (len(FTS_COLUMNS) + 1))
+
+    with conn.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE}")
+        for i in range(0, len(ids), BATCH):
+            cur.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, {cols}) VALUES ({values})",
+                list(_documents(apps, ids[i : i + BATCH])),
+            )
+
+
+def backward_drop(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0048_boardchange"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward_create_and_fill, backward_drop),
+    ]
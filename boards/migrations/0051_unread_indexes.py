@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0049_card_fts_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cardlog',
+            index=models.Index(fields=['card', 'created_at'], name='boards_card_card_id_76ce31_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardseen',
+            index=models.Index(fields=['user', 'card'], name='boards_card_user_id_d468bc_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, FilteredRelation, Q
+
+
+def forward_fill_counters(apps, schema_editor):
+    # estado atual (CardLog/CardSeen) => contadores; mesma conta do
+    # rebuild_unread_counters, com os modelos históricos
+    Board = apps.get_model("boards", "Board")
+    BoardMembership = apps.get_model("boards", "BoardMembership")
+    CardLog = apps.get_model("boards", "CardLog")
+    UnreadCounter = apps.get_model("boards", "UnreadCounter")
+
+    for board_id in Board._base_manager.filter(is_deleted=False).values_list("id", flat=True).iterator():
+        for user_id in BoardMembership.objects.filter(board_id=board_id).values_list("user_id", flat=True):
+            rows = (
+                CardLog.objects
+                .filter(card__column__board_id=board_id, card__is_deleted=False)
+                .exclude(actor_id=user_id)
+                .annotate(seen=FilteredRelation("card__cardseen", condition=Q(card__cardseen__user_id=user_id)))
+                .filter(Q(seen__last_seen_at__isnull=True) | Q(created_at__gt=F("seen__last_seen_at")))
+                .order_by()
+                .values("card_id")
+                .annotate(n=Count("id"))
+                .values_list("card_id", "n")
+            )
+            UnreadCounter.objects.bulk_create(
+                [UnreadCounter(user_id=user_id, card_id=cid, count=n) for cid, n in rows],
+                batch_size=500,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0051_unread_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to='boards.card')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='unreadcounter',
+            constraint=models.UniqueConstraint(fields=('user', 'card'), name='uniq_unread_counter_user_card'),
+        ),
+        migrations.RunPython(forward_fill_counters, migrations.RunPython.noop),
+    ]
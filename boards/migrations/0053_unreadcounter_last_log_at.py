@@ -0,0 +1,59 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:13
+
+from django.db import migrations, models
+from django.db.models import Count, F, FilteredRelation, Max, Q
+
+
+def forward_fill_counters(apps, schema_editor):
+    # recalcula os contadores (agora com last_log_at e a marca d'água do
+    # board); mesma conta do rebuild_unread_counters, com os modelos históricos
+    Board = apps.get_model("boards", "Board")
+    BoardMembership = apps.get_model("boards", "BoardMembership")
+    BoardActivityReadState = apps.get_model("boards", "BoardActivityReadState")
+    CardLog = apps.get_model("boards", "CardLog")
+    UnreadCounter = apps.get_model("boards", "UnreadCounter")
+
+    UnreadCounter.objects.all().delete()
+
+    for board_id in Board._base_manager.filter(is_deleted=False).values_list("id", flat=True).iterator():
+        watermarks = dict(
+            BoardActivityReadState.objects
+            .filter(board_id=board_id)
+            .values_list("user_id", "last_seen_at")
+        )
+        for user_id in BoardMembership.objects.filter(board_id=board_id).values_list("user_id", flat=True):
+            qs = (
+                CardLog.objects
+                .filter(card__column__board_id=board_id, card__is_deleted=False)
+                .exclude(actor_id=user_id)
+                .annotate(seen=FilteredRelation("card__cardseen", condition=Q(card__cardseen__user_id=user_id)))
+                .filter(Q(seen__last_seen_at__isnull=True) | Q(created_at__gt=F("seen__last_seen_at")))
+            )
+            if watermarks.get(user_id):
+                qs = qs.filter(created_at__gt=watermarks[user_id])
+            rows = (
+                qs.order_by()
+                .values("card_id")
+                .annotate(n=Count("id"), last=Max("created_at"))
+                .values_list("card_id", "n", "last")
+            )
+            UnreadCounter.objects.bulk_create(
+                [UnreadCounter(user_id=user_id, card_id=cid, count=n, last_log_at=last) for cid, n, last in rows],
+                batch_size=500,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0052_unreadcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unreadcounter',
+            name='last_log_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(forward_fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0053_unreadcounter_last_log_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cardlog',
+            index=models.Index(fields=['card', 'actor', 'created_at'], name='boards_card_card_id_a211a5_idx'),
+        ),
+    ]
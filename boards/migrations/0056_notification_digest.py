@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0055_notificationoutbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='notify_digest',
+            field=models.BooleanField(default=False, help_text='Receber um resumo diário em vez de uma mensagem por card/menção'),
+        ),
+        migrations.CreateModel(
+            name='NotificationDigestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('warn', 'Data aviso'), ('warn_minus_1', 'Véspera do aviso'), ('due_minus_1', 'Véspera do vencimento'), ('due', 'Vencimento'), ('mention', 'Menção')], max_length=20)),
+                ('detail', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_items', to='boards.card')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sent_at', 'user'], name='boards_noti_sent_at_abc363_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Índice FTS5 das @menções (boards/services/search_index.py)
+#
+# Como o 0049: tabela e documento congelados aqui, lidos pelos modelos
+# históricos.
+
+from django.conf import settings
+from django.db import migrations
+
+USER_FTS_TABLE = "boards_user_fts"
+USER_FTS_COLUMNS = ("handle", "display_name", "name", "email")
+
+
+def forward_create_and_fill(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != "sqlite":
+        return  # sem FTS5: menções seguem no fallback (icontains)
+
+    cols = ", ".join(USER_FTS_COLUMNS)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {USER_FTS_TABLE} "
+                f"USING fts5({cols}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+    except Exception:
+        return  # SQLite sem FTS5
+
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserProfile = apps.get_model("boards", "UserProfile")
+
+    profiles = {
+        user_id: (handle, display_name)
+        for user_id, handle, display_name in UserProfile._base_manager.values_list(
+            "user_id", "handle", "display_name"
+        )
+    }
+    docs = []
+    for uid, first, last, email in User._base_manager.values_list("id", "first_name", "last_name", "email"):
+        handle, display_name = profiles.get(uid, ("", ""))
+        docs.append((uid, handle or "", display_name or "", f"{first or ''} {last or ''}".strip(), email or ""))
+
+    values = ", ".join(["%s"] * (len(USER_FTS_COLUMNS) + 1))
+    with conn.cursor() as cur:
+        cur.execute(f"DELETE FROM {USER_FTS_TABLE}")
+        cur.executemany(f"INSERT INTO {USER_FTS_TABLE} (rowid, {cols}) VALUES ({values})", docs)
+
+
+def backward_drop(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {USER_FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0056_notification_digest"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(forward_create_and_fill, backward_drop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0057_user_fts_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardnotificationlog',
+            name='run_id',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 01:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0058_cardnotificationlog_run_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='locked_by',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
@@ -209,6 +209,9 @@ class Column(models.Model):
         default="gray",
     )
 
+    # revisão p/ polling delta (= Board.version da última mudança na coluna)
+    version = models.PositiveIntegerField(default=0)
+
     class Meta:
         ordering = ["position"]
 
@@ -254,6 +257,9 @@ class Card(models.Model):
     column = models.ForeignKey(Column, related_name="cards", on_delete=models.CASCADE)
     position = models.PositiveIntegerField(default=0)
 
+    # revisão p/ polling delta (= Board.version da última mudança no card)
+    version = models.PositiveIntegerField(default=0)
+
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(blank=True, null=True)
     is_archived = models.BooleanField(default=False)
@@ -264,6 +270,9 @@ class Card(models.Model):
 
     class Meta:
         ordering = ["position", "id"]
+        indexes = [
+            models.Index(fields=["column", "version"]),
+        ]
 
     def __str__(self):
         return self.title
@@ -301,6 +310,13 @@ class CardLog(models.Model):
     attachment = models.FileField(upload_to="logs/", blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["card", "created_at"]),
+            # não lidos: "logs do card depois de X, menos os meus"
+            models.Index(fields=["card", "actor", "created_at"]),
+        ]
+
 
 # ============================================================
 # CARD BADGED
@@ -312,6 +328,9 @@ class CardSeen(models.Model):
 
     class Meta:
         unique_together = ("card", "user")
+        indexes = [
+            models.Index(fields=["user", "card"]),
+        ]
 
 
 # ============================================================
@@ -402,6 +421,12 @@ class UserProfile(models.Model):
 
     notify_only_owned_or_mentioned = models.BooleanField(default=False)
 
+    # avisos/vencimentos/menções do dia em 1 mensagem só (send_daily_digest)
+    notify_digest = models.BooleanField(
+        default=False,
+        help_text="Receber um resumo diário em vez de uma mensagem por card/menção",
+    )
+
 
 
     avatar_choice = models.CharField(max_length=60, blank=True, default="")
@@ -641,6 +666,8 @@ class CardNotificationLog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="card_notification_logs", on_delete=models.CASCADE)
     kind = models.CharField(max_length=20, choices=Kind.choices)
     run_date = models.DateField()  # dia que o command rodou (08:00)
+    # execução do notify_cards_due que gravou a linha: quem notifica é só ela
+    run_id = models.CharField(max_length=32, blank=True, default="", editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -672,4 +699,130 @@ class CardFollow(models.Model):
     def __str__(self):
         return f"{self.user_id} follows {self.card_id}"
 
+
+class BoardChange(models.Model):
+    """
+    Journal append-only do board: 1 linha por entidade afetada em cada
+    incremento de Board.version (gravado na mesma transação, via
+    boards/services/board_version.py).
+    """
+    class Entity(models.TextChoices):
+        BOARD = "board", "Board"
+        COLUMN = "column", "Coluna"
+        CARD = "card", "Card"
+
+    board = models.ForeignKey(Board, related_name="changes", on_delete=models.CASCADE)
+    version = models.PositiveIntegerField()
+    entity = models.CharField(max_length=10, choices=Entity.choices)
+    entity_id = models.PositiveIntegerField()
+    op = models.CharField(max_length=20, default="update")  # create|update|move|reorder|archive|unarchive|delete|restore
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["board", "version"]),
+        ]
+
+    def __str__(self):
+        return f"{self.board_id}@{self.version} {self.op} {self.entity}:{self.entity_id}"
+
+
+
+class UnreadCounter(models.Model):
+    """
+    Atividade não lida por usuário/card, mantida na escrita: cada CardLog novo
+    soma 1 para os membros do board (menos o autor). Zera ao abrir o card; o
+    histórico do board só grava a marca d'água (BoardActivityReadState) e os
+    contadores com last_log_at <= marca valem 0. Ver boards/services/unread.py.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="unread_counters", on_delete=models.CASCADE)
+    card = models.ForeignKey(Card, related_name="unread_counters", on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+    # created_at do último CardLog contado
+    last_log_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "card"], name="uniq_unread_counter_user_card"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.card_id}={self.count}"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Fila durável de envios (WhatsApp/e-mail). As views só gravam a linha (na
+    mesma transação do request); quem fala com PressTicket/SMTP é o worker
+    manage.py run_outbox. Ver boards/services/outbox.py.
+    """
+    class Channel(models.TextChoices):
+        WHATSAPP = "whatsapp", "WhatsApp"
+        EMAIL = "email", "E-mail"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pendente"
+        SENDING = "sending", "Enviando"
+        SENT = "sent", "Enviado"
+        DEAD = "dead", "Falhou (sem novas tentativas)"
+
+    channel = models.CharField(max_length=20, choices=Channel.choices)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    kind = models.CharField(max_length=60, blank=True, default="")  # só p/ log/admin
+
+    # número (55 + DDD + número, só dígitos) ou e-mail
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255, blank=True, default="")
+    body = models.TextField(blank=True, default="")
+    html_body = models.TextField(blank=True, default="")
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)  # próxima tentativa
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default="")  # lease do claim (host:pid:token)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.channel}:{self.recipient} [{self.status}]"
+
+
+class NotificationDigestItem(models.Model):
+    """
+    Evento guardado p/ o resumo diário (UserProfile.notify_digest): em vez de
+    enviar na hora, notify_cards_due/menções gravam aqui e o
+    send_daily_digest junta tudo do usuário numa mensagem.
+    """
+    class Kind(models.TextChoices):
+        WARN = "warn", "Data aviso"
+        WARN_MINUS_1 = "warn_minus_1", "Véspera do aviso"
+        DUE_MINUS_1 = "due_minus_1", "Véspera do vencimento"
+        DUE = "due", "Vencimento"
+        MENTION = "mention", "Menção"
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="digest_items", on_delete=models.CASCADE)
+    card = models.ForeignKey(Card, related_name="digest_items", on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    detail = models.CharField(max_length=255, blank=True, default="")  # ex.: quem marcou
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["sent_at", "user"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.kind}:{self.card_id}"
+
+
 # END boards/models.py
@@ -0,0 +1,37 @@
+# boards/services/board_access.py
+"""
+Conjunto de boards visíveis por usuário (mesma regra do _can_view_board do
+tracktime: superuser vê tudo; demais, boards onde tem membership), em cache
+por VISIBLE_BOARDS_TTL segundos. Os signals de BoardMembership invalidam;
+o TTL cobre escritas em lote (bulk_create/update não disparam signal).
+"""
+from __future__ import annotations
+
+from django.core.cache import cache
+
+from boards.models import BoardMembership
+
+VISIBLE_BOARDS_TTL = 60
+
+
+def _key(user_id: int) -> str:
+    return f"boards:visible:{user_id}"
+
+
+def visible_board_ids(user) -> set[int] | None:
+    """ids dos boards que o usuário pode ver; None = todos (superuser)."""
+    if not user or not getattr(user, "is_authenticated", False):
+        return set()
+    if getattr(user, "is_superuser", False):
+        return None
+
+    ids = cache.get(_key(user.id))
+    if ids is None:
+        ids = list(BoardMembership.objects.filter(user_id=user.id).values_list("board_id", flat=True))
+        cache.set(_key(user.id), ids, timeout=VISIBLE_BOARDS_TTL)
+    return set(ids)
+
+
+def invalidate_visible_boards(user_id) -> None:
+    if user_id:
+        cache.delete(_key(user_id))
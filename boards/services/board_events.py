@@ -0,0 +1,168 @@
+# boards/services/board_events.py
+"""
+Fan-out de "board N mudou para a versão V" para os streams SSE
+(boards/views/events.py).
+
+- REDIS_URL setado: publish no pub/sub do mesmo Redis do cache; cada processo
+  mantém UMA assinatura (psubscribe) e redistribui para as conexões locais.
+- sem REDIS_URL: broker em memória, só entre conexões do MESMO processo
+  (runserver/dev). Com vários workers o Dockerfile/compose ligam
+  REDIS_REQUIRED e o settings recusa subir sem REDIS_URL.
+
+Cada conexão recebe uma fila de tamanho 1: se chegarem várias versões antes
+do cliente consumir, fica só a mais nova (o cliente busca o delta de qualquer
+forma).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_RECONNECT_SECONDS = 3
+
+
+def _redis_url() -> str:
+    return (getattr(settings, "REDIS_URL", "") or "").strip()
+
+
+def _channel(board_id) -> str:
+    prefix = (settings.CACHES.get("default", {}).get("KEY_PREFIX") or "nossotrello").strip()
+    return f"{prefix}:board-version:{board_id}"
+
+
+def _offer(queue: asyncio.Queue, version: int) -> None:
+    # roda dentro do loop dono da fila
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(version)
+
+
+class _LocalBroker:
+    """
+    board_id -> conexões (loop, fila) deste processo.
+    dispatch() pode ser chamado de qualquer thread (views síncronas rodam em
+    thread sob ASGI), por isso usa call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs: dict[int, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def subscribe(self, board_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subs.setdefault(int(board_id), set()).add(entry)
+        return queue
+
+    def unsubscribe(self, board_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subs = self._subs.get(int(board_id))
+            if not subs:
+                return
+            for entry in [e for e in subs if e[1] is queue]:
+                subs.discard(entry)
+            if not subs:
+                self._subs.pop(int(board_id), None)
+
+    def dispatch(self, board_id: int, version: int) -> None:
+        with self._lock:
+            subs = list(self._subs.get(int(board_id), ()))
+
+        for loop, queue in subs:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, int(version))
+            except RuntimeError:
+                # loop já encerrado (worker reciclado)
+                pass
+
+
+_broker = _LocalBroker()
+
+# loop -> task do listener Redis (1 por event loop/processo)
+_listeners: dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+
+async def _redis_listener() -> None:
+    import redis.asyncio as aioredis
+
+    pattern = _channel("*")
+    prefix_len = len(pattern) - 1
+
+    while True:
+        client = aioredis.from_url(_redis_url())
+        try:
+            pubsub = client.pubsub()
+            await pubsub.psubscribe(pattern)
+
+            async for msg in pubsub.listen():
+                if msg.get("type") != "pmessage":
+                    continue
+                try:
+                    channel = msg["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    board_id = int(channel[prefix_len:])
+                    version = int(msg["data"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                _broker.dispatch(board_id, version)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("board_events: redis listener caiu; reconectando", exc_info=True)
+            await asyncio.sleep(REDIS_RECONNECT_SECONDS)
+        finally:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+
+
+def _ensure_redis_listener() -> None:
+    loop = asyncio.get_running_loop()
+    task = _listeners.get(loop)
+    if task is None or task.done():
+        _listeners[loop] = loop.create_task(_redis_listener())
+
+
+def publish_board_version(board_id: int, version: int) -> None:
+    """
+    Avisa os streams que o board mudou. Nunca levanta: o stream é só um
+    atalho, o poll continua sendo a fonte da verdade.
+    """
+    if _redis_url():
+        try:
+            from django_redis import get_redis_connection
+
+            get_redis_connection("default").publish(_channel(int(board_id)), int(version))
+        except Exception:
+            logger.warning("board_events: falha ao publicar board=%s v=%s", board_id, version, exc_info=True)
+        return
+
+    _broker.dispatch(board_id, version)
+
+
+@asynccontextmanager
+async def subscribe_board_version(board_id: int):
+    """
+    async with subscribe_board_version(board_id) as queue:
+        version = await queue.get()
+    """
+    if _redis_url():
+        _ensure_redis_listener()
+
+    queue = _broker.subscribe(board_id)
+    try:
+        yield queue
+    finally:
+        _broker.unsubscribe(board_id, queue)
@@ -0,0 +1,125 @@
+# boards/services/board_version.py
+from __future__ import annotations
+
+from datetime import timedelta
+from functools import partial
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from boards.models import Board, BoardChange, Card, Column
+from boards.services.board_events import publish_board_version
+
+
+def _ids(objs: Iterable) -> list[int]:
+    """
+    Aceita instâncias ou ids e devolve ids únicos (ignora None).
+    """
+    out = []
+    for o in objs or ():
+        pk = getattr(o, "pk", o)
+        if pk is None:
+            continue
+        pk = int(pk)
+        if pk not in out:
+            out.append(pk)
+    return out
+
+
+def bump_board_version(
+    board: Board,
+    *,
+    columns: Iterable = (),
+    cards: Iterable = (),
+    op: str = "update",
+) -> int:
+    """
+    Incrementa Board.version e carimba a nova versão nas colunas/cards afetados.
+    Único ponto do projeto que mexe em Board.version.
+
+    O poll (boards/views/polling.py) usa esses carimbos para devolver só os
+    fragmentos com version > versão do cliente:
+    - columns: mudou a coluna em si ou o conjunto/ordem de cards dela
+      (criar, mover, arquivar, excluir, reordenar)
+    - cards: mudou só o conteúdo do card (título, etiquetas, capa, checklist...)
+
+    Na mesma transação grava o journal (BoardChange): 1 linha por coluna/card
+    com o `op`; sem entidades, 1 linha do próprio board.
+
+    Depois do commit, avisa os streams SSE (boards/services/board_events.py).
+
+    Retorna a nova versão do board.
+    """
+    column_ids = _ids(columns)
+    card_ids = _ids(cards)
+
+    with transaction.atomic():
+        # 1 UPDATE atômico (version = version + 1) e lê o valor de volta na
+        # mesma transação: não perde incremento com editores concorrentes
+        Board.objects.filter(pk=board.pk).update(version=F("version") + 1)
+        version = Board.objects.filter(pk=board.pk).values_list("version", flat=True).get()
+        board.version = version
+
+        if column_ids:
+            Column.objects.filter(id__in=column_ids).update(version=version)
+
+        if card_ids:
+            Card.all_objects.filter(id__in=card_ids).update(version=version)
+
+        entries = (
+            [(BoardChange.Entity.COLUMN, pk) for pk in column_ids]
+            + [(BoardChange.Entity.CARD, pk) for pk in card_ids]
+        ) or [(BoardChange.Entity.BOARD, board.pk)]
+
+        BoardChange.objects.bulk_create(
+            [
+                BoardChange(board_id=board.pk, version=version, entity=entity, entity_id=pk, op=op)
+                for entity, pk in entries
+            ]
+        )
+
+        transaction.on_commit(partial(publish_board_version, board.pk, version))
+
+    return version
+
+
+_PRUNE_GATE_KEY = "boards:changes:pruned"
+
+
+def prune_changes(*, retention: timedelta | None = None, every_seconds: int = 0) -> int:
+    """
+    Apaga o journal (BoardChange) mais velho que a retenção
+    (settings.BOARD_CHANGES_RETENTION_HOURS). Retorna quantas linhas apagou.
+
+    Corta por versão inteira: por board, tudo com version <= a maior versão
+    já vencida — nunca sobra meia versão. O board_changes compara o cursor
+    com a 1ª versão que sobrou e manda "reset" (recarregar tudo) se o cliente
+    ficou antes dela.
+
+    every_seconds > 0: roda no máximo 1 vez nesse intervalo (entre processos,
+    via cache) — p/ chamar a cada ciclo de um loop.
+    """
+    if every_seconds and not cache.add(_PRUNE_GATE_KEY, 1, timeout=every_seconds):
+        return 0
+
+    if retention is None:
+        retention = timedelta(hours=int(getattr(settings, "BOARD_CHANGES_RETENTION_HOURS", 48)))
+    cutoff = timezone.now() - retention
+
+    expired = (
+        BoardChange.objects
+        .filter(created_at__lt=cutoff)
+        .values("board_id")
+        .annotate(upto=Max("version"))
+        .values_list("board_id", "upto")
+    )
+
+    deleted = 0
+    for board_id, upto in list(expired):
+        n, _ = BoardChange.objects.filter(board_id=board_id, version__lte=upto).delete()
+        deleted += n
+    return deleted
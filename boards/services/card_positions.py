@@ -0,0 +1,116 @@
+# boards/services/card_positions.py
+"""
+Posições esparsas dos cards (estilo lexorank, com inteiros).
+
+Os cards de uma coluna ficam com position espaçada de POSITION_GAP
+(1024, 2048, ...). Inserir/mover um card calcula um valor ENTRE os vizinhos
+e grava só o card movido. Quando não há mais espaço entre dois vizinhos
+(ex.: dados antigos 0,1,2... ou muitos moves no mesmo ponto), a coluna é
+reespaçada uma vez (rebalance_column) e o cálculo é refeito.
+
+A ordenação continua sendo ("position", "id") — templates e Card.Meta não mudam.
+O índice recebido do front (new_position) é 0-based entre os cards visíveis.
+"""
+from __future__ import annotations
+
+from django.db.models import Max, Q
+
+from boards.models import Card, Column
+
+POSITION_GAP = 1024
+
+
+def _visible_positions(column: Column, *, exclude_card_id=None) -> list[int]:
+    qs = Card.objects.filter(column=column)
+    if exclude_card_id is not None:
+        qs = qs.exclude(id=exclude_card_id)
+    return [int(p or 0) for p in qs.order_by("position", "id").values_list("position", flat=True)]
+
+
+def _between(prev: int | None, nxt: int | None) -> int | None:
+    """
+    Valor estritamente entre prev e nxt (None = sem vizinho daquele lado).
+    Retorna None quando não cabe.
+    """
+    if prev is None and nxt is None:
+        return POSITION_GAP
+    if nxt is None:
+        return prev + POSITION_GAP
+    if prev is None:
+        if nxt >= 2 * POSITION_GAP:
+            return nxt - POSITION_GAP
+        return nxt // 2 if nxt >= 1 else None
+    if nxt - prev >= 2:
+        return (prev + nxt) // 2
+    return None
+
+
+def rebalance_column(column: Column) -> int:
+    """
+    Reespaça todos os cards da coluna (inclusive arquivados/excluídos, para
+    que voltem no mesmo lugar relativo). Retorna quantos cards mudaram.
+    """
+    cards = list(
+        Card.all_objects
+        .filter(column=column)
+        .order_by("position", "id")
+        .only("id", "position")
+    )
+
+    changed = []
+    for idx, c in enumerate(cards, start=1):
+        pos = idx * POSITION_GAP
+        if c.position != pos:
+            c.position = pos
+            changed.append(c)
+
+    if changed:
+        Card.all_objects.bulk_update(changed, ["position"], batch_size=500)
+
+    return len(changed)
+
+
+def position_at(column: Column, index: int, *, exclude_card_id=None) -> int:
+    """
+    Posição para um card entrar no índice `index` da coluna (0-based entre os
+    visíveis, clamp nas pontas). Reespaça a coluna se faltar espaço.
+    """
+    positions = _visible_positions(column, exclude_card_id=exclude_card_id)
+    index = max(0, min(int(index or 0), len(positions)))
+
+    def pick(ps):
+        prev = ps[index - 1] if index > 0 else None
+        nxt = ps[index] if index < len(ps) else None
+        return _between(prev, nxt)
+
+    pos = pick(positions)
+    if pos is None:
+        rebalance_column(column)
+        pos = pick(_visible_positions(column, exclude_card_id=exclude_card_id))
+
+    return pos
+
+
+def position_after(card: Card) -> int:
+    """Posição logo abaixo de `card` (ex.: duplicar)."""
+    return position_at(card.column, card_index(card) + 1)
+
+
+def position_at_end(column: Column) -> int:
+    """
+    Fim da coluna considerando todos os cards (restaurar/desarquivar não
+    pode colidir com quem está no arquivo/lixeira).
+    """
+    m = Card.all_objects.filter(column=column).aggregate(mx=Max("position"))["mx"]
+    return int(m or 0) + POSITION_GAP
+
+
+def card_index(card: Card) -> int:
+    """Índice 0-based do card entre os visíveis da coluna (para a UI)."""
+    pos = int(card.position or 0)
+    return (
+        Card.objects
+        .filter(column_id=card.column_id)
+        .filter(Q(position__lt=pos) | Q(position=pos, id__lt=card.id))
+        .count()
+    )
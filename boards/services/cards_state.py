@@ -4,6 +4,8 @@ from django.db.models import Max
 from django.utils import timezone
 
 from boards.models import Card, Column
+from boards.services.board_version import bump_board_version
+from boards.services.card_positions import position_at_end
 
 
 RECOVERY_COLUMN_NAME = "CARD RECUPERADO"
@@ -13,6 +15,7 @@ def archive_card(card: Card):
     card.is_archived = True
     card.archived_at = timezone.now()
     card.save(update_fields=["is_archived", "archived_at"])
+    bump_board_version(card.column.board, columns=[card.column_id], cards=[card], op="archive")
 
 
 def unarchive_card(card: Card):
@@ -27,12 +30,14 @@ def unarchive_card(card: Card):
     card.position = _next_card_position(target_column)
 
     card.save(update_fields=["is_archived", "archived_at", "column", "position"])
+    bump_board_version(target_column.board, columns=[target_column], cards=[card], op="unarchive")
 
 
 def soft_delete_card(card: Card):
     card.is_deleted = True
     card.deleted_at = timezone.now()
     card.save(update_fields=["is_deleted", "deleted_at"])
+    bump_board_version(card.column.board, columns=[card.column_id], cards=[card], op="delete")
 
 
 def restore_card(card: Card):
@@ -47,6 +52,7 @@ def restore_card(card: Card):
     card.position = _next_card_position(target_column)
 
     card.save(update_fields=["is_deleted", "deleted_at", "column", "position"])
+    bump_board_version(target_column.board, columns=[target_column], cards=[card], op="restore")
 
 
 # ==========================
@@ -105,5 +111,4 @@ def _next_column_position(board) -> int:
 
 
 def _next_card_position(column: Column) -> int:
-    m = Card.all_objects.filter(column=column).aggregate(mx=Max("position"))["mx"]
-    return (m or 0) + 1
+    return position_at_end(column)
@@ -0,0 +1,135 @@
+# boards/services/digest.py
+"""
+Resumo diário de notificações (UserProfile.notify_digest).
+
+Para quem optou pelo resumo, notify_cards_due e as menções não enviam na
+hora: gravam NotificationDigestItem. O send_daily_digest (rodar depois dos
+disparos das 08:00) faz 1 passada pelos itens pendentes, em ordem de
+usuário, e enfileira 1 WhatsApp + 1 e-mail por usuário com tudo do dia.
+"""
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from boards.models import NotificationDigestItem
+from boards.services.notifications import send_whatsapp, whatsapp_number
+from boards.services.outbox import enqueue_email
+
+logger = logging.getLogger(__name__)
+
+MARK_BATCH = 500
+
+# ordem das seções no resumo
+SECTIONS = OrderedDict([
+    (NotificationDigestItem.Kind.DUE, "⛔ Vencem hoje"),
+    (NotificationDigestItem.Kind.DUE_MINUS_1, "⏳ Vencem amanhã"),
+    (NotificationDigestItem.Kind.WARN, "🔔 Data de aviso hoje"),
+    (NotificationDigestItem.Kind.WARN_MINUS_1, "🔔 Data de aviso amanhã"),
+    (NotificationDigestItem.Kind.MENTION, "🏷️ Você foi marcado"),
+])
+
+
+def wants_digest(user) -> bool:
+    prof = getattr(user, "profile", None)
+    return bool(prof and getattr(prof, "notify_digest", False))
+
+
+def add_digest_item(*, user, card, kind: str, detail: str = "") -> NotificationDigestItem:
+    return NotificationDigestItem.objects.create(user=user, card=card, kind=kind, detail=(detail or "")[:255])
+
+
+def _card_url(card) -> str:
+    path = reverse("boards:board_detail", kwargs={"board_id": card.column.board_id})
+    return f"{settings.SITE_URL.rstrip('/')}{path}?card={card.id}"
+
+
+def build_digest_text(items) -> str:
+    """Texto do resumo; itens repetidos (mesmo card/tipo) viram 1 linha."""
+    lines_by_kind: dict[str, OrderedDict] = {k: OrderedDict() for k in SECTIONS}
+
+    for item in items:
+        card = item.card
+        if card.is_deleted or card.is_archived or card.column.board.is_deleted:
+            continue
+        bucket = lines_by_kind.setdefault(item.kind, OrderedDict())
+        entry = bucket.setdefault(card.id, {"card": card, "details": []})
+        if item.detail and item.detail not in entry["details"]:
+            entry["details"].append(item.detail)
+
+    out = ["📋 Resumo do dia — Nosso Trello"]
+    for kind, bucket in lines_by_kind.items():
+        if not bucket:
+            continue
+        out.append("")
+        out.append(SECTIONS.get(kind, kind) + ":")
+        for entry in bucket.values():
+            card = entry["card"]
+            line = f"• {card.title} ({card.column.board.name})"
+            if entry["details"]:
+                line += " — " + ", ".join(entry["details"])
+            out.append(line)
+            out.append(f"  {_card_url(card)}")
+
+    return "\n".join(out) if len(out) > 1 else ""
+
+
+def _send_digest(user, items) -> None:
+    text = build_digest_text(items)
+    if not text:
+        return
+
+    prof = getattr(user, "profile", None)
+    if prof and prof.notify_whatsapp:
+        phone_digits = whatsapp_number(prof)
+        if phone_digits:
+            send_whatsapp(user=user, phone_digits=phone_digits, body=text, kind="digest")
+
+    to_email = (getattr(user, "email", "") or "").strip()
+    if to_email and (not prof or prof.notify_email):
+        subject = f"[NossoTrello] Resumo do dia — {timezone.localdate():%d/%m/%Y}"
+        enqueue_email(to=to_email, subject=subject, body=text, kind="digest")
+
+
+def send_pending_digests() -> tuple[int, int]:
+    """
+    1 passada pelos itens pendentes (ordenados por usuário): monta e enfileira
+    1 resumo por usuário e marca os itens como enviados. Retorna (usuários, itens).
+    """
+    qs = (
+        NotificationDigestItem.objects
+        .filter(sent_at__isnull=True)
+        .select_related("user", "user__profile", "card", "card__column", "card__column__board")
+        .order_by("user_id", "id")
+    )
+
+    users = 0
+    done_ids: list[int] = []
+
+    with transaction.atomic():
+        current_user = None
+        bucket: list[NotificationDigestItem] = []
+
+        for item in qs.iterator(chunk_size=MARK_BATCH):
+            if current_user is not None and item.user_id != current_user.id:
+                _send_digest(current_user, bucket)
+                users += 1
+                bucket = []
+            current_user = item.user
+            bucket.append(item)
+            done_ids.append(item.id)
+
+        if bucket:
+            _send_digest(current_user, bucket)
+            users += 1
+
+        now = timezone.now()
+        for i in range(0, len(done_ids), MARK_BATCH):
+            NotificationDigestItem.objects.filter(id__in=done_ids[i : i + MARK_BATCH]).update(sent_at=now)
+
+    return users, len(done_ids)
@@ -0,0 +1,204 @@
+# boards/services/fake_servers.py
+"""
+Servidores falsos p/ teste de carga das notificações (nada sai da máquina):
+
+- FakePressTicketServer: HTTP em 127.0.0.1 que responde POST
+  /api/messages/send como o PressTicket — inclusive o sucesso dentro de
+  {"error": {"_data": ...}}
+- FakeSMTPServer: sink SMTP mínimo (EHLO/MAIL/RCPT/DATA/QUIT), só conta
+
+Os dois aceitam latency_ms (+ jitter_ms) e failure_rate (0..1). Usados pelo
+bench_notifications e pelo run_fake_notify_servers. Não usar em produção.
+"""
+from __future__ import annotations
+
+import json
+import random
+import socketserver
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _delay(latency_ms: float, jitter_ms: float) -> None:
+    ms = latency_ms + (random.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0)
+    if ms > 0:
+        time.sleep(ms / 1000)
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.received = 0
+        self.failed = 0
+
+    def hit(self, ok: bool) -> None:
+        with self._lock:
+            self.received += 1
+            if not ok:
+                self.failed += 1
+
+
+class _FakeServer:
+    def __init__(self, *, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0,
+                 jitter_ms: float = 0, failure_rate: float = 0.0):
+        self.host = host
+        self.port = port
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.failure_rate = float(failure_rate)
+        self.counters = _Counters()
+        self._server = None
+        self._thread = None
+
+    def _build(self):
+        raise NotImplementedError
+
+    def should_fail(self) -> bool:
+        return self.failure_rate > 0 and random.random() < self.failure_rate
+
+    def delay(self) -> None:
+        _delay(self.latency_ms, self.jitter_ms)
+
+    def start(self):
+        self._server = self._build()
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ============================================================
+# PressTicket
+# ============================================================
+class _PressTicketHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (o cliente usa pool)
+    # cabeçalho + corpo num write só (sem Nagle/delayed ACK somando ~40ms)
+    wbufsize = 64 * 1024
+
+    def do_POST(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        if not self.path.rstrip("/").endswith("/api/messages/send"):
+            return self._json(404, {"error": "ERR_NOT_FOUND"})
+        if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+            return self._json(401, {"error": "ERR_SESSION_EXPIRED"})
+
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            return self._json(400, {"error": "ERR_INVALID_JSON"})
+
+        fake.delay()
+        if fake.should_fail():
+            fake.counters.hit(False)
+            return self._json(500, {"error": "ERR_WAPP_NOT_INITIALIZED"})
+
+        number = str(payload.get("number") or "")
+        msg_id = uuid.uuid4().hex[:20].upper()
+        fake.counters.hit(True)
+        # sim: o PressTicket devolve o sucesso dentro de "error"
+        return self._json(200, {
+            "error": {
+                "_data": {
+                    "id": {
+                        "fromMe": True,
+                        "remote": f"{number}@c.us",
+                        "id": msg_id,
+                        "_serialized": f"true_{number}@c.us_{msg_id}",
+                    },
+                    "body": payload.get("body") or "",
+                    "type": "chat",
+                    "timestamp": int(time.time()),
+                    "ack": 0,
+                }
+            }
+        })
+
+    def _json(self, status: int, obj) -> None:
+        out = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakePressTicketServer(_FakeServer):
+    def _build(self):
+        server = ThreadingHTTPServer((self.host, self.port), _PressTicketHandler)
+        server.daemon_threads = True
+        return server
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+
+# ============================================================
+# SMTP
+# ============================================================
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        fake = self.server.fake
+        self._reply("220 fake-smtp ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode("utf-8", errors="replace").strip()[:4].upper()
+
+            if verb == "EHLO":
+                self.wfile.write(b"250-fake-smtp\r\n250-8BITMIME\r\n250 SIZE 52428800\r\n")
+            elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                fake.delay()
+                if fake.should_fail():
+                    fake.counters.hit(False)
+                    self._reply("451 4.3.0 fake temporary failure")
+                else:
+                    fake.counters.hit(True)
+                    self._reply("250 OK queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+    def _reply(self, text: str) -> None:
+        self.wfile.write(text.encode("ascii") + b"\r\n")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class FakeSMTPServer(_FakeServer):
+    def _build(self):
+        return _ThreadingTCPServer((self.host, self.port), _SMTPHandler)
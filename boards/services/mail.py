@@ -0,0 +1,104 @@
+# boards/services/mail.py
+"""
+Envio de e-mail em lote: 1 conexão SMTP por lote (get_connection +
+send_messages) em vez de 1 sessão SMTP (connect/TLS/login/quit) por mensagem
+como faz o send_mail.
+
+- EMAIL_BATCH_SIZE: mensagens por conexão (default 50)
+- EMAIL_BATCH_THROTTLE_SECONDS: pausa entre lotes (default 0)
+- cada mensagem passa pelo limitador (rate_limit, canal "email")
+
+Usado pelo worker da outbox (run_outbox).
+Benchmark: python manage.py bench_mail.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Sequence
+
+from django.conf import settings
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+
+from boards.services.rate_limit import acquire, record_sent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+
+
+def build_message(*, to: str, subject: str, body: str, html_body: str = "") -> EmailMessage:
+    msg = EmailMultiAlternatives(
+        subject=subject,
+        body=body,
+        from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None),
+        to=[to],
+    )
+    if html_body:
+        msg.attach_alternative(html_body, "text/html")
+    return msg
+
+
+def send_messages_batched(
+    messages: Sequence[EmailMessage],
+    *,
+    batch_size: int | None = None,
+    throttle_seconds: float | None = None,
+    backend: str | None = None,
+    connection_kwargs: dict | None = None,
+    rate_limit: bool = True,
+) -> list[Exception | None]:
+    """
+    Envia as mensagens reaproveitando a conexão dentro de cada lote.
+    Retorna, na ordem de entrada, None (enviado) ou a exceção de cada mensagem
+    — uma falha não derruba as outras (RateLimited inclusive).
+    """
+    messages = list(messages)
+    if batch_size is None:
+        batch_size = int(getattr(settings, "EMAIL_BATCH_SIZE", DEFAULT_BATCH_SIZE) or DEFAULT_BATCH_SIZE)
+    if throttle_seconds is None:
+        throttle_seconds = float(getattr(settings, "EMAIL_BATCH_THROTTLE_SECONDS", 0) or 0)
+    batch_size = max(1, batch_size)
+
+    results: list[Exception | None] = [None] * len(messages)
+
+    for start in range(0, len(messages), batch_size):
+        chunk = messages[start : start + batch_size]
+        conn = get_connection(backend, fail_silently=False, **(connection_kwargs or {}))
+        try:
+            conn.open()
+        except Exception as e:
+            logger.warning("mail: falha ao abrir conexão (%s mensagens): %s", len(chunk), e)
+            for j in range(len(chunk)):
+                results[start + j] = e
+            continue
+
+        try:
+            for j, msg in enumerate(chunk):
+                try:
+                    if rate_limit:
+                        acquire("email", (msg.to or [""])[0].lower())
+                except Exception as e:
+                    results[start + j] = e
+                    continue
+                try:
+                    conn.send_messages([msg])
+                    record_sent("email")
+                except Exception as e:
+                    results[start + j] = e
+                    # a sessão pode ter ficado inválida: reabre p/ as próximas
+                    try:
+                        conn.close()
+                        conn.open()
+                    except Exception:
+                        pass
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+        if throttle_seconds and start + batch_size < len(messages):
+            time.sleep(throttle_seconds)
+
+    return results
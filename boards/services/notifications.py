@@ -4,16 +4,16 @@ from __future__ import annotations
 
 import logging
 import re
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import Iterable
 
 from django.conf import settings
-from django.core.mail import send_mail
 from django.urls import reverse
 from django.utils import timezone
 
 from boards.models import BoardMembership, Mention, UserProfile, Card
-from tracktime.services.pressticket import send_text_message, PressTicketError
+from boards.services.outbox import enqueue_email, enqueue_whatsapp
 
 import html
 from django.utils.html import strip_tags
@@ -147,6 +147,33 @@ def _user_allowed_for_card(*, card: Card, user: User) -> bool:
     return Mention.objects.filter(card=card, mentioned_user=user).exists()
 
 
+def allowed_user_ids_by_card(cards: Iterable[Card]) -> dict[int, set[int]]:
+    """
+    Versão em lote de _user_allowed_for_card: {card_id: {user_id, ...}} com
+    as mesmas regras (dono / mencionado / seguindo), em 2 queries no total.
+    """
+    cards = list(cards)
+    card_ids = [c.id for c in cards]
+    allowed: dict[int, set[int]] = defaultdict(set)
+
+    for c in cards:
+        owner_id = getattr(c, "owner_id", None)
+        if owner_id:
+            allowed[c.id].add(owner_id)
+
+    for card_id, user_id in (
+        Mention.objects
+        .filter(card_log__card_id__in=card_ids)
+        .values_list("card_log__card_id", "mentioned_user_id")
+    ):
+        allowed[card_id].add(user_id)
+
+    for card_id, user_id in CardFollow.objects.filter(card_id__in=card_ids).values_list("card_id", "user_id"):
+        allowed[card_id].add(user_id)
+
+    return allowed
+
+
 def get_board_recipients_for_card(*, card: Card):
     board = card.column.board
     memberships = (
@@ -158,54 +185,37 @@ def get_board_recipients_for_card(*, card: Card):
     return users
 
 
-def send_whatsapp(*, user, phone_digits: str, body: str) -> None:
-    base_url = (getattr(settings, "PRESSTICKET_BASE_URL", "") or "").strip()
-    token = (getattr(settings, "PRESSTICKET_TOKEN", "") or "").strip()
-    user_id = int(getattr(settings, "PRESSTICKET_USER_ID", 0) or 0)
-    queue_id = int(getattr(settings, "PRESSTICKET_QUEUE_ID", 0) or 0)
-    whatsapp_id = int(getattr(settings, "PRESSTICKET_WHATSAPP_ID", 0) or 0)
+def whatsapp_number(prof) -> str:
+    """Telefone do perfil como 55 + DDD + número (só dígitos), ou "" se inválido."""
+    phone_raw = (getattr(prof, "telefone", "") or "").strip()
+    phone_digits = re.sub(r"\D+", "", phone_raw)
 
-    logger.warning(
-        "pressticket: sending kind=message number=%r base_url=%r user_id=%s queue_id=%s whatsapp_id=%s",
-        phone_digits, base_url, user_id, queue_id, whatsapp_id
-    )
+    # Se não tiver DDI (ex: veio só DDD+número), assume BR e prefixa 55
+    if len(phone_digits) in (10, 11):
+        phone_digits = "55" + phone_digits
 
-    resp = send_text_message(
-        base_url=base_url,
-        token=token,
-        number=phone_digits,
-        body=body,
-        user_id=user_id,
-        queue_id=queue_id,
-        whatsapp_id=whatsapp_id,
-    )
-
-    # Se a API sempre devolve {"error":{...}} mesmo em sucesso, não vamos “reclassificar”.
-    # Só logamos algum identificador se existir.
-    try:
-        msg_id = (
-            resp.get("error", {})
-                .get("_data", {})
-                .get("id", {})
-                .get("_serialized", "")
+    # Agora valida: 55 + DDD + (8 ou 9)
+    if len(phone_digits) not in (12, 13):
+        logger.warning(
+            "pressticket: invalid phone after sanitize user_id=%s raw=%r digits=%r",
+            getattr(prof, "user_id", None), phone_raw, phone_digits
         )
-        if msg_id:
-            logger.warning("pressticket: api ok msg_id=%r", msg_id)
-    except Exception:
-        pass
+        return ""
+    return phone_digits
 
-    logger.warning("pressticket: sent ok kind=message number=%r resp_keys=%s", phone_digits, list((resp or {}).keys())[:15])
+
+def send_whatsapp(*, user, phone_digits: str, body: str, kind: str = "message") -> None:
+    """Enfileira na outbox; quem chama o PressTicket é o worker (run_outbox)."""
+    if not (getattr(settings, "PRESSTICKET_TOKEN", "") or "").strip():
+        logger.info("pressticket: skipped (no token) user_id=%s kind=%s", getattr(user, "id", None), kind)
+        return
+
+    enqueue_whatsapp(number=phone_digits, body=body, kind=kind)
+    logger.info("pressticket: queued kind=%s number=%r", kind, phone_digits)
 
 
 def send_email_notification(*, to_email: str, subject: str, body: str) -> None:
-    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "") or "no-reply@localhost"
-    send_mail(
-        subject=subject,
-        message=body,
-        from_email=from_email,
-        recipient_list=[to_email],
-        fail_silently=False,
-    )
+    enqueue_email(to=to_email, subject=subject, body=body, kind="card")
 
 
 def notify_users_for_card(
@@ -221,56 +231,66 @@ def notify_users_for_card(
     if not recipients:
         return
 
+    snap = build_card_snapshot(card=card)
+
     for u in recipients:
         if notify_only_owned_or_mentioned and (not bypass_card_gate):
             if not _user_allowed_for_card(card=card, user=u):
                 continue
 
-        # WhatsApp
-        if prof.notify_whatsapp:
-            phone_raw = (prof.telefone or "").strip()
-            phone_digits = re.sub(r"\D+", "", phone_raw)
-
-            # Se não tiver DDI (ex: veio só DDD+número), assume BR e prefixa 55
-            if len(phone_digits) in (10, 11):
-                phone_digits = "55" + phone_digits
+        notify_user_for_card(
+            card=card,
+            user=u,
+            snap=snap,
+            subject=subject,
+            message=message,
+            include_link_as_second_whatsapp_message=include_link_as_second_whatsapp_message,
+        )
 
-            # Agora valida: 55 + DDD + (8 ou 9)
-            if len(phone_digits) not in (12, 13):
-                logger.warning(
-                    "pressticket: invalid phone after sanitize user_id=%s raw=%r digits=%r",
-                    u.id, phone_raw, phone_digits
-                )
-                continue
 
+def notify_user_for_card(
+    *,
+    card: Card,
+    user,
+    snap: CardSnapshot,
+    subject: str,
+    message: str,
+    include_link_as_second_whatsapp_message: bool = False,
+) -> None:
+    """WhatsApp + e-mail de 1 usuário (já liberado pelo gate), conforme o perfil."""
+    u = user
+    prof = _get_or_create_profile(u)
+
+    # WhatsApp
+    if prof.notify_whatsapp:
+        phone_digits = whatsapp_number(prof)
+        if not phone_digits:
+            return
+
+        try:
+            send_whatsapp(user=u, phone_digits=phone_digits, body=message)
+
+            if include_link_as_second_whatsapp_message:
+                send_whatsapp(user=u, phone_digits=phone_digits, body=snap.tracktime_url, kind="url")
+
+        except Exception:
+            # só enfileira (outbox); falha de envio é tratada pelo worker
+            logger.exception(
+                "whatsapp: enqueue failed user_id=%s card_id=%s",
+                u.id, card.id
+            )
+
+
+    # Email
+    if prof.notify_email:
+        to_email = (getattr(u, "email", "") or "").strip()
+        if to_email:
             try:
-                send_whatsapp(user=u, phone_digits=phone_digits, body=message)
-
-                if include_link_as_second_whatsapp_message:
-                    send_whatsapp(user=u, phone_digits=phone_digits, body=snap.tracktime_url)
-
-            except PressTicketError:
-                logger.exception(
-                    "pressticket: send failed (PressTicketError) user_id=%s card_id=%s",
-                    u.id, card.id
-                )
+                # Email com link junto no corpo (não separado em 2 mensagens)
+                body = f"{message}\n\nLink: {snap.tracktime_url}\n"
+                send_email_notification(to_email=to_email, subject=subject, body=body)
             except Exception:
                 logger.exception(
-                    "pressticket: send failed (unexpected) user_id=%s card_id=%s",
-                    u.id, card.id
+                    "email: send failed user_id=%s card_id=%s",
+                    u.id, card.id,
                 )
-
-
-        # Email
-        if prof.notify_email:
-            to_email = (getattr(u, "email", "") or "").strip()
-            if to_email:
-                try:
-                    # Email com link junto no corpo (não separado em 2 mensagens)
-                    body = f"{message}\n\nLink: {snap.tracktime_url}\n"
-                    send_email_notification(to_email=to_email, subject=subject, body=body)
-                except Exception:
-                    logger.exception(
-                        "email: send failed user_id=%s card_id=%s",
-                        u.id, card.id,
-                    )
@@ -0,0 +1,270 @@
+# boards/services/outbox.py
+"""
+Outbox de notificações (WhatsApp/e-mail).
+
+As views não falam com PressTicket/SMTP: só gravam NotificationOutbox
+(enqueue_*), dentro da transação do request — se o request faz rollback, a
+mensagem some junto. O worker (manage.py run_outbox) drena a fila:
+
+- claim_batch(): pega pendentes vencidos (ou "enviando" travados há mais de
+  LEASE_SECONDS — worker morreu no meio) e marca como SENDING, com o lease
+  em locked_by; mark_*() só gravam se o lease ainda é de quem chamou
+- entrega; sucesso => SENT
+- falha => nova tentativa com backoff exponencial (+ jitter); depois de
+  MAX_ATTEMPTS vira DEAD (fica no admin p/ análise / reenvio manual)
+- barrado pelo limitador (rate_limit.RateLimited) => volta p/ a fila em
+  RATE_LIMITED_DELAY_SECONDS sem contar tentativa
+
+settings.NOTIFICATION_OUTBOX_ENABLED = False entrega na hora (dev sem worker).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from boards.models import NotificationOutbox
+from boards.services.mail import build_message, send_messages_batched
+from boards.services.rate_limit import RateLimited, acquire, record_sent
+from tracktime.services.pressticket import get_client
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+LEASE_SECONDS = 5 * 60
+RATE_LIMITED_DELAY_SECONDS = 15
+
+
+def outbox_enabled() -> bool:
+    return bool(getattr(settings, "NOTIFICATION_OUTBOX_ENABLED", True))
+
+
+# ============================================================
+# Enfileirar (views / commands)
+# ============================================================
+def enqueue_whatsapp(*, number: str, body: str, kind: str = "") -> NotificationOutbox | None:
+    return _enqueue(
+        channel=NotificationOutbox.Channel.WHATSAPP,
+        recipient=number,
+        body=body,
+        kind=kind,
+    )
+
+
+def enqueue_email(*, to: str, subject: str, body: str, html_body: str = "", kind: str = "") -> NotificationOutbox | None:
+    return _enqueue(
+        channel=NotificationOutbox.Channel.EMAIL,
+        recipient=to,
+        subject=subject,
+        body=body,
+        html_body=html_body or "",
+        kind=kind,
+    )
+
+
+def _enqueue(**fields) -> NotificationOutbox | None:
+    fields["recipient"] = (fields.get("recipient") or "").strip()
+    fields["subject"] = (fields.get("subject") or "")[:255]
+    fields["kind"] = (fields.get("kind") or "")[:60]
+    if not fields["recipient"]:
+        return None
+
+    item = NotificationOutbox(**fields)
+    if not outbox_enabled():
+        try:
+            deliver(item)
+        except Exception:
+            logger.exception("outbox: entrega imediata falhou channel=%s kind=%s", item.channel, item.kind)
+        return None
+
+    item.save()
+    return item
+
+
+# ============================================================
+# Entrega
+# ============================================================
+def _email_message(item: NotificationOutbox):
+    return build_message(to=item.recipient, subject=item.subject, body=item.body, html_body=item.html_body)
+
+
+def deliver(item: NotificationOutbox) -> None:
+    """Envia 1 item. Levanta exceção em caso de falha (o worker decide o retry)."""
+    if item.channel == NotificationOutbox.Channel.WHATSAPP:
+        get_client().send_text(number=item.recipient, body=item.body)
+        return
+
+    if item.channel == NotificationOutbox.Channel.EMAIL:
+        acquire("email", item.recipient.lower())
+        _email_message(item).send(fail_silently=False)
+        record_sent("email")
+        return
+
+    raise ValueError(f"canal desconhecido: {item.channel!r}")
+
+
+# ============================================================
+# Worker
+# ============================================================
+def backoff_seconds(attempts: int) -> float:
+    base = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return base * random.uniform(0.8, 1.2)
+
+
+def _claimable(now):
+    stale = now - timedelta(seconds=LEASE_SECONDS)
+    return Q(status=NotificationOutbox.Status.PENDING, available_at__lte=now) | Q(
+        status=NotificationOutbox.Status.SENDING, locked_at__lt=stale
+    )
+
+
+def _lease_id() -> str:
+    # único por claim: o mesmo processo que re-pega um item vencido tem outro lease
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def claim_batch(limit: int) -> list[NotificationOutbox]:
+    now = timezone.now()
+    lease = _lease_id()
+    with transaction.atomic():
+        ids = list(
+            NotificationOutbox.objects
+            .filter(_claimable(now))
+            .order_by("id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # reaplica o filtro: outro worker que pegou antes já mudou o status
+        NotificationOutbox.objects.filter(_claimable(now), id__in=ids).update(
+            status=NotificationOutbox.Status.SENDING,
+            locked_at=now,
+            locked_by=lease,
+        )
+    return list(
+        NotificationOutbox.objects
+        .filter(id__in=ids, status=NotificationOutbox.Status.SENDING, locked_by=lease)
+        .order_by("id")
+    )
+
+
+def _release(item: NotificationOutbox, **fields) -> bool:
+    """
+    Grava o resultado só se o item ainda está com o lease deste worker. Lease
+    vencido (outro worker re-pegou o item) => não sobrescreve; retorna False.
+    """
+    updated = NotificationOutbox.objects.filter(
+        pk=item.pk,
+        status=NotificationOutbox.Status.SENDING,
+        locked_by=item.locked_by,
+    ).update(locked_at=None, locked_by="", **fields)
+    if not updated:
+        logger.warning("outbox: lease perdido id=%s lease=%s; resultado descartado", item.id, item.locked_by)
+    return bool(updated)
+
+
+def mark_sent(item: NotificationOutbox) -> None:
+    _release(
+        item,
+        status=NotificationOutbox.Status.SENT,
+        sent_at=timezone.now(),
+        last_error="",
+    )
+
+
+def mark_failed(item: NotificationOutbox, error: Exception | str) -> str:
+    """Agenda nova tentativa (ou DEAD). Retorna o status gravado."""
+    attempts = int(item.attempts or 0) + 1
+    now = timezone.now()
+    if attempts >= MAX_ATTEMPTS:
+        status = NotificationOutbox.Status.DEAD
+        available_at = now
+    else:
+        status = NotificationOutbox.Status.PENDING
+        available_at = now + timedelta(seconds=backoff_seconds(attempts))
+
+    _release(
+        item,
+        status=status,
+        attempts=attempts,
+        available_at=available_at,
+        last_error=str(error)[:2000],
+    )
+    return status
+
+
+def mark_deferred(item: NotificationOutbox) -> None:
+    """Barrado pelo limitador: volta p/ a fila sem gastar tentativa."""
+    _release(
+        item,
+        status=NotificationOutbox.Status.PENDING,
+        available_at=timezone.now() + timedelta(seconds=RATE_LIMITED_DELAY_SECONDS * random.uniform(0.8, 1.2)),
+    )
+
+
+def _is_rate_limited(error) -> bool:
+    return isinstance(error, RateLimited) or isinstance(getattr(error, "__cause__", None), RateLimited)
+
+
+def _record(item: NotificationOutbox, error, stats: dict) -> None:
+    if error is None:
+        mark_sent(item)
+        stats["sent"] += 1
+        return
+
+    if _is_rate_limited(error):
+        mark_deferred(item)
+        stats["deferred"] += 1
+        return
+
+    status = mark_failed(item, error)
+    key = "dead" if status == NotificationOutbox.Status.DEAD else "retry"
+    stats[key] += 1
+    logger.warning(
+        "outbox: falha id=%s channel=%s kind=%s attempt=%s status=%s err=%s",
+        item.id, item.channel, item.kind, item.attempts + 1, status, error,
+    )
+
+
+def process_batch(limit: int = 50) -> dict[str, int]:
+    """
+    Drena até `limit` itens. WhatsApp do lote sai em paralelo pelo cliente
+    com pool (mesmo número continua em ordem); e-mails numa conexão SMTP só
+    por lote (boards/services/mail.py). Retorna contagem por resultado.
+    """
+    stats = {"sent": 0, "retry": 0, "dead": 0, "deferred": 0}
+    items = claim_batch(limit)
+
+    whatsapp = [i for i in items if i.channel == NotificationOutbox.Channel.WHATSAPP]
+    emails = [i for i in items if i.channel == NotificationOutbox.Channel.EMAIL]
+    others = [i for i in items if i.channel not in (NotificationOutbox.Channel.WHATSAPP, NotificationOutbox.Channel.EMAIL)]
+
+    if whatsapp:
+        results = get_client().send_many((i.recipient, i.body) for i in whatsapp)
+        for item, result in zip(whatsapp, results):
+            _record(item, result if isinstance(result, Exception) else None, stats)
+
+    if emails:
+        errors = send_messages_batched([_email_message(i) for i in emails])
+        for item, error in zip(emails, errors):
+            _record(item, error, stats)
+
+    for item in others:
+        try:
+            deliver(item)
+        except Exception as e:
+            _record(item, e, stats)
+            continue
+        _record(item, None, stats)
+
+    return stats
@@ -0,0 +1,219 @@
+# boards/services/rate_limit.py
+"""
+Token bucket (GCRA) para envios externos (WhatsApp/e-mail), guardado no
+cache do Django — com Redis (REDIS_URL) todos os workers do gunicorn e os
+management commands dividem os mesmos baldes.
+
+Cada canal tem 2 baldes: global e por destino (número/e-mail). acquire():
+- cabe agora => segue
+- cabe esperando até max_wait => reserva a vaga e dorme (delayed)
+- não cabe => RateLimited (dropped); a outbox reagenda com backoff. Vagas já
+  reservadas em outro balde da mesma chamada são devolvidas
+
+"sent" só conta entrega confirmada: quem envia chama record_sent() depois
+do sucesso (falha/reagendamento após o acquire não entra).
+
+Config: settings.OUTBOUND_RATE_LIMITS[canal] = {
+    "global_rate": msgs/s, "global_burst": n,
+    "dest_rate": msgs/s, "dest_burst": n,
+    "max_wait": s,
+}
+Canal ausente => sem limite. Contadores: stats().
+"""
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+logger = logging.getLogger(__name__)
+
+STATS_KEYS = ("sent", "delayed", "dropped")
+_LOCK_TIMEOUT = 5
+
+# GCRA atômico no Redis. Guarda o TAT (theoretical arrival time) do balde.
+# Retorna a espera (s) ou -1 se passaria de max_wait (nada é reservado).
+_GCRA_LUA = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local tolerance = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local tat = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+if tat < now then tat = now end
+local wait = (tat - tolerance) - now
+if wait < 0 then wait = 0 end
+if wait > max_wait then return '-1' end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now + tolerance) * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+# Devolve 1 vaga reservada (acquire falhou num balde seguinte).
+_REFUND_LUA = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+local new_tat = tat - interval
+if new_tat <= now then
+  redis.call('DEL', KEYS[1])
+else
+  redis.call('SET', KEYS[1], tostring(new_tat), 'KEEPTTL')
+end
+return 1
+"""
+
+
+class RateLimited(RuntimeError):
+    pass
+
+
+def _limits(channel: str) -> dict | None:
+    return (getattr(settings, "OUTBOUND_RATE_LIMITS", None) or {}).get(channel)
+
+
+def _redis():
+    # `cache` é um proxy; o backend de verdade está em caches["default"]
+    if "django_redis" not in type(caches["default"]).__module__:
+        return None
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+    except Exception:
+        return None
+
+
+def _reserve_redis(conn, key: str, now: float, interval: float, tolerance: float, max_wait: float) -> float:
+    raw = conn.eval(_GCRA_LUA, 1, cache.make_key(key), now, interval, tolerance, max_wait)
+    return float(raw.decode() if isinstance(raw, bytes) else raw)
+
+
+@contextmanager
+def _cache_lock(key: str):
+    # sem Redis: mutex via cache.add (LocMem já é por processo)
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + 1.0
+    while not cache.add(lock_key, 1, timeout=_LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            break  # lock órfão: segue sem ele
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        cache.delete(lock_key)
+
+
+def _reserve_cache(key: str, now: float, interval: float, tolerance: float, max_wait: float) -> float:
+    with _cache_lock(key):
+        tat = max(float(cache.get(key) or now), now)
+        wait = max(0.0, (tat - tolerance) - now)
+        if wait > max_wait:
+            return -1.0
+        new_tat = tat + interval
+        cache.set(key, new_tat, timeout=int(new_tat - now + tolerance) + 2)
+        return wait
+
+
+def _refund_cache(key: str, now: float, interval: float) -> None:
+    with _cache_lock(key):
+        tat = cache.get(key)
+        if tat is None:
+            return
+        new_tat = float(tat) - interval
+        if new_tat <= now:
+            cache.delete(key)
+        else:
+            cache.set(key, new_tat, timeout=int(new_tat - now) + 2)
+
+
+def _refund(key: str, rate: float) -> None:
+    interval = 1.0 / float(rate)
+    now = time.time()
+
+    conn = _redis()
+    if conn is not None:
+        try:
+            conn.eval(_REFUND_LUA, 1, cache.make_key(key), now, interval)
+            return
+        except Exception:
+            logger.warning("rate_limit: redis indisponível; usando cache local", exc_info=True)
+    _refund_cache(key, now, interval)
+
+
+def _reserve(key: str, rate: float, burst: int, max_wait: float) -> float:
+    interval = 1.0 / float(rate)
+    tolerance = interval * max(0, int(burst) - 1)
+    now = time.time()
+
+    conn = _redis()
+    if conn is not None:
+        try:
+            return _reserve_redis(conn, key, now, interval, tolerance, max_wait)
+        except Exception:
+            logger.warning("rate_limit: redis indisponível; usando cache local", exc_info=True)
+    return _reserve_cache(key, now, interval, tolerance, max_wait)
+
+
+def _count(channel: str, name: str) -> None:
+    key = f"rl:stats:{channel}:{name}"
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except Exception:
+        pass
+
+
+def acquire(channel: str, destination: str = "", *, max_wait: float | None = None) -> float:
+    """
+    Pede 1 vaga no canal (global + destino). Dorme o necessário e retorna a
+    espera (s); levanta RateLimited se precisaria esperar mais que max_wait.
+    """
+    cfg = _limits(channel)
+    if not cfg:
+        return 0.0
+
+    if max_wait is None:
+        max_wait = float(cfg.get("max_wait", 10))
+
+    wait = 0.0
+    buckets = []
+    if cfg.get("dest_rate") and destination:
+        buckets.append((f"rl:{channel}:dest:{destination}", cfg["dest_rate"], cfg.get("dest_burst", 1)))
+    if cfg.get("global_rate"):
+        buckets.append((f"rl:{channel}:global", cfg["global_rate"], cfg.get("global_burst", 1)))
+
+    reserved = []
+    for key, rate, burst in buckets:
+        w = _reserve(key, rate, burst, max_wait)
+        if w < 0:
+            # nada foi enviado: devolve o que já tinha reservado (ex.: destino
+            # reservado e o global estourou) p/ não gastar a vaga do destinatário
+            for k, r in reserved:
+                _refund(k, r)
+            _count(channel, "dropped")
+            raise RateLimited(f"limite de envio atingido ({channel}, {key.rsplit(':', 1)[-1]})")
+        reserved.append((key, rate))
+        wait = max(wait, w)
+
+    if wait > 0:
+        _count(channel, "delayed")
+        time.sleep(wait)
+    return wait
+
+
+def record_sent(channel: str) -> None:
+    """Conta 1 entrega confirmada no canal (chamar depois do envio dar certo)."""
+    _count(channel, "sent")
+
+
+def stats(channel: str | None = None) -> dict:
+    channels = [channel] if channel else sorted((getattr(settings, "OUTBOUND_RATE_LIMITS", None) or {}).keys())
+    out = {}
+    for ch in channels:
+        values = cache.get_many([f"rl:stats:{ch}:{n}" for n in STATS_KEYS])
+        out[ch] = {n: int(values.get(f"rl:stats:{ch}:{n}") or 0) for n in STATS_KEYS}
+    return out
@@ -0,0 +1,328 @@
+# boards/services/search_index.py
+"""
+Índice de busca FTS5 (SQLite) — 1 documento por card.
+
+Tabela virtual boards_card_fts (rowid = card.id) com as colunas:
+title, description, tags, attachments, checklists, activity.
+
+- tokenizer unicode61 remove_diacritics 2: "manutencao" acha "Manutenção"
+- mantido pelos signals (boards/signals.py) após o commit
+- visibilidade (excluído/arquivado/coluna/board) NÃO fica no índice: a busca
+  faz JOIN com boards_card/boards_column, então arquivar/excluir não reindexa
+- rebuild completo: python manage.py rebuild_search_index
+
+boards_user_fts (rowid = user.id: handle, display_name, name, email) é o
+índice das @menções, com o mesmo tokenizer.
+
+Se o banco não for SQLite (ou não tiver FTS5), is_available() devolve False
+e as views usam o caminho antigo (icontains) — que diferencia acento:
+"manutencao" não acha "Manutenção" sem o índice.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from collections import defaultdict
+from typing import Iterable
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+from boards.models import Card, CardAttachment, CardLog, Checklist, ChecklistItem, UserProfile
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "boards_card_fts"
+FTS_COLUMNS = ("title", "description", "tags", "attachments", "checklists", "activity")
+
+USER_FTS_TABLE = "boards_user_fts"
+USER_FTS_COLUMNS = ("handle", "display_name", "name", "email")
+
+# peso por coluna no bm25 (mesma ordem de FTS_COLUMNS)
+BM25_WEIGHTS = (10.0, 4.0, 6.0, 2.0, 2.0, 1.0)
+
+# coluna do índice -> "match_in" que o front já conhece (home_board_search.js)
+MATCH_IN = {
+    "title": "title",
+    "description": "description",
+    "tags": "tags",
+    "attachments": "attachment",
+    "checklists": "checklist",
+    "activity": "activity",
+}
+
+SNIPPET_TOKENS = 16
+REBUILD_BATCH = 500
+
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+_RE_TERM = re.compile(r"\w+", flags=re.UNICODE)
+
+_available: bool | None = None
+
+
+def create_fts_table(conn) -> bool:
+    """
+    Cria as tabelas virtuais (usado pelo rebuild_search_index). Retorna
+    False se o banco não suportar FTS5 — a busca segue no fallback.
+    """
+    global _available
+    _available = None
+
+    if conn.vendor != "sqlite":
+        return False
+
+    try:
+        with conn.cursor() as cur:
+            for table, columns in ((FTS_TABLE, FTS_COLUMNS), (USER_FTS_TABLE, USER_FTS_COLUMNS)):
+                cur.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                    f"USING fts5({', '.join(columns)}, tokenize = 'unicode61 remove_diacritics 2')"
+                )
+    except Exception:
+        logger.warning("search_index: FTS5 indisponível; busca usa icontains", exc_info=True)
+        return False
+    return True
+
+
+def is_available() -> bool:
+    global _available
+    if _available is None:
+        if connection.vendor != "sqlite":
+            _available = False
+        else:
+            with connection.cursor() as cur:
+                cur.execute(
+                    "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s)", [FTS_TABLE, USER_FTS_TABLE]
+                )
+                _available = cur.fetchone()[0] == 2
+    return _available
+
+
+# ============================================================
+# Documento
+# ============================================================
+def _text(html_or_text) -> str:
+    return " ".join(strip_tags(html_or_text or "").split())
+
+
+def _documents(card_ids: list[int]) -> dict[int, tuple]:
+    cards = Card.all_objects.filter(id__in=card_ids).values_list("id", "title", "description", "tags")
+
+    attachments = defaultdict(list)
+    for card_id, name, desc in CardAttachment.objects.filter(card_id__in=card_ids).values_list(
+        "card_id", "file", "description"
+    ):
+        attachments[card_id].append(" ".join(p for p in ((name or "").split("/")[-1], desc or "") if p))
+
+    checklists = defaultdict(list)
+    for card_id, title in Checklist.objects.filter(card_id__in=card_ids).values_list("card_id", "title"):
+        checklists[card_id].append(title or "")
+    for card_id, text in ChecklistItem.objects.filter(card_id__in=card_ids).values_list("card_id", "text"):
+        checklists[card_id].append(text or "")
+
+    activity = defaultdict(list)
+    for card_id, text, html in (
+        CardLog.objects.filter(card_id__in=card_ids)
+        .order_by("created_at")
+        .values_list("card_id", "content_text", "content")
+    ):
+        activity[card_id].append(text or _text(html))
+
+    return {
+        cid: (
+            title or "",
+            _text(desc),
+            tags or "",
+            "\n".join(attachments[cid]),
+            "\n".join(checklists[cid]),
+            "\n".join(activity[cid]),
+        )
+        for cid, title, desc, tags in cards
+    }
+
+
+def reindex_cards(card_ids: Iterable[int]) -> None:
+    ids = sorted({int(i) for i in card_ids if i})
+    if not ids or not is_available():
+        return
+
+    docs = _documents(ids)
+    placeholders = ", ".join(["%s"] * len(ids))
+    cols = ", ".join(FTS_COLUMNS)
+    values = ", ".join(["%s"] * (len(FTS_COLUMNS) + 1))
+
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", ids)
+        if docs:
+            cur.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, {cols}) VALUES ({values})",
+                [(cid, *doc) for cid, doc in docs.items()],
+            )
+
+
+def schedule_reindex(card_id) -> None:
+    """Reindexa o card depois do commit (chamado pelos signals)."""
+    if card_id and is_available():
+        transaction.on_commit(lambda: _safe_reindex([card_id]))
+
+
+def _safe_reindex(card_ids) -> None:
+    # índice nunca derruba a escrita; rebuild_search_index corrige depois
+    try:
+        reindex_cards(card_ids)
+    except Exception:
+        logger.warning("search_index: falha ao reindexar cards=%s", card_ids, exc_info=True)
+
+
+def rebuild() -> int:
+    if not is_available():
+        return 0
+
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE}")
+        cur.execute(f"DELETE FROM {USER_FTS_TABLE}")
+
+    total = 0
+    ids = list(Card.all_objects.order_by("id").values_list("id", flat=True))
+    for i in range(0, len(ids), REBUILD_BATCH):
+        chunk = ids[i : i + REBUILD_BATCH]
+        reindex_cards(chunk)
+        total += len(chunk)
+
+    user_ids = list(get_user_model().objects.order_by("id").values_list("id", flat=True))
+    for i in range(0, len(user_ids), REBUILD_BATCH):
+        reindex_users(user_ids[i : i + REBUILD_BATCH])
+    return total
+
+
+# ============================================================
+# Usuários (@menções)
+# ============================================================
+def reindex_users(user_ids: Iterable[int]) -> None:
+    ids = sorted({int(i) for i in user_ids if i})
+    if not ids or not is_available():
+        return
+
+    profiles = {
+        user_id: (handle, display_name)
+        for user_id, handle, display_name in UserProfile.objects.filter(user_id__in=ids).values_list(
+            "user_id", "handle", "display_name"
+        )
+    }
+    docs = []
+    for uid, first, last, email in get_user_model().objects.filter(id__in=ids).values_list(
+        "id", "first_name", "last_name", "email"
+    ):
+        handle, display_name = profiles.get(uid, ("", ""))
+        docs.append((uid, handle or "", display_name or "", f"{first or ''} {last or ''}".strip(), email or ""))
+
+    placeholders = ", ".join(["%s"] * len(ids))
+    cols = ", ".join(USER_FTS_COLUMNS)
+    values = ", ".join(["%s"] * (len(USER_FTS_COLUMNS) + 1))
+
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {USER_FTS_TABLE} WHERE rowid IN ({placeholders})", ids)
+        if docs:
+            cur.executemany(f"INSERT INTO {USER_FTS_TABLE} (rowid, {cols}) VALUES ({values})", docs)
+
+
+def schedule_user_reindex(user_id) -> None:
+    """Reindexa o usuário depois do commit (signals de User/UserProfile)."""
+    if user_id and is_available():
+        transaction.on_commit(lambda: _safe_reindex_users([user_id]))
+
+
+def _safe_reindex_users(user_ids) -> None:
+    try:
+        reindex_users(user_ids)
+    except Exception:
+        logger.warning("search_index: falha ao reindexar users=%s", user_ids, exc_info=True)
+
+
+# ============================================================
+# Consulta
+# ============================================================
+def match_expression(q: str) -> str:
+    """
+    Texto livre -> expressão MATCH: todos os termos (AND), cada um como
+    prefixo ("manut"*). Aspas/operadores do usuário viram texto.
+
+    Casa início de palavra, não trecho no meio dela (o icontains casava):
+    "manut" acha "Manutenção", "tencao" não.
+    """
+    terms = _RE_TERM.findall(q or "")
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def matching_user_ids(q: str) -> RawSQL | None:
+    """
+    Subquery com os ids de usuário que casam com `q` (p/ id__in=...), pelo
+    índice — "joao" acha "João". None se `q` não tem termo.
+    """
+    expr = match_expression(q)
+    if not expr:
+        return None
+    return RawSQL(f"SELECT rowid FROM {USER_FTS_TABLE} WHERE {USER_FTS_TABLE} MATCH %s", [expr])
+
+
+def _visible_sql(board_ids: list[int]) -> tuple[str, list]:
+    placeholders = ", ".join(["%s"] * len(board_ids))
+    sql = (
+        f"FROM {FTS_TABLE} "
+        f"JOIN boards_card c ON c.id = {FTS_TABLE}.rowid "
+        "JOIN boards_column col ON col.id = c.column_id "
+        f"WHERE {FTS_TABLE} MATCH %s "
+        "AND c.is_deleted = 0 AND c.is_archived = 0 AND col.is_deleted = 0 "
+        f"AND col.board_id IN ({placeholders}) "
+    )
+    return sql, list(board_ids)
+
+
+def search_cards(q: str, *, board_ids: Iterable[int], limit: int | None = None) -> list[dict]:
+    """
+    Cards visíveis dos boards informados que casam com `q`, do mais
+    relevante (bm25) para o menos. Cada item: id, column_id, match_in, excerpt.
+    """
+    expr = match_expression(q)
+    board_ids = [int(b) for b in board_ids]
+    if not expr or not board_ids:
+        return []
+
+    where, params = _visible_sql(board_ids)
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    snippets = ", ".join(
+        f"snippet({FTS_TABLE}, {i}, %s, %s, '…', {SNIPPET_TOKENS})"
+        for i in range(len(FTS_COLUMNS))
+    )
+    sql = (
+        f"SELECT c.id, c.column_id, {snippets} "
+        + where
+        + f"ORDER BY bm25({FTS_TABLE}, {weights}), c.id DESC"
+    )
+    snippet_params = [_MARK_START, _MARK_END] * len(FTS_COLUMNS)
+    all_params = snippet_params + [expr] + params
+    if limit:
+        sql += " LIMIT %s"
+        all_params.append(int(limit))
+
+    with connection.cursor() as cur:
+        cur.execute(sql, all_params)
+        rows = cur.fetchall()
+
+    results = []
+    for card_id, column_id, *snips in rows:
+        match_in, excerpt = "card", ""
+        for name, snip in zip(FTS_COLUMNS, snips):
+            if snip and _MARK_START in snip:
+                match_in, excerpt = MATCH_IN[name], snip
+                break
+        results.append({
+            "id": card_id,
+            "column_id": column_id,
+            "match_in": match_in,
+            "excerpt": excerpt.replace(_MARK_START, "").replace(_MARK_END, ""),
+        })
+    return results
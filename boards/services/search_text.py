@@ -0,0 +1,29 @@
+# boards/services/search_text.py
+"""
+Normalização para comparar texto: NFKD, sem acentos, minúsculo, espaços
+colapsados.
+
+"Manutenção  Preventiva" -> "manutencao preventiva"
+
+A busca de cards e as @menções usam os índices FTS5 (que já ignoram
+acento); isto cobre as comparações feitas em Python: o campo e o trecho
+(excerpt) de cada resultado da busca.
+"""
+from __future__ import annotations
+
+import unicodedata
+
+from django.utils.html import strip_tags
+
+
+def normalize_search_text(*parts, html: bool = False) -> str:
+    chunks = []
+    for p in parts:
+        if not p:
+            continue
+        s = strip_tags(str(p)) if html else str(p)
+        chunks.append(s)
+
+    s = unicodedata.normalize("NFKD", " ".join(chunks))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.casefold().split())
@@ -0,0 +1,158 @@
+# boards/services/unread.py
+"""
+Atividade não lida por card (badges do board).
+
+Não lido = CardLog de OUTRA pessoa criado depois de
+max(CardSeen.last_seen_at, BoardActivityReadState.last_seen_at) do usuário
+(sem nenhum dos dois => tudo conta). CardSeen = "abri o card";
+BoardActivityReadState = "abri o histórico do board" (marca d'água).
+
+Leitura: UnreadCounter (fan-out na escrita) — 1 lookup por (user, card),
+não importa o tamanho do histórico:
+- fan_out_log(): CardLog novo => +1 para cada membro do board, menos o autor
+  (ou recomeça em 1 se o contador é anterior à marca d'água do board)
+- mark_card_read(): CardSeen já gravado pela view; zera o contador do card
+- mark_board_read(): 1 upsert na marca d'água; contadores com
+  last_log_at <= marca valem 0 na leitura (nada mais é escrito)
+- membro novo: rebuild_user_counters() semeia o histórico que ele ainda não
+  viu (signal de BoardMembership), como era antes dos contadores
+
+compute_unread_counts_by_card() é a conta "de verdade" a partir do
+CardLog/CardSeen/BoardActivityReadState (1 query agrupada); usada para
+reconstruir os contadores (manage.py rebuild_unread_counters).
+"""
+from __future__ import annotations
+
+from django.db.models import Case, Count, F, FilteredRelation, Max, OuterRef, Q, Subquery, Value, When
+from django.utils import timezone
+
+from boards.models import BoardActivityReadState, BoardMembership, Card, CardLog, UnreadCounter
+
+
+def board_watermark(user, board):
+    """last_seen_at do histórico do board (ou None)."""
+    return (
+        BoardActivityReadState.objects
+        .filter(board=board, user=user)
+        .values_list("last_seen_at", flat=True)
+        .first()
+    )
+
+
+def unread_counts_by_card(user, board) -> dict[int, int]:
+    qs = UnreadCounter.objects.filter(
+        user=user,
+        count__gt=0,
+        card__column__board=board,
+        card__is_deleted=False,
+    )
+    watermark = board_watermark(user, board)
+    if watermark:
+        qs = qs.filter(last_log_at__gt=watermark)
+    return {card_id: n for card_id, n in qs.values_list("card_id", "count")}
+
+
+def fan_out_log(log: CardLog) -> None:
+    board_id = (
+        Card.all_objects
+        .filter(id=log.card_id)
+        .values_list("column__board_id", flat=True)
+        .first()
+    )
+    if not board_id:
+        return
+
+    members = BoardMembership.objects.filter(board_id=board_id)
+    if log.actor_id:
+        members = members.exclude(user_id=log.actor_id)
+    user_ids = list(members.values_list("user_id", flat=True))
+    if not user_ids:
+        return
+
+    # quem já tem linha: +1 num UPDATE só — ou recomeça em 1 se o contador é
+    # de antes da marca d'água do board (aquilo já foi lido pelo histórico)
+    watermark = Subquery(
+        BoardActivityReadState.objects
+        .filter(board_id=board_id, user_id=OuterRef("user_id"))
+        .values("last_seen_at")[:1]
+    )
+    UnreadCounter.objects.filter(card_id=log.card_id, user_id__in=user_ids).update(
+        count=Case(
+            When(last_log_at__lte=watermark, then=Value(1)),
+            default=F("count") + 1,
+        ),
+        last_log_at=log.created_at,
+    )
+
+    existing = set(
+        UnreadCounter.objects
+        .filter(card_id=log.card_id, user_id__in=user_ids)
+        .values_list("user_id", flat=True)
+    )
+    missing = [uid for uid in user_ids if uid not in existing]
+    if missing:
+        UnreadCounter.objects.bulk_create(
+            [
+                UnreadCounter(user_id=uid, card_id=log.card_id, count=1, last_log_at=log.created_at)
+                for uid in missing
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def mark_card_read(user, card) -> None:
+    UnreadCounter.objects.filter(user=user, card=card, count__gt=0).update(count=0)
+
+
+def mark_board_read(user, board, *, at=None) -> None:
+    """Marca o board inteiro como lido: 1 linha, qualquer que seja o tamanho do board."""
+    BoardActivityReadState.objects.update_or_create(
+        board=board,
+        user=user,
+        defaults={"last_seen_at": at or timezone.now()},
+    )
+
+
+def _unread_logs(user, board):
+    # `user` pode ser instância ou id
+    qs = (
+        CardLog.objects
+        .filter(card__column__board=board, card__is_deleted=False)
+        .exclude(actor=user)
+        .annotate(seen=FilteredRelation("card__cardseen", condition=Q(card__cardseen__user=user)))
+        .filter(Q(seen__last_seen_at__isnull=True) | Q(created_at__gt=F("seen__last_seen_at")))
+    )
+    watermark = board_watermark(user, board)
+    if watermark:
+        qs = qs.filter(created_at__gt=watermark)
+    return qs.order_by().values("card_id")
+
+
+def compute_unread_counts_by_card(user, board) -> dict[int, int]:
+    rows = _unread_logs(user, board).annotate(n=Count("id")).values_list("card_id", "n")
+    return {card_id: n for card_id, n in rows}
+
+
+def rebuild_user_counters(user_id, board) -> int:
+    """Recalcula os contadores de 1 membro do board. Retorna quantas linhas gravou."""
+    rows = (
+        _unread_logs(user_id, board)
+        .annotate(n=Count("id"), last=Max("created_at"))
+        .values_list("card_id", "n", "last")
+    )
+    counters = [
+        UnreadCounter(user_id=user_id, card_id=cid, count=n, last_log_at=last)
+        for cid, n, last in rows
+    ]
+
+    UnreadCounter.objects.filter(user_id=user_id, card__column__board=board).delete()
+    UnreadCounter.objects.bulk_create(counters, batch_size=500)
+    return len(counters)
+
+
+def rebuild_board_counters(board) -> int:
+    """Recalcula os contadores de todos os membros do board. Retorna quantas linhas gravou."""
+    written = 0
+    for user_id in BoardMembership.objects.filter(board=board).values_list("user_id", flat=True):
+        written += rebuild_user_counters(user_id, board)
+    return written
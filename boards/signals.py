@@ -4,10 +4,13 @@ import re
 
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError, transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import UserProfile
+from .models import BoardMembership, Card, CardAttachment, CardLog, Checklist, ChecklistItem, UserProfile
+from .services.board_access import invalidate_visible_boards
+from .services.search_index import schedule_reindex, schedule_user_reindex
+from .services.unread import fan_out_log, rebuild_user_counters
 
 DEFAULT_AVATARS = [
     "avatar1.jpeg",
@@ -111,3 +114,76 @@ def ensure_profile_on_user_create(sender, instance, created, **kwargs):
         except IntegrityError:
             # colisão rara de handle em concorrência; tenta de novo
             continue
+
+
+# ============================================================
+# Índice de busca (FTS5): reindexa o card depois do commit
+# ============================================================
+_CARD_SEARCH_FIELDS = {"title", "description", "tags"}
+
+
+@receiver(post_save, sender=Card)
+def reindex_card_on_save(sender, instance, created, update_fields=None, **kwargs):
+    # move/arquivar/versão não mudam o texto do card
+    if update_fields is not None and not (set(update_fields) & _CARD_SEARCH_FIELDS):
+        return
+    schedule_reindex(instance.pk)
+
+
+@receiver(post_delete, sender=Card)
+def unindex_card_on_delete(sender, instance, **kwargs):
+    schedule_reindex(instance.pk)  # card sumiu => reindex só remove
+
+
+@receiver(post_save, sender=CardLog)
+@receiver(post_delete, sender=CardLog)
+@receiver(post_save, sender=Checklist)
+@receiver(post_delete, sender=Checklist)
+@receiver(post_save, sender=ChecklistItem)
+@receiver(post_delete, sender=ChecklistItem)
+@receiver(post_save, sender=CardAttachment)
+@receiver(post_delete, sender=CardAttachment)
+def reindex_card_on_child_change(sender, instance, **kwargs):
+    schedule_reindex(getattr(instance, "card_id", None))
+
+
+# índice das @menções: nome/e-mail (User) e handle/display_name (UserProfile)
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def reindex_user_on_change(sender, instance, **kwargs):
+    schedule_user_reindex(instance.pk)  # usuário sumiu => reindex só remove
+
+
+@receiver(post_save, sender=UserProfile)
+def reindex_user_on_profile_save(sender, instance, **kwargs):
+    schedule_user_reindex(instance.user_id)
+
+
+# ============================================================
+# Não lidos (fan-out na escrita): CardLog novo => +1 p/ os outros membros
+# ============================================================
+@receiver(post_save, sender=CardLog)
+def fan_out_unread_on_log(sender, instance, created, **kwargs):
+    if created:
+        fan_out_log(instance)
+
+
+# ============================================================
+# Boards visíveis (cache por usuário): membership mudou => recalcula
+# ============================================================
+@receiver(post_save, sender=BoardMembership)
+@receiver(post_delete, sender=BoardMembership)
+def invalidate_visible_boards_on_membership(sender, instance, **kwargs):
+    invalidate_visible_boards(instance.user_id)
+
+
+# ============================================================
+# Não lidos: membro novo vê o histórico do board como não lido
+# (fan_out_log só alcança quem já era membro quando o log foi criado)
+# ============================================================
+@receiver(post_save, sender=BoardMembership)
+def seed_unread_counters_on_join(sender, instance, created, **kwargs):
+    if not created:
+        return
+    user_id, board_id = instance.user_id, instance.board_id
+    transaction.on_commit(lambda: rebuild_user_counters(user_id, board_id))
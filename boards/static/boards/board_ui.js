@@ -279,106 +279,10 @@ window.applySavedTermColorsToBoard = function (scope) {
 
 
 // ============================================================
-// VIEWER LIVE REFRESH (sem websocket): atualiza columns-list sem F5
+// VIEWER LIVE REFRESH: o stream SSE + delta (modal/board.poll.js) atualiza
+// columns-list para todos (inclusive viewers); aqui só reaplica o readonly
 // ============================================================
-
-function startViewerPolling() {
-  if (window.__boardPollInstalled) return;
-  window.__boardPollInstalled = true;
-
-  const getColumnsList = () => document.getElementById("columns-list");
-  let lastHtml = (getColumnsList()?.innerHTML || "");
-
-  function hasOpenInlineForms(rootEl) {
-    // evita “apagar” o form do +Card / criar condição de corrida
-    return !!rootEl.querySelector(
-      "[id^='form-col-'] form, [id^='form-top-col-'] form"
-    );
-  }
-
-  function hasHtmxRequestInFlight(rootEl) {
-    // HTMX marca elementos envolvidos com .htmx-request
-    return !!rootEl.querySelector(".htmx-request");
-  }
-
-  async function tick() {
-    // se agora virou editor/owner, não precisa mais
-    if (boardCanEditNow()) return;
-
-    // evita briga visual se o editor estiver arrastando
-    if (window.__isDraggingCard) return;
-
-    const columnsList = getColumnsList();
-    if (!columnsList) return;
-
-    // não “atropela” interação do usuário
-    if (hasHtmxRequestInFlight(columnsList)) return;
-    if (hasOpenInlineForms(columnsList)) return;
-
-    try {
-      const res = await fetch(window.location.pathname, {
-        method: "GET",
-        credentials: "same-origin",
-        headers: {
-          "X-Requested-With": "XMLHttpRequest",
-          "X-Board-Poll": "1",
-        },
-      });
-
-      if (!res.ok) return;
-
-      const html = await res.text();
-      const doc = new DOMParser().parseFromString(html, "text/html");
-      const fresh = doc.getElementById("columns-list");
-      if (!fresh) return;
-
-      const nextHtml = fresh.innerHTML;
-      if (nextHtml === lastHtml) return;
-
-      // troca só o miolo das colunas/cards
-      columnsList.innerHTML = nextHtml;
-      lastHtml = nextHtml;
-
-      // >>> PONTO-CHAVE: reprocessa HTMX nos nós inseridos via innerHTML
-      if (window.htmx && typeof window.htmx.process === "function") {
-        window.htmx.process(columnsList);
-      }
-
-      // re-aplica comportamentos que dependem do DOM novo
-      applyReadonlyUI();
-      scanAndBind();
-
-      if (typeof window.applySavedTermColorsToBoard === "function") {
-        window.applySavedTermColorsToBoard(columnsList);
-      }
-
-
-      if (window.applySavedTagColorsToBoard) {
-        window.applySavedTagColorsToBoard(columnsList);
-      }
-
-
-      // se existirem no global, reinit de sortable (p/ owner em outra sessão)
-      if (typeof window.initSortable === "function") window.initSortable();
-      if (typeof window.initSortableColumns === "function") window.initSortableColumns();
-    } catch (_e) {
-      // silencioso
-    }
-  }
-
-  tick();
-
-  // seu relato é “10s”; aqui está 10s (ajuste se quiser outro ritmo)
-  setInterval(tick, 10000);
-
-  // se algum swap acontecer localmente, atualiza o baseline
-  document.body.addEventListener("htmx:afterSwap", () => {
-    lastHtml = (getColumnsList()?.innerHTML || lastHtml);
-  });
-  document.body.addEventListener("htmx:afterSettle", () => {
-    lastHtml = (getColumnsList()?.innerHTML || lastHtml);
-  });
-}
+document.addEventListener("board:synced", applyReadonlyUI);
 
 
 
@@ -603,6 +507,7 @@ document.body.addEventListener("htmx:afterSwap", (e) => {
   document.addEventListener("DOMContentLoaded", scanAndBind);
   document.body.addEventListener("htmx:afterSwap", scanAndBind);
   document.body.addEventListener("htmx:afterSettle", scanAndBind);
+  document.addEventListener("board:synced", scanAndBind);
 })();
 
 //ALTERAR NOME DA COLUNA
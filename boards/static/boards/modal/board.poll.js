@@ -1,6 +1,8 @@
 // boards/static/boards/modal/board.poll.js
 // ============================================================
 // BOARD POLLING — sincroniza colunas/cards entre usuários (A1)
+// - Stream SSE (/board/<id>/events/) avisa a nova versão => tick imediato
+// - Sem stream (WSGI / browser antigo / erro): cai no loop por tempo
 // - Não faz swap com modal aberto / drag / foco em input
 // - Rehidrata JS (HTMX + Sortable + TagColors) após swap
 // - Garante “bootstrap” no load (resolve o caso: só funciona após abrir/fechar modal)
@@ -78,6 +80,10 @@ const UNREAD_FETCH_EVERY_MS = 150000; // 30s é mais que suficiente para     atu
 
   let inFlight = false;
 
+  // stream SSE: enquanto estiver vivo, o loop não busca o board à toa
+  let streamLive = false;
+  let pendingVersion = 0;
+
   // version local (fallback: body attr)
   let boardVersion = Number(document.body?.dataset?.boardVersion || window.BOARD_VERSION || 0);
 
@@ -87,6 +93,56 @@ const UNREAD_FETCH_EVERY_MS = 150000; // 30s é mais que suficiente para     atu
     hydrate(list || document);
   }
 
+  function htmlToNode(html) {
+    const tpl = document.createElement("template");
+    tpl.innerHTML = String(html || "").trim();
+    return tpl.content.firstElementChild;
+  }
+
+  // ============================================================
+  // DELTA — aplica só os fragmentos que o servidor mandou
+  // - data.columns: {colId: html} => troca a coluna inteira
+  // - data.cards:   {cardId: html} => troca só o <li> do card
+  // - data.order:   [colId...]     => reordena / remove colunas
+  // ============================================================
+  function applyDelta(list, data) {
+    Object.entries(data.columns || {}).forEach(([colId, html]) => {
+      const node = htmlToNode(html);
+      if (!node) return;
+
+      const current = list.querySelector(`.column-item[data-column-id="${colId}"]`);
+      if (current) current.replaceWith(node);
+      else list.appendChild(node);
+    });
+
+    Object.entries(data.cards || {}).forEach(([cardId, html]) => {
+      const current = list.querySelector(`li[data-card-id="${cardId}"]`);
+      if (!current) return;
+
+      const node = htmlToNode(html);
+      if (node) current.replaceWith(node);
+    });
+
+    const order = (data.order || []).map(String);
+    const alive = new Set(order);
+
+    list.querySelectorAll(".column-item[data-column-id]").forEach((el) => {
+      if (!alive.has(String(el.dataset.columnId))) el.remove();
+    });
+
+    order.forEach((colId) => {
+      const el = list.querySelector(`.column-item[data-column-id="${colId}"]`);
+      if (el) list.appendChild(el);
+    });
+
+    if (data.aggregator) {
+      const node = htmlToNode(data.aggregator);
+      const current = list.querySelector(".aggregator-column");
+      if (node && current) current.replaceWith(node);
+      else if (node) list.prepend(node);
+    }
+  }
+
   async function tick() {
     const boardId = getBoardId();
     if (!boardId) return;
@@ -102,6 +158,8 @@ const UNREAD_FETCH_EVERY_MS = 150000; // 30s é mais que suficiente para     atu
     tickTrackTimeBadges(boardId);
 
 
+    if (streamLive && pendingVersion <= boardVersion) return;
+
     if (shouldPause()) return;
     if (inFlight) return;
 
@@ -123,10 +181,15 @@ const UNREAD_FETCH_EVERY_MS = 150000; // 30s é mais que suficiente para     atu
       // ✅ BLOQUEIO FINAL (race): se modal abriu DURANTE o request, não faz swap
       if (window.Modal?.state?.isOpen) return;
 
-      if (!data.html || !String(data.html).trim()) return;
-
-      // swap completo do bloco (o elemento antigo “morre”)
-      list.outerHTML = data.html;
+      if (data.html && String(data.html).trim()) {
+        // swap completo do bloco (o elemento antigo “morre”)
+        list.outerHTML = data.html;
+      } else if (Array.isArray(data.order)) {
+        // delta: só colunas/cards que mudaram desde boardVersion
+        applyDelta(list, data);
+      } else {
+        return;
+      }
 
       // atualiza versão local
       boardVersion = Number(data.version || boardVersion);
@@ -135,6 +198,11 @@ const UNREAD_FETCH_EVERY_MS = 150000; // 30s é mais que suficiente para     atu
       // pega o novo nó e rehidrata
       const newList = getColumnsList();
       hydrate(newList || document);
+      try { if (window.updateAggregatorCounts) window.updateAggregatorCounts(); } catch (_) {}
+      try {
+        if (window.applySavedTermColorsToBoard) window.applySavedTermColorsToBoard(newList || document);
+      } catch (_) {}
+      document.dispatchEvent(new CustomEvent("board:synced", { detail: { version: boardVersion } }));
     } catch (_e) {
       // silencioso
     } finally {
@@ -149,6 +217,31 @@ const UNREAD_FETCH_EVERY_MS = 150000; // 30s é mais que suficiente para     atu
     }, POLL_MS);
   }
 
+  // ============================================================
+  // SSE — servidor empurra "board na versão V"; o conteúdo continua
+  // vindo do delta do /poll/. 204 (servidor sem ASGI) fecha o stream
+  // e o loop acima volta a ser o único caminho.
+  // ============================================================
+  function startStream(boardId) {
+    if (!boardId || typeof window.EventSource !== "function") return;
+
+    const es = new EventSource(`/board/${boardId}/events/?v=${boardVersion}`);
+
+    es.addEventListener("open", () => { streamLive = true; });
+
+    es.addEventListener("version", (e) => {
+      let v = 0;
+      try { v = Number(JSON.parse(e.data).version || 0); } catch (_) {}
+      if (!v || v <= boardVersion) return;
+
+      pendingVersion = Math.max(pendingVersion, v);
+      tick();
+    });
+
+    // reconectando (retry do servidor) ou fechado: o loop assume até o próximo "open"
+    es.addEventListener("error", () => { streamLive = false; });
+  }
+
   // ---- BOOTSTRAP / RESUME POINTS ----
 
   // 1) DOM pronto
@@ -163,7 +256,8 @@ const UNREAD_FETCH_EVERY_MS = 150000; // 30s é mais que suficiente para     atu
   syncUnreadBadge(boardId);
   syncCardUnreadBadges(boardId);
 
-  // depois entra no loop normal
+  // stream de mudanças + loop normal (fallback)
+  startStream(boardId);
   loop();
 });
 
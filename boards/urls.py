@@ -20,7 +20,8 @@ from .views import cards as cards_views
 from .views import checklists as checklist_views
 from .views import calendar as calendar_views
 from .views.mentions import board_mentions
-from .views.polling import board_poll
+from .views.polling import board_poll, board_changes
+from .views.events import board_events
 
 from boards.views.modal_card_term import set_card_term_due, set_board_term_colors
 
@@ -249,6 +250,8 @@ urlpatterns = [
     # BOARDS — POLLING (sincronização leve)
     # ============================================================
     path("board/<int:board_id>/poll/", board_poll, name="board_poll"),
+    path("board/<int:board_id>/events/", board_events, name="board_events"),
+    path("board/<int:board_id>/changes/", board_changes, name="board_changes"),
 
     # ============================================================
     # BOARDS — PRAZOS (term due + cores do board)
@@ -414,6 +417,7 @@ urlpatterns = [
     # HISTÓRICO / NÃO LIDOS
     # ============================================================
     path("board/<int:board_id>/history/", views.board_history_modal, name="board_history_modal"),
+    path("board/<int:board_id>/history/page/", views.board_history_page, name="board_history_page"),
     path("board/<int:board_id>/history/unread-count/", views.board_history_unread_count, name="board_history_unread_count"),
 ]
 # END file boards/urls.py
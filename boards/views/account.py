@@ -170,6 +170,9 @@ def account_profile_update(request):
         prof.notify_email = False
         update_fields.append("notify_email")
 
+    prof.notify_digest = ("notify_digest" in request.POST)
+    update_fields.append("notify_digest")
+
 
     # ... depois de activity_sidebar / activity_counts
 
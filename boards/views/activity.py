@@ -11,12 +11,13 @@ from django.db.models import Prefetch
 from django.utils import timezone
 
 from ..permissions import can_edit_board
+from boards.services.board_version import bump_board_version
+from boards.services.unread import unread_counts_by_card
 from ..models import (
     Board,
     Card,
     CardAttachment,
     CardLog,
-    CardSeen,
 )
 from .helpers import (
     _actor_html,
@@ -185,8 +186,7 @@ def add_activity(request, card_id):
         attachment=None,
     )
 
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
     # menções: usa TEXTO (mais estável); fallback para HTML se necessário
     try:
@@ -299,29 +299,7 @@ def cards_unread_activity(request, board_id):
     if not board.memberships.filter(user=request.user).exists():
         return JsonResponse({"cards": {}})
 
-    # mapa: card_id -> last_seen_at
-    seen_map = {
-        cs.card_id: cs.last_seen_at
-        for cs in CardSeen.objects.filter(
-            user=request.user,
-            card__column__board=board,
-        )
-    }
-
-    # logs que NÃO são do próprio usuário (mais correto que procurar email no conteúdo)
-    logs = (
-        CardLog.objects
-        .filter(card__column__board=board)
-        .exclude(actor=request.user)
-    )
-
-    counts = {}
-
-    for log in logs.select_related("card"):
-        last_seen = seen_map.get(log.card_id)
-        if last_seen and log.created_at <= last_seen:
-            continue
-
-        counts[log.card_id] = counts.get(log.card_id, 0) + 1
+    # 1 query agrupada (logs de outras pessoas após o meu last_seen_at)
+    counts = unread_counts_by_card(request.user, board)
 
     return JsonResponse({"cards": counts})
@@ -9,6 +9,7 @@ from django.utils.html import strip_tags
 from urllib3 import request
 
 from ..permissions import can_edit_board
+from boards.services.board_version import bump_board_version
 from ..models import Card, CardAttachment
 from .helpers import (
     _actor_label,
@@ -50,8 +51,7 @@ def delete_attachment(request, card_id, attachment_id):
 
     attachment.delete()
 
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
     if desc:
         _log_card(
@@ -95,8 +95,7 @@ def add_attachment(request, card_id):
         description=desc,
     )
 
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
     pretty_name = attachment.file.name.split("/")[-1]
     if desc:
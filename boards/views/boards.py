@@ -2,6 +2,7 @@
 
 import os
 import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
 import requests
 import hashlib
 import random
@@ -41,7 +42,6 @@ from ..models import (
     BoardGroupItem,
     BoardAccessRequest,
     Card,
-    CardSeen,
     CardFollow,
 )
 
@@ -55,6 +55,10 @@ from .helpers import (
 )
 
 from .helpers import Board, Column, Card, BoardMembership, Organization
+from boards.services.board_version import bump_board_version
+from boards.services.outbox import enqueue_email
+from boards.services.unread import mark_board_read, unread_counts_by_card
+from .polling import with_card_count
 
 
 def _get_home_org(request):
@@ -332,8 +336,7 @@ def board_detail(request, board_id):
     board = get_object_or_404(Board, id=board_id, is_deleted=False)
 
     columns = (
-        board.columns
-        .filter(is_deleted=False)
+        with_card_count(board.columns.filter(is_deleted=False))
         .order_by("position")
         .prefetch_related(
             Prefetch(
@@ -457,10 +460,8 @@ def board_detail(request, board_id):
         if last_seen:
             qs = qs.filter(created_at__gt=last_seen)
 
-        # ignora ações do próprio usuário
-        actor_label = _actor_label(request)
-        if actor_label:
-            qs = qs.exclude(content__icontains=actor_label)
+        # ignora ações do próprio usuário (logs sem autor contam)
+        qs = qs.exclude(actor=request.user)
 
         unread_activity_count = qs.count()
 
@@ -470,12 +471,8 @@ def board_detail(request, board_id):
     unread_by_card = {}
 
     if request.user.is_authenticated:
-        data = (
-            qs.values("card_id")
-            .annotate(c=models.Count("id"))
-            .values_list("card_id", "c")
-        )
-        unread_by_card = {card_id: c for card_id, c in data}
+        # contadores mantidos na escrita (UnreadCounter): 1 lookup indexado
+        unread_by_card = unread_counts_by_card(request.user, board)
     # ============================================================
     # FOLLOWING POR CARD (BOOTSTRAP INICIAL)
     # ============================================================
@@ -1125,16 +1122,14 @@ def board_share(request, board_id):
         except Exception:
             html_body = None
 
-        msg = EmailMultiAlternatives(
+        # envio pelo worker (run_outbox): o request não espera o SMTP
+        enqueue_email(
+            to=user.email,
             subject=subject,
             body=text_body,
-            from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None),
-            to=[user.email],
+            html_body=html_body or "",
+            kind="board_invite",
         )
-        if html_body:
-            msg.attach_alternative(html_body, "text/html")
-
-        msg.send(fail_silently=False)
 
     except Exception:
         email_failed = True
@@ -1318,11 +1313,7 @@ def transfer_owner_confirm(request, board_id):
         if owners_count <= 0:
             raise ValueError("Board ficou sem OWNER (violação de regra).")
 
-        try:
-            board.version = int(getattr(board, "version", 0) or 0) + 1
-            board.save(update_fields=["version"])
-        except Exception:
-            pass
+        bump_board_version(board)
 
         _log_board(
             board,
@@ -1369,57 +1360,6 @@ def create_user(request):
 # POLLING / COLUNAS
 # ======================================================================
 
-@login_required
-def board_poll(request, board_id):
-    board = get_object_or_404(Board, id=board_id, is_deleted=False)
-
-    client_version = int(request.GET.get("v", 0))
-
-    if board.version == client_version:
-        return JsonResponse({"changed": False})
-
-    columns = (
-        board.columns
-        .filter(is_deleted=False)
-        .order_by("position")
-        .prefetch_related(
-            Prefetch(
-                "cards",
-                queryset=Card.objects.filter(is_archived=False).order_by("position", "id"),
-            )
-        )
-    )
-
-    # ============================================================
-    # FOLLOWING POR CARD (POLL)
-    # ============================================================
-    followed_ids = set(
-        CardFollow.objects
-        .filter(user=request.user, card__column__board=board)
-        .values_list("card_id", flat=True)
-    )
-
-    try:
-        for col in columns:
-            for c in col.cards.all():
-                c.is_following = (c.id in followed_ids)
-    except Exception:
-        pass
-
-
-    html = render_to_string(
-        "boards/partials/columns_block.html",
-        {"columns": columns},
-        request=request,
-    )
-
-    return JsonResponse({
-        "changed": True,
-        "version": board.version,
-        "html": html,
-    })
-
-
 @login_required
 def toggle_aggregator_column(request, board_id):
     board = get_object_or_404(Board, id=board_id, is_deleted=False)
@@ -1428,8 +1368,7 @@ def toggle_aggregator_column(request, board_id):
     board.save(update_fields=["show_aggregator_column"])
 
     columns = (
-        board.columns
-        .filter(is_deleted=False)
+        with_card_count(board.columns.filter(is_deleted=False))
         .order_by("position")
         .prefetch_related(
             Prefetch(
@@ -1454,6 +1393,48 @@ def toggle_aggregator_column(request, board_id):
 # HISTÓRICO / NÃO LIDOS
 # ======================================================================
 
+HISTORY_PAGE_SIZE = 50
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _history_cursor(log) -> str:
+    # "<created_at em µs desde a época>-<id>"
+    ts = (log.created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{ts}-{log.id}"
+
+
+def _parse_history_cursor(raw):
+    try:
+        ts, log_id = (raw or "").split("-", 1)
+        created_at = _EPOCH + timedelta(microseconds=int(ts))
+        return created_at, int(log_id)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _history_page(board, cursor):
+    """
+    Página do histórico em keyset por (created_at, id), do mais novo p/ o mais
+    antigo. Retorna (logs, próximo cursor ou None).
+    """
+    qs = (
+        CardLog.objects
+        .filter(card__column__board=board, card__is_deleted=False)
+        .select_related("card", "card__column")
+        .order_by("-created_at", "-id")
+    )
+    if cursor is not None:
+        created_at, log_id = cursor
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=log_id))
+
+    # 1 a mais só para saber se existe próxima página
+    logs = list(qs[: HISTORY_PAGE_SIZE + 1])
+    if len(logs) > HISTORY_PAGE_SIZE:
+        logs = logs[:HISTORY_PAGE_SIZE]
+        return logs, _history_cursor(logs[-1])
+    return logs, None
+
+
 @login_required
 @require_http_methods(["GET"])
 def board_history_modal(request, board_id):
@@ -1463,47 +1444,41 @@ def board_history_modal(request, board_id):
     if memberships_qs.exists() and not memberships_qs.filter(user=request.user).exists():
         return HttpResponse("Você não tem acesso a este quadro.", status=403)
 
-    logs = (
-        CardLog.objects
-        .filter(card__column__board=board, card__is_deleted=False)
-        .select_related("card", "card__column")
-        .order_by("-created_at")[:500]
+    logs, next_cursor = _history_page(board, None)
+
+    # Ao abrir o histórico: marca o quadro inteiro como lido (histórico + badges
+    # dos cards) — 1 upsert na marca d'água, sem tocar nos CardSeen
+    mark_board_read(request.user, board)
+
+    return render(
+        request,
+        "boards/partials/board_history_modal.html",
+        {"board": board, "logs": logs, "next_cursor": next_cursor},
     )
 
-    # Ao abrir o histórico: marca como lido (zera contagem do histórico)
-    now = timezone.now()
-    st, _created = BoardActivityReadState.objects.get_or_create(board=board, user=request.user)
-    st.last_seen_at = now
-    st.save(update_fields=["last_seen_at", "updated_at"])
 
-    # ✅ NOVA REGRA: ao abrir o histórico, zera também as notificações dos CARDS do quadro
-    cards_qs = Card.objects.filter(column__board=board, is_deleted=False).only("id")
-    card_ids = list(cards_qs.values_list("id", flat=True))
+@login_required
+@require_http_methods(["GET"])
+def board_history_page(request, board_id):
+    """Próxima página do histórico (scroll infinito); não marca nada como lido."""
+    board = get_object_or_404(Board, id=board_id, is_deleted=False)
 
-    if card_ids:
-        # atualiza os já existentes
-        CardSeen.objects.filter(user=request.user, card_id__in=card_ids).update(last_seen_at=now)
+    memberships_qs = board.memberships.all()
+    if memberships_qs.exists() and not memberships_qs.filter(user=request.user).exists():
+        return HttpResponse("Você não tem acesso a este quadro.", status=403)
 
-        # cria os que não existem ainda (para realmente zerar tudo)
-        existing_ids = set(
-            CardSeen.objects.filter(user=request.user, card_id__in=card_ids)
-            .values_list("card_id", flat=True)
-        )
-        missing_ids = [cid for cid in card_ids if cid not in existing_ids]
-        if missing_ids:
-            CardSeen.objects.bulk_create(
-                [CardSeen(card_id=cid, user=request.user, last_seen_at=now) for cid in missing_ids],
-                ignore_conflicts=True,
-            )
+    cursor = _parse_history_cursor(request.GET.get("before"))
+    if cursor is None:
+        return HttpResponseBadRequest("Cursor inválido.")
 
+    logs, next_cursor = _history_page(board, cursor)
     return render(
         request,
-        "boards/partials/board_history_modal.html",
-        {"board": board, "logs": logs},
+        "boards/partials/board_history_rows.html",
+        {"board": board, "logs": logs, "next_cursor": next_cursor},
     )
 
 
-
 @login_required
 @require_http_methods(["GET"])
 def board_history_unread_count(request, board_id):
@@ -1525,10 +1500,8 @@ def board_history_unread_count(request, board_id):
     if last_seen:
         qs = qs.filter(created_at__gt=last_seen)
 
-    # 🔴 REGRA-CHAVE: ignora logs do próprio usuário
-    actor_label = _actor_label(request)
-    if actor_label:
-        qs = qs.exclude(content__icontains=actor_label)
+    # 🔴 REGRA-CHAVE: ignora logs do próprio usuário (pelo autor gravado no log)
+    qs = qs.exclude(actor=request.user)
 
     return JsonResponse({"unread": qs.count()})
 
@@ -10,6 +10,7 @@ from django.utils.dateparse import parse_date
 
 from ..models import Card
 from .cards import _user_can_edit_board
+from boards.services.board_version import bump_board_version
 
 from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseForbidden
 from django.views.decorators.http import require_POST
@@ -309,9 +310,7 @@ def card_calendar_date_update(request, card_id):
             _log_card(card, request, html)
 
         # (recomendado) version bump p/ polling/sync
-        if hasattr(board, "version"):
-            board.version += 1
-            board.save(update_fields=["version"])
+        bump_board_version(board, cards=[card])
 
     return JsonResponse({"ok": True})
 
@@ -16,7 +16,6 @@ from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import UploadedFile
 from django.db import transaction
-from django.db.models import F
 from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.template.loader import render_to_string
@@ -37,6 +36,15 @@ from .helpers import (
 
 # Mantido por compatibilidade com o projeto
 from ..permissions import can_edit_board  # noqa: F401
+from boards.services.board_version import bump_board_version
+from boards.services.unread import mark_card_read
+from boards.services.card_positions import (
+    POSITION_GAP,
+    card_index,
+    position_after,
+    position_at,
+    position_at_end,
+)
 
 from ..forms import CardForm
 from ..models import Board, BoardMembership, Card, CardAttachment, Column, CardSeen
@@ -107,17 +115,15 @@ def add_card(request, column_id):
             card.column = column
 
             if where == "top":
-                Card.objects.filter(column=column).update(position=F("position") + 1)
-                card.position = 0
+                card.position = position_at(column, 0)
             else:
-                card.position = column.cards.count()
+                card.position = position_at_end(column)
 
             card.save()
 
             board = card.column.board
 
-            board.version += 1
-            board.save(update_fields=["version"])
+            bump_board_version(board, columns=[column], cards=[card], op="create")
 
             try:
                 process_mentions_and_notify(
@@ -505,8 +511,7 @@ def update_card(request, card_id):
     # ============================================================
     # VERSION
     # ============================================================
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
     # ============================================================
     # FALLBACK (só se nada relevante mudou)
@@ -570,6 +575,7 @@ def edit_card(request, card_id):
         form = CardForm(request.POST, request.FILES, instance=card)
         if form.is_valid():
             form.save()
+            bump_board_version(card.column.board, cards=[card])
 
             actor = _actor_label(request)
             _log_card(card, request, f"<p><strong>{actor}</strong> editou o card (modal antigo).</p>")
@@ -597,9 +603,7 @@ def delete_card(request, card_id):
         card.is_deleted = True
         card.deleted_at = timezone.now()
         card.save(update_fields=["is_deleted", "deleted_at"])
-        board = card.column.board
-        board.version += 1
-        board.save(update_fields=["version"])
+        bump_board_version(card.column.board, columns=[card.column_id], cards=[card], op="delete")
     return HttpResponse("", status=200)
 
 
@@ -618,9 +622,7 @@ def archive_card(request, card_id):
         card.archived_at = timezone.now()
         card.save(update_fields=["is_archived", "archived_at"])
 
-        board = card.column.board
-        board.version += 1
-        board.save(update_fields=["version"])
+        bump_board_version(card.column.board, columns=[card.column_id], cards=[card], op="archive")
 
     return HttpResponse("", status=200)
 
@@ -640,9 +642,7 @@ def unarchive_card(request, card_id):
         card.archived_at = None
         card.save(update_fields=["is_archived", "archived_at"])
 
-        board = card.column.board
-        board.version += 1
-        board.save(update_fields=["version"])
+        bump_board_version(card.column.board, columns=[card.column_id], cards=[card], op="unarchive")
 
     return HttpResponse("", status=200)
 
@@ -665,15 +665,8 @@ def restore_card(request, card_id):
         card.is_archived = False
         card.archived_at = None
 
-        # coloca no fim da coluna (entre ativos não-arquivados)
-        from django.db.models import Max
-        last_pos = (
-            Card.objects
-            .filter(column=card.column, is_archived=False)
-            .aggregate(m=Max("position"))
-            .get("m")
-        )
-        card.position = int(last_pos or 0) + 1
+        # coloca no fim da coluna
+        card.position = position_at_end(card.column)
 
         card.save(update_fields=[
             "is_deleted", "deleted_at",
@@ -683,9 +676,7 @@ def restore_card(request, card_id):
 
         _log_card(card, request, f"<p><strong>{actor}</strong> restaurou este card da lixeira.</p>")
 
-        board = card.column.board
-        board.version += 1
-        board.save(update_fields=["version"])
+        bump_board_version(card.column.board, columns=[card.column_id], cards=[card], op="restore")
 
     return HttpResponse("", status=200)
 
@@ -723,40 +714,21 @@ def move_card(request):
         return _deny_read_only(request, as_json=True)
 
     actor = _actor_label(request)
-    old_pos = int(card.position or 0)
+    old_pos = card_index(card)
+
+    # clamp (índice 0-based entre os cards visíveis do destino, sem o movido)
+    new_position = max(0, min(new_position, new_column.cards.exclude(id=card.id).count()))
 
     # ============================================================
-    # 1) MOVER DENTRO DA MESMA COLUNA (CORRIGIDO)
+    # 1) MOVER DENTRO DA MESMA COLUNA
+    # posições esparsas: grava só o card movido (ver card_positions)
     # ============================================================
     if old_column.id == new_column.id:
-        # cards exceto o movido
-        siblings = list(
-            old_column.cards
-            .exclude(id=card.id)
-            .order_by("position")
-        )
-
-        # clamp
-        if new_position < 0:
-            new_position = 0
-        if new_position > len(siblings):
-            new_position = len(siblings)
-
-        # reindexa os outros cards
-        for index, c in enumerate(siblings):
-            if index >= new_position:
-                c.position = index + 1
-            else:
-                c.position = index
-            c.save(update_fields=["position"])
-
-        # salva o card movido isoladamente
-        card.position = new_position
+        card.position = position_at(old_column, new_position, exclude_card_id=card.id)
         card.save(update_fields=["position"])
 
         # versão do board
-        old_board.version += 1
-        old_board.save(update_fields=["version"])
+        bump_board_version(old_board, columns=[old_column], cards=[card], op="move")
 
         _log_card(
             card,
@@ -771,53 +743,19 @@ def move_card(request):
         return JsonResponse({"status": "ok"})
 
     # ============================================================
-    # 2) MOVER PARA OUTRA COLUNA (ESTÁVEL)
+    # 2) MOVER PARA OUTRA COLUNA
+    # a coluna antiga só "perde" o card (buraco não atrapalha a ordem)
     # ============================================================
-
-    # reindexa coluna antiga
-    old_cards = list(
-        old_column.cards
-        .exclude(id=card.id)
-        .order_by("position")
-    )
-
-    for index, c in enumerate(old_cards):
-        if int(c.position or 0) != index:
-            c.position = index
-            c.save(update_fields=["position"])
-
-    # move card para nova coluna
     card.column = new_column
-    card.save(update_fields=["column"])
-
-    # cards da nova coluna (sem o card)
-    new_cards = list(
-        new_column.cards
-        .exclude(id=card.id)
-        .order_by("position")
-    )
+    card.position = position_at(new_column, new_position, exclude_card_id=card.id)
+    card.save(update_fields=["column", "position"])
 
-    # clamp
-    if new_position < 0:
-        new_position = 0
-    if new_position > len(new_cards):
-        new_position = len(new_cards)
-
-    # reindexa nova coluna
-    for index, c in enumerate(new_cards):
-        if index >= new_position:
-            c.position = index + 1
-        else:
-            c.position = index
-        c.save(update_fields=["position"])
-
-    # posiciona o card
-    card.position = new_position
-    card.save(update_fields=["position"])
-
-    # versão do board destino
-    new_board.version += 1
-    new_board.save(update_fields=["version"])
+    # versão do board destino (e do de origem, se o card trocou de quadro)
+    if old_board.id != new_board.id:
+        bump_board_version(old_board, columns=[old_column], cards=[card], op="move")
+        bump_board_version(new_board, columns=[new_column], cards=[card], op="move")
+    else:
+        bump_board_version(new_board, columns=[old_column, new_column], cards=[card], op="move")
 
     _log_card(
         card,
@@ -882,14 +820,16 @@ def card_move_options(request, card_id):
             for c in cols
         ]
 
+    current_index = card_index(card)
+
     payload = {
         "current": {
             "board_id": board_current.id,
             "board_name": board_current.name,
             "column_id": card.column.id,
             "column_name": card.column.name,
-            "position": int(card.position or 0),         # 0-based (para o select)
-            "position_display": int(card.position or 0) + 1,  # 1-based (para mostrar na UI)
+            "position": current_index,             # 0-based (para o select)
+            "position_display": current_index + 1,  # 1-based (para mostrar na UI)
         },
         "boards": [{"id": b.id, "name": b.name} for b in uniq],
         "columns_by_board": columns_by_board,
@@ -960,6 +900,7 @@ def card_modal(request, card_id):
         user=request.user,
         defaults={"last_seen_at": timezone.now()},
     )
+    mark_card_read(request.user, card)
 
     # ✅ LOGS ORDENADOS (mais novos primeiro)
     logs = card.logs.order_by("-created_at")
@@ -990,15 +931,8 @@ def duplicate_card(request, card_id):
 
     actor = _actor_label(request)
 
-    # posição: duplicata entra logo abaixo do card atual
-    new_position = int(card.position or 0) + 1
-
-    # empurra pra baixo quem está >= new_position
-    Card.objects.filter(
-        column=column,
-        is_deleted=False,
-        position__gte=new_position,
-    ).update(position=F("position") + 1)
+    # posição: duplicata entra logo abaixo do card atual (sem empurrar os outros)
+    new_position = position_after(card)
 
     # cria a cópia (mantém campos importantes)
     base_title = (card.title or "").strip()
@@ -1056,6 +990,8 @@ def duplicate_card(request, card_id):
         ),
     )
 
+    bump_board_version(board, columns=[column], cards=[new_card], op="create")
+
     # devolve snippet pronto pro front inserir no DOM
     snippet_html = render_to_string(
         "boards/partials/card_item.html",
@@ -1101,9 +1037,7 @@ def remove_tag(request, card_id):
 
     card.tags = ", ".join(new_tags)
     card.save(update_fields=["tags"])
-    board = card.column.board
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(card.column.board, cards=[card])
     _log_card(card, request, f"<p><strong>{actor}</strong> removeu a etiqueta <strong>{escape(tag)}</strong>.</p>")
 
     modal_html = _render_card_modal(request, card, _card_modal_context(card)).content.decode("utf-8")
@@ -1140,9 +1074,7 @@ def set_tag_color(request, card_id):
     data[tag] = color
     card.tag_colors = json.dumps(data, ensure_ascii=False)
     card.save(update_fields=["tag_colors"])
-    board = card.column.board
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(card.column.board, cards=[card])
     tags_bar = render_to_string(
         "boards/partials/card_tags_bar.html",
         {"card": card},
@@ -1266,9 +1198,7 @@ def set_card_cover(request, card_id):
     # ============================================================
     card.cover_image = f
     card.save(update_fields=["cover_image"])
-    board = card.column.board
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(card.column.board, cards=[card])
     # pega rel da nova
     new_rel = ""
     try:
@@ -1365,9 +1295,7 @@ def remove_card_cover(request, card_id):
     # só zera o campo (sem deletar arquivo)
     card.cover_image = None
     card.save(update_fields=["cover_image"])
-    board = card.column.board
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(card.column.board, cards=[card])
     try:
         if old_rel:
             old_url = default_storage.url(old_rel)
@@ -1405,7 +1333,7 @@ def card_snippet(request, card_id):
 @require_POST
 @transaction.atomic
 def reorder_cards_in_column(request, column_id: int):
-    """Persiste a ordem dos cards da coluna (position 0..N-1)."""
+    """Persiste a ordem dos cards da coluna (position espaçada: GAP, 2*GAP, ...)."""
     try:
         data = json.loads(request.body.decode("utf-8"))
     except Exception:
@@ -1436,18 +1364,17 @@ def reorder_cards_in_column(request, column_id: int):
 
     cards_by_id = {c.id: c for c in cards_qs}
     changed = []
-    for idx, cid in enumerate(normalized):
+    for idx, cid in enumerate(normalized, start=1):
         card = cards_by_id[cid]
-        if int(card.position or 0) != idx:
-            card.position = idx
+        if int(card.position or 0) != idx * POSITION_GAP:
+            card.position = idx * POSITION_GAP
             changed.append(card)
 
     if changed:
         Card.objects.bulk_update(changed, ["position"])
 
         # Atualiza versão do board para polling refletir mudança (mesma estratégia de criação/movimento)
-        board.version += 1
-        board.save(update_fields=["version"])  # padrão usado no fluxo de escrita :contentReference[oaicite:3]{index=3}
+        bump_board_version(board, columns=[column], op="reorder")
 
     return JsonResponse({"ok": True})
 
@@ -10,6 +10,7 @@ from django.db import transaction
 
 from .helpers import _actor_label, _log_card
 from ..permissions import can_edit_board
+from boards.services.board_version import bump_board_version
 from ..models import Card, Checklist, ChecklistItem
 
 
@@ -57,8 +58,7 @@ def checklists_reorder(request, card_id):
         return JsonResponse({"ok": False, "error": "Checklist fora do card."}, status=400)
 
     with transaction.atomic():
-        board.version += 1
-        board.save(update_fields=["version"])
+        bump_board_version(board, cards=[card])
 
         for idx, cid in enumerate(order):
             Checklist.objects.filter(id=cid, card=card).update(position=idx)
@@ -127,8 +127,7 @@ def checklist_items_reorder(request, card_id):
             ChecklistItem.objects.bulk_update(
                 changed, ["checklist_id", "position"]
             )
-            board.version += 1
-            board.save(update_fields=["version"])
+            bump_board_version(board, cards=[card])
 
     actor = _actor_label(request)
     _log_card(
@@ -161,8 +160,7 @@ def checklist_add(request, card_id):
     position = card.checklists.count()
 
     checklist = Checklist.objects.create(card=card, title=title, position=position)
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
 
     _log_card(card, request, f"<p><strong>{actor}</strong> criou a checklist <strong>{checklist.title}</strong>.</p>")
@@ -189,8 +187,7 @@ def checklist_rename(request, checklist_id):
 
     checklist.title = title
     checklist.save(update_fields=["title"])
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
 
     _log_card(card, request, f"<p><strong>{actor}</strong> renomeou a checklist de <strong>{old_title}</strong> para <strong>{title}</strong>.</p>")
@@ -212,8 +209,7 @@ def checklist_delete(request, checklist_id):
     actor = _actor_label(request)
     title = checklist.title
     checklist.delete()
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
 
     for idx, c in enumerate(card.checklists.order_by("position", "created_at")):
@@ -244,8 +240,7 @@ def checklist_add_item(request, checklist_id):
 
     position = checklist.items.count()
     item = ChecklistItem.objects.create(card=card, checklist=checklist, text=text, position=position)
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
 
     _log_card(card, request, f"<p><strong>{actor}</strong> adicionou item na checklist <strong>{checklist.title}</strong>: {item.text}.</p>")
@@ -268,8 +263,7 @@ def checklist_toggle_item(request, item_id):
 
     item.is_done = not item.is_done
     item.save(update_fields=["is_done"])
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
 
     status = "concluiu" if item.is_done else "reabriu"
@@ -294,8 +288,7 @@ def checklist_delete_item(request, item_id):
     text = item.text
     checklist = item.checklist
     item.delete()
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
 
     if checklist:
@@ -328,8 +321,7 @@ def checklist_update_item(request, item_id):
 
     item.text = text
     item.save(update_fields=["text"])
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
 
     _log_card(card, request, f"<p><strong>{actor}</strong> editou um item da checklist de {old} para {text}.</p>")
@@ -388,8 +380,7 @@ def checklist_move(request, checklist_id):
         checklists.insert(new_index, moved)
 
         with transaction.atomic():
-            board.version += 1
-            board.save(update_fields=["version"])
+            bump_board_version(board, cards=[card])
 
             for idx, c in enumerate(checklists):
                 if c.position != idx:
@@ -448,8 +439,7 @@ def _checklist_move_item_delta(request, item_id, delta: int):
     b = items[new_idx]
 
     with transaction.atomic():
-        board.version += 1
-        board.save(update_fields=["version"])
+        bump_board_version(board, cards=[card])
 
         a_pos = a.position
         b_pos = b.position
@@ -10,6 +10,7 @@ from django.db import transaction
 from django.utils import timezone
 from django.utils.html import escape
 
+from boards.services.board_version import bump_board_version
 from ..forms import ColumnForm
 from .helpers import (
     # mantém só helpers/models que realmente estão em helpers.py
@@ -35,8 +36,7 @@ def add_column(request, board_id):
             column.board = board
             column.position = board.columns.count()
             column.save()
-            board.version += 1
-            board.save(update_fields=["version"])
+            bump_board_version(board, columns=[column], op="create")
 
 
             actor = _actor_label(request)
@@ -70,9 +70,7 @@ def set_column_theme(request, column_id):
     column.theme = theme
     column.save(update_fields=["theme"])
 
-    board = column.board
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(column.board, columns=[column])
 
     actor = _actor_label(request)
     _log_board(
@@ -108,8 +106,7 @@ def reorder_columns(request, board_id):
         for idx, cid in enumerate(order):
             Column.objects.filter(id=cid, board=board).update(position=idx)
 
-        board.version += 1
-        board.save(update_fields=["version"])
+        bump_board_version(board, op="reorder")
 
 
     actor = _actor_label(request)
@@ -134,8 +131,7 @@ def rename_column(request, column_id):
     
     column.name = name
     column.save(update_fields=["name"])
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, columns=[column])
     
     for c in Card.objects.filter(column=column, is_deleted=False):
         _log_card(
@@ -185,8 +181,7 @@ def delete_column(request, column_id):
     column.is_deleted = True
     column.deleted_at = now
     column.save(update_fields=["is_deleted", "deleted_at"])
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, columns=[column], op="delete")
 
     Card.objects.filter(column=column, is_deleted=False).update(is_deleted=True, deleted_at=now)
     return HttpResponse("")
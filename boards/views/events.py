@@ -0,0 +1,104 @@
+# boards/views/events.py
+"""
+Stream SSE de mudanças do board (substitui o polling por tempo).
+
+O stream só avisa "o board está na versão V"; o cliente continua buscando o
+delta em /board/<id>/poll/?v=... — assim a renderização/permissão dos
+fragmentos fica num lugar só.
+
+Precisa rodar sob ASGI (nossotrello/asgi.py). Sob WSGI (runserver/gunicorn
+sync) o Django bufferiza o iterador async inteiro, então respondemos 204 —
+EventSource para de reconectar e o JS cai no polling.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+from ..models import Board
+from boards.services.board_events import subscribe_board_version
+
+HEARTBEAT_SECONDS = 20
+STREAM_MAX_SECONDS = 300   # recicla a conexão; o browser reconecta sozinho
+RETRY_MS = 3000
+
+
+def _can_view(user, board) -> bool:
+    if hasattr(board, "user_can_view"):
+        return bool(board.user_can_view(user))
+    return board.memberships.filter(user=user).exists()
+
+
+def _event(version: int) -> str:
+    return f"id: {version}\nevent: version\ndata: {json.dumps({'version': version})}\n\n"
+
+
+async def _stream(board_id: int, last_version: int):
+    yield f"retry: {RETRY_MS}\n\n"
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_MAX_SECONDS
+
+    # assina ANTES de ler a versão: nada que mude no meio se perde
+    async with subscribe_board_version(board_id) as queue:
+        current = await (
+            Board.objects.filter(id=board_id)
+            .values_list("version", flat=True)
+            .afirst()
+        )
+        if current is None:
+            return
+
+        version = int(current or 0)
+        if version != last_version:
+            yield _event(version)
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+
+            try:
+                new_version = await asyncio.wait_for(
+                    queue.get(), timeout=min(HEARTBEAT_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+
+            if new_version > version:
+                version = new_version
+                yield _event(version)
+
+
+async def board_events(request, board_id):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "unauthorized"}, status=401)
+
+    board = await Board.objects.filter(id=board_id).afirst()
+    if not board:
+        return JsonResponse({"error": "not found"}, status=404)
+
+    if not await sync_to_async(_can_view)(user, board):
+        return JsonResponse({"error": "forbidden"}, status=403)
+
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    # versão que o cliente já tem: reconexão (Last-Event-ID) ou ?v=
+    raw = request.headers.get("Last-Event-ID") or request.GET.get("v") or 0
+    try:
+        last_version = int(raw)
+    except (TypeError, ValueError):
+        last_version = 0
+
+    resp = StreamingHttpResponse(
+        _stream(board.id, last_version),
+        content_type="text/event-stream",
+    )
+    resp["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+    resp["X-Accel-Buffering"] = "no"  # nginx: não bufferiza o stream
+    return resp
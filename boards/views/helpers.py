@@ -1,6 +1,7 @@
 # boards/views/helpers.py
 import base64
 import json
+from html import unescape as html_unescape
 import logging
 import os
 import re
@@ -23,7 +24,9 @@ from django.urls import reverse
 from django.utils import timezone
 from django.utils.html import escape
 
+from boards.services.digest import wants_digest
 from boards.services.notifications import send_whatsapp
+from boards.services.outbox import enqueue_email
 from ..models import (
     Board,
     BoardMembership,
@@ -34,6 +37,7 @@ from ..models import (
     ChecklistItem,
     Column,
     Mention,
+    NotificationDigestItem,
     Organization,
     OrganizationMembership,
     UserProfile,
@@ -351,7 +355,8 @@ def _resolve_users_counts_from_mentions(text: str):
     if not counts:
         return {}
 
-    users = UserModel.objects.filter(id__in=list(counts.keys()), is_active=True)
+    # profile junto: wants_digest() lê user.profile de cada mencionado
+    users = UserModel.objects.filter(id__in=list(counts.keys()), is_active=True).select_related("profile")
     return {u: counts.get(u.id, 0) for u in users if getattr(u, "email", None)}
 
 def _send_mention_email(request, mentioned_user, actor_user, board, card, mention):
@@ -372,7 +377,7 @@ def _send_mention_email(request, mentioned_user, actor_user, board, card, mentio
         subject = f"Nova marcação em: {board.name}"
         body = f"Você foi marcado por {actor_name}.\n\nQuadro: {board.name}\nCard: {card.title}\n\nLink: {url}"
 
-        send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [to_email], fail_silently=True)
+        enqueue_email(to=to_email, subject=subject, body=body, kind="mention")
     except Exception:
         pass
 
@@ -426,8 +431,8 @@ def _send_mention_whatsapp(request, mentioned_user, actor_user, board, card, men
             "🔥 Bora dar uma olhada? 👇👀"
         )
 
-        send_whatsapp(user=mentioned_user, phone_digits=phone_digits, body=msg)
-        send_whatsapp(user=mentioned_user, phone_digits=phone_digits, body=url)
+        send_whatsapp(user=mentioned_user, phone_digits=phone_digits, body=msg, kind="mention_message")
+        send_whatsapp(user=mentioned_user, phone_digits=phone_digits, body=url, kind="mention_url")
 
     except Exception:
         # Não derruba fluxo
@@ -455,69 +460,109 @@ def process_mentions_and_notify(*, request, board, card, source, raw_text):
     user_counts = _resolve_users_counts_from_mentions(raw_text or "")
     current_user_ids = set(u.id for u in user_counts.keys())
 
-    with transaction.atomic():
-        # 1) Trata usuários que EXISTIAM antes e foram REMOVIDOS completamente no texto
-        #    => zera baseline para permitir que uma futura re-marcação dispare
-        stale_qs = (
-            Mention.objects.select_for_update()
-            .filter(card=card, source=source)
-            .exclude(mentioned_user_id__in=current_user_ids)
-        )
-        for m in stale_qs:
-            # Se não está mais no texto, baseline vira 0
-            if m.seen_count != 0 or m.emailed_count != 0:
-                m.seen_count = 0
-                m.emailed_count = 0
-                m.raw_text = (raw_text or "")[:5000]
-                m.save(update_fields=["seen_count", "emailed_count", "raw_text"])
-
-        # 2) Processa usuários presentes no texto atual
-        for mentioned_user, current_total in user_counts.items():
-            if mentioned_user == request.user:
-                continue
+    text = (raw_text or "")[:5000]
 
-            cache_key = (card.id, mentioned_user.id, source)
-            if cache_key in request._mentions_notify_cache:
-                continue
+    # Quem será avaliado neste save (o autor e os já tratados neste request ficam de fora)
+    candidates = []
+    for mentioned_user, current_total in user_counts.items():
+        if mentioned_user == request.user:
+            continue
 
-            mention_obj, created = Mention.objects.select_for_update().get_or_create(
-                card=card,
-                mentioned_user=mentioned_user,
-                source=source,
-                defaults={
-                    "board": board,
-                    "actor": request.user,
-                    "seen_count": 0,
-                    "emailed_count": 0,
-                    "raw_text": (raw_text or "")[:5000],
-                },
+        cache_key = (card.id, mentioned_user.id, source)
+        if cache_key in request._mentions_notify_cache:
+            continue
+        candidates.append((mentioned_user, current_total))
+
+    with transaction.atomic():
+        # Menções novas entram zeradas ANTES do diff (ignore_conflicts: se outro
+        # request criou a mesma menção, vale a linha dele). A escrita trava o
+        # banco/linhas até o commit, então o diff abaixo enxerga o que o request
+        # concorrente já notificou (emailed_count) e não notifica de novo.
+        if candidates:
+            Mention.objects.bulk_create(
+                [
+                    Mention(
+                        board=board,
+                        card=card,
+                        source=source,
+                        actor=request.user,
+                        mentioned_user=mentioned_user,
+                        seen_count=0,
+                        emailed_count=0,
+                        raw_text=text,
+                    )
+                    for mentioned_user, _ in candidates
+                ],
+                ignore_conflicts=True,
             )
 
-            if not created:
-                mention_obj.refresh_from_db()
+        # Estado atual de (card, source): 1 query; o diff é feito em memória
+        existing = {
+            m.mentioned_user_id: m
+            for m in Mention.objects.select_for_update().filter(card=card, source=source)
+        }
+
+        # 1) Usuários que EXISTIAM antes e foram REMOVIDOS completamente no texto
+        #    => zera baseline para permitir que uma futura re-marcação dispare
+        stale = [
+            m for uid, m in existing.items()
+            if uid not in current_user_ids and (m.seen_count != 0 or m.emailed_count != 0)
+        ]
+        for m in stale:
+            m.seen_count = 0
+            m.emailed_count = 0
+            m.raw_text = text
+        if stale:
+            Mention.objects.bulk_update(stale, ["seen_count", "emailed_count", "raw_text"])
+
+        # 2) Usuários presentes no texto atual
+        to_update = []
+        notify_users = []
+        for mentioned_user, current_total in candidates:
+            mention_obj = existing.get(mentioned_user.id)
+            if mention_obj is None:
+                continue
+            to_update.append(mention_obj)
 
             # 2.1 Se houve remoção parcial (queda), rebaixa baseline
             # Ex.: tinha 2 enviados, apagou para 1 => emailed_count deve virar 1
             if current_total < mention_obj.seen_count:
                 mention_obj.emailed_count = min(mention_obj.emailed_count, current_total)
 
-            # 2.2 Delta: se current_total > emailed_count => manda (geralmente 1)
+            # 2.2 Delta: se current_total > emailed_count => notifica (1 vez por save, sem spam)
             if current_total > mention_obj.emailed_count:
-                # Dispara notificação (1 vez por save, sem spam)
-                _send_mention_email(request, mentioned_user, request.user, board, card, mention_obj)
-                _send_mention_whatsapp(request, mentioned_user, request.user, board, card, mention_obj)
-
+                notify_users.append((mentioned_user, mention_obj))
                 mention_obj.emailed_count = current_total
 
-
             # 2.3 Sempre atualiza seen_count e raw_text
             mention_obj.seen_count = current_total
-            mention_obj.raw_text = (raw_text or "")[:5000]
+            mention_obj.raw_text = text
             mention_obj.actor = request.user
             mention_obj.board = board
-            mention_obj.save(update_fields=["seen_count", "emailed_count", "raw_text", "actor", "board"])
 
-            request._mentions_notify_cache.add(cache_key)
+        if to_update:
+            Mention.objects.bulk_update(to_update, ["seen_count", "emailed_count", "raw_text", "actor", "board"])
+
+        digest_items = []
+        for mentioned_user, mention_obj in notify_users:
+            if wants_digest(mentioned_user):
+                # resumo diário: guarda p/ o send_daily_digest
+                digest_items.append(NotificationDigestItem(
+                    user=mentioned_user,
+                    card=card,
+                    kind=NotificationDigestItem.Kind.MENTION,
+                    detail=f"por {html_unescape(_actor_label(request))}"[:255],
+                ))
+            else:
+                # só grava na outbox: mesma transação das menções (rollback leva junto)
+                _send_mention_email(request, mentioned_user, request.user, board, card, mention_obj)
+                _send_mention_whatsapp(request, mentioned_user, request.user, board, card, mention_obj)
+        if digest_items:
+            NotificationDigestItem.objects.bulk_create(digest_items)
+
+    # marca só após o commit: se a transação (ou a de fora) falhar, o próximo save reavalia
+    done = {(card.id, u.id, source) for u, _ in candidates}
+    transaction.on_commit(lambda: request._mentions_notify_cache.update(done))
 
 
 
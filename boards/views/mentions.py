@@ -4,6 +4,7 @@ from django.db.models import Q
 from django.contrib.auth import get_user_model
 
 from boards.models import BoardMembership
+from boards.services import search_index
 
 
 @login_required
@@ -13,8 +14,6 @@ def board_mentions(request, board_id: int):
     if len(q) < 1:
         return JsonResponse([], safe=False)
 
-    q_l = q.lower()
-
     member_user_ids = BoardMembership.objects.filter(
         board_id=board_id
     ).values_list("user_id", flat=True)
@@ -25,15 +24,26 @@ def board_mentions(request, board_id: int):
         User.objects
         .filter(id__in=member_user_ids)
         .select_related("profile")  # ✅ aqui é "profile"
-        .filter(
+    )
+
+    if search_index.is_available():
+        # índice FTS5 de usuários: "joao" acha "João" (prefixo por palavra)
+        matching = search_index.matching_user_ids(q)
+        if matching is None:
+            return JsonResponse([], safe=False)
+        users = users.filter(id__in=matching)
+    else:
+        # sem FTS5: icontains, que diferencia acento
+        q_l = q.lower()
+        users = users.filter(
             Q(email__icontains=q_l) |
             Q(first_name__icontains=q_l) |
             Q(last_name__icontains=q_l) |
             Q(profile__handle__icontains=q_l) |         # ✅
             Q(profile__display_name__icontains=q_l)     # ✅
         )
-        .order_by("profile__handle", "profile__display_name", "email")[:20]
-    )
+
+    users = users.order_by("profile__handle", "profile__display_name", "email")[:20]
 
     results = []
     for u in users:
@@ -5,6 +5,7 @@ import re
 from datetime import date, timedelta
 
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils.html import escape
@@ -12,6 +13,7 @@ from django.views.decorators.http import require_POST
 from django.template.loader import render_to_string
 
 from boards.models import Card
+from boards.services.board_version import bump_board_version
 from .helpers import _actor_label, _log_card, _card_modal_context
 from .cards import _user_can_edit_board, _deny_read_only
 
@@ -39,8 +41,7 @@ def remove_term(request, card_id):
     card.tags = ", ".join(terms)
     card.save(update_fields=["tags"])
 
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
     if before != terms:
         actor = _actor_label(request)
@@ -81,8 +82,7 @@ def set_term_color(request, card_id):
     card.tag_colors_json = json.dumps(data, ensure_ascii=False)
     card.save(update_fields=["tag_colors_json"])
 
-    board.version += 1
-    board.save(update_fields=["version"])
+    bump_board_version(board, cards=[card])
 
     return JsonResponse({
         "ok": True,
@@ -148,8 +148,7 @@ def set_card_term_due(request, card_id):
 
     if updates:
         card.save(update_fields=updates)
-        board.version += 1
-        board.save(update_fields=["version"])
+        bump_board_version(board, cards=[card])
 
         actor = _actor_label(request)
         if due:
@@ -230,10 +229,10 @@ def set_board_term_colors(request, board_id):
         board.term_colors_json = json.dumps(colors, ensure_ascii=False)
         update_fields.append("term_colors_json")
 
-    # bump version junto (menos chance de corrida)
-    board.version += 1
-    update_fields.append("version")
-
-    board.save(update_fields=update_fields)
+    with transaction.atomic():
+        if update_fields:
+            board.save(update_fields=update_fields)
+        # cores valem p/ todos os cards: re-renderiza todas as colunas no poll
+        bump_board_version(board, columns=board.columns.filter(is_deleted=False).values_list("id", flat=True))
 
     return JsonResponse({"ok": True, "term_colors": colors})
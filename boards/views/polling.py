@@ -1,12 +1,15 @@
 # boards/views/polling.py
 
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Prefetch
+from django.db.models import Count, Prefetch, Q, prefetch_related_objects
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
-from django.utils import timezone
-from ..models import Board, Column, Card, CardLog, CardSeen
+from ..models import Board, BoardChange, Column, Card, CardFollow
+from boards.services.unread import unread_counts_by_card
+
+
+CHANGES_LIMIT = 1000  # acima disso é mais barato o cliente recarregar tudo
 
 
 @login_required
@@ -38,44 +41,135 @@ def board_poll(request, board_id):
         return resp
 
     # ============================================================
-    # Algo mudou -> re-renderiza colunas
+    # Algo mudou
     # IMPORTANT:
     # - entregue "board" no contexto (mantém Coluna Agregadora)
     # - entregue as MESMAS contagens que o template usa (card_count)
     # ============================================================
+    columns = list(
+        with_card_count(Column.objects.filter(board=board, is_deleted=False))
+        .order_by("position", "id")
+    )
 
-    # Prefetch de cards (ordem consistente ajuda o drag/poll a não “piscar”)
-    cards_qs = Card.objects.filter(is_deleted=False).order_by("position", "id")
+    # Cliente sem versão (ou "à frente" do servidor): re-renderiza tudo
+    if client_version <= 0 or client_version > int(board.version or 0):
+        _prefetch_cards(request, columns)
+        html = render_to_string(
+            "boards/partials/columns_list.html",
+            {
+                "columns": columns,
+                "board": board,  # ✅ ESSENCIAL p/ manter a agregadora estável
+            },
+            request=request,
+        )
+        resp = JsonResponse(
+            {
+                "version": board.version,
+                "changed": True,
+                "html": html,
+            }
+        )
+        resp["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+        return resp
 
-    columns = (
-        Column.objects
-        .filter(board=board, is_deleted=False)
-        .annotate(card_count=Count("cards", distinct=True))
-        .prefetch_related(Prefetch("cards", queryset=cards_qs))
+    # ============================================================
+    # DELTA: só o que tem version > versão do cliente
+    # - coluna carimbada => re-renderiza a coluna inteira (cards inclusos)
+    # - card carimbado em coluna intacta => re-renderiza só o <li>
+    # - "order" permite ao cliente reordenar/remover colunas
+    # ============================================================
+    changed_columns = [c for c in columns if int(c.version or 0) > client_version]
+    changed_column_ids = {c.id for c in changed_columns}
+
+    _prefetch_cards(request, changed_columns)
+
+    columns_html = {
+        str(col.id): render_to_string(
+            "boards/partials/column_item.html",
+            {"column": col, "board": board},
+            request=request,
+        )
+        for col in changed_columns
+    }
+
+    changed_cards = list(
+        Card.objects
+        .filter(
+            column__in=[c.id for c in columns if c.id not in changed_column_ids],
+            version__gt=client_version,
+        )
         .order_by("position", "id")
     )
+    _mark_following(request, changed_cards)
 
-    html = render_to_string(
-        "boards/partials/columns_list.html",
-        {
-            "columns": columns,
-            "board": board,  # ✅ ESSENCIAL p/ manter a agregadora estável
-        },
-        request=request,
-    )
+    cards_html = {
+        str(card.id): render_to_string(
+            "boards/partials/card_item.html",
+            {"card": card},
+            request=request,
+        )
+        for card in changed_cards
+    }
 
-    resp = JsonResponse(
-        {
-            "version": board.version,
-            "changed": True,
-            "html": html,
-        }
-    )
+    payload = {
+        "version": board.version,
+        "changed": True,
+        "order": [c.id for c in columns],
+        "columns": columns_html,
+        "cards": cards_html,
+    }
+
+    if board.show_aggregator_column and (changed_columns or changed_cards):
+        payload["aggregator"] = render_to_string(
+            "boards/partials/aggregator_column.html",
+            {"columns": columns, "board": board},
+            request=request,
+        )
+
+    resp = JsonResponse(payload)
     resp["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
     return resp
 
 
+def with_card_count(columns_qs):
+    """
+    card_count usado pela coluna agregadora (toda view que a renderiza
+    precisa anotar — o template não conta mais via col.cards.count).
+    """
+    return columns_qs.annotate(
+        card_count=Count(
+            "cards",
+            filter=Q(cards__is_deleted=False, cards__is_archived=False),
+            distinct=True,
+        )
+    )
+
+
+def _prefetch_cards(request, columns):
+    """
+    Carrega os cards (ordem consistente ajuda o drag/poll a não “piscar”)
+    só das colunas que serão renderizadas.
+    """
+    if not columns:
+        return
+
+    cards_qs = Card.objects.filter(is_deleted=False).order_by("position", "id")
+    prefetch_related_objects(columns, Prefetch("cards", queryset=cards_qs))
+
+    _mark_following(request, [c for col in columns for c in col.cards.all()])
+
 
+def _mark_following(request, cards):
+    if not cards:
+        return
+
+    followed_ids = set(
+        CardFollow.objects
+        .filter(user=request.user, card_id__in=[c.id for c in cards])
+        .values_list("card_id", flat=True)
+    )
+    for c in cards:
+        c.is_following = (c.id in followed_ids)
 
 
 @login_required
@@ -86,31 +180,105 @@ def unread_activity_per_card(request, board_id):
     if not board.memberships.filter(user=request.user).exists():
         return JsonResponse({"error": "forbidden"}, status=403)
 
-    cards = Card.objects.filter(
-        column__board=board,
-        is_deleted=False
-    ).only("id")
+    result = {
+        str(card_id): n
+        for card_id, n in unread_counts_by_card(request.user, board).items()
+    }
+
+    return JsonResponse({"cards": result})
+
+
+@login_required
+def board_changes(request, board_id):
+    """
+    Journal compacto: ids de colunas/cards que mudaram desde ?since=N.
+
+    - columns / cards: mudaram e continuam visíveis no board (buscar de novo)
+    - removed_columns / removed_cards: saíram do board (excluir, arquivar,
+      mover p/ outro quadro)
+    - board: houve mudança só do board (ex.: reordenar colunas)
+    - reset: o journal não cobre o intervalo (cursor anterior à retenção,
+      BOARD_CHANGES_RETENTION_HOURS, ou mudanças demais) => recarregar tudo
+    """
+    board = get_object_or_404(Board, id=board_id)
+
+    if not board.memberships.filter(user=request.user).exists():
+        return JsonResponse({"error": "forbidden"}, status=403)
+
+    try:
+        since = int(request.GET.get("since", 0))
+    except (TypeError, ValueError):
+        since = 0
 
-    seen_map = {
-        cs.card_id: cs.last_seen_at
-        for cs in CardSeen.objects.filter(user=request.user, card__in=cards)
+    version = int(board.version or 0)
+    payload = {
+        "version": version,
+        "since": since,
+        "reset": False,
+        "board": False,
+        "columns": [],
+        "cards": [],
+        "removed_columns": [],
+        "removed_cards": [],
     }
 
-    result = {}
+    if since == version:
+        return _no_store(JsonResponse(payload))
 
-    for card in cards:
-        last_seen = seen_map.get(card.id, timezone.make_aware(timezone.datetime.min))
+    first_version = (
+        BoardChange.objects
+        .filter(board=board)
+        .order_by("version")
+        .values_list("version", flat=True)
+        .first()
+    )
 
-        count = (
-            CardLog.objects
-            .filter(card=card, created_at__gt=last_seen)
-            .exclude(actor=request.user)
-            .count()
-        )
+    # cliente "à frente" ou anterior ao início do journal (o que sobrou do
+    # prune_changes): não dá p/ montar o delta => recarregar tudo
+    if since > version or first_version is None or since < first_version - 1:
+        payload["reset"] = True
+        return _no_store(JsonResponse(payload))
 
-        if count > 0:
-            result[str(card.id)] = count
+    rows = list(
+        BoardChange.objects
+        .filter(board=board, version__gt=since)
+        .order_by("version", "id")
+        .values_list("entity", "entity_id")[: CHANGES_LIMIT + 1]
+    )
+    if len(rows) > CHANGES_LIMIT:
+        payload["reset"] = True
+        return _no_store(JsonResponse(payload))
 
-    return JsonResponse({"cards": result})
+    column_ids, card_ids = [], []
+    for entity, entity_id in rows:
+        if entity == BoardChange.Entity.COLUMN and entity_id not in column_ids:
+            column_ids.append(entity_id)
+        elif entity == BoardChange.Entity.CARD and entity_id not in card_ids:
+            card_ids.append(entity_id)
+        elif entity == BoardChange.Entity.BOARD:
+            payload["board"] = True
+
+    alive_columns = set(
+        Column.objects
+        .filter(board=board, is_deleted=False, id__in=column_ids)
+        .values_list("id", flat=True)
+    )
+    alive_cards = set(
+        Card.objects
+        .filter(column__board=board, column__is_deleted=False, id__in=card_ids)
+        .values_list("id", flat=True)
+    )
+
+    payload["columns"] = [i for i in column_ids if i in alive_columns]
+    payload["removed_columns"] = [i for i in column_ids if i not in alive_columns]
+    payload["cards"] = [i for i in card_ids if i in alive_cards]
+    payload["removed_cards"] = [i for i in card_ids if i not in alive_cards]
+
+    return _no_store(JsonResponse(payload))
+
+
+def _no_store(resp):
+    resp["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+    return resp
 
 # END boards/views/polling.py
@@ -1,6 +1,8 @@
 # boards/views/search.py
 from __future__ import annotations
 
+import unicodedata
+
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q, Prefetch
 from django.http import JsonResponse
@@ -15,6 +17,35 @@ from ..models import (
     ChecklistItem,
     CardLog,
 )
+from ..services import search_index
+from ..services.search_text import normalize_search_text
+
+
+SEARCH_LIMIT = 40
+
+
+def _find_folded(text: str, q: str) -> tuple[int, int] | None:
+    """
+    Posição (início, fim) de `q` em `text` ignorando acento/caixa — a mesma
+    dobra de normalize_search_text, mas com o índice do texto original.
+    """
+    needle = normalize_search_text(q)
+    if not needle:
+        return None
+
+    folded, index = [], []
+    for i, ch in enumerate(text):
+        for d in unicodedata.normalize("NFKD", ch):
+            if unicodedata.combining(d):
+                continue
+            for f in d.casefold():
+                folded.append(f)
+                index.append(i)
+
+    j = "".join(folded).find(needle)
+    if j < 0:
+        return None
+    return index[j], index[j + len(needle) - 1] + 1
 
 
 def _make_excerpt(text: str, q: str, max_len: int = 180, around: int = 70) -> str:
@@ -25,15 +56,14 @@ def _make_excerpt(text: str, q: str, max_len: int = 180, around: int = 70) -> st
     if not t:
         return ""
 
-    ql = q.lower()
-    tl = t.lower()
-    i = tl.find(ql)
+    found = _find_folded(t, q)
 
-    if i < 0:
+    if found is None:
         return (t[: max_len - 1] + "…") if len(t) > max_len else t
 
+    i, j = found
     start = max(0, i - around)
-    end = min(len(t), i + len(q) + around)
+    end = min(len(t), j + around)
 
     prefix = "…" if start > 0 else ""
     suffix = "…" if end < len(t) else ""
@@ -46,15 +76,15 @@ def _make_excerpt(text: str, q: str, max_len: int = 180, around: int = 70) -> st
 
 
 def _best_card_match(card: Card, q: str) -> tuple[str, str]:
-    ql = q.lower()
+    ql = normalize_search_text(q)
 
-    if (card.title or "").lower().find(ql) >= 0:
+    if normalize_search_text(card.title).find(ql) >= 0:
         return "title", _make_excerpt(card.title or "", q)
 
-    if (card.description or "").lower().find(ql) >= 0:
+    if normalize_search_text(card.description, html=True).find(ql) >= 0:
         return "description", _make_excerpt(card.description or "", q)
 
-    if (card.tags or "").lower().find(ql) >= 0:
+    if normalize_search_text(card.tags).find(ql) >= 0:
         return "tags", _make_excerpt(card.tags or "", q)
 
     # attachments (nome/descrição)
@@ -75,22 +105,22 @@ def _best_card_match(card: Card, q: str) -> tuple[str, str]:
             except Exception:
                 pass
 
-        if fname and fname.lower().find(ql) >= 0:
+        if fname and normalize_search_text(fname).find(ql) >= 0:
             return "attachment", _make_excerpt(fname, q)
 
-        if (getattr(a, "description", "") or "").lower().find(ql) >= 0:
+        if normalize_search_text(getattr(a, "description", "")).find(ql) >= 0:
             return "attachment", _make_excerpt(getattr(a, "description", "") or "", q)
 
     for ch in getattr(card, "_pref_checklists", []) or []:
-        if (ch.title or "").lower().find(ql) >= 0:
+        if normalize_search_text(ch.title).find(ql) >= 0:
             return "checklist", _make_excerpt(ch.title or "", q)
 
     for it in getattr(card, "_pref_checklist_items", []) or []:
-        if (it.text or "").lower().find(ql) >= 0:
+        if normalize_search_text(it.text).find(ql) >= 0:
             return "checklist_item", _make_excerpt(it.text or "", q)
 
     for lg in getattr(card, "_pref_logs", []) or []:
-        if (lg.content or "").lower().find(ql) >= 0:
+        if normalize_search_text(lg.content, html=True).find(ql) >= 0:
             return "activity", _make_excerpt(lg.content or "", q)
 
     return "card", _make_excerpt(card.description or card.title or "", q)
@@ -113,6 +143,15 @@ def board_search(request, board_id: int):
 
     q = q_raw
 
+    # índice FTS5 (bm25): mais relevantes primeiro
+    if search_index.is_available():
+        hits = search_index.search_cards(q, board_ids=[board.id])
+        card_ids = [h["id"] for h in hits]
+        column_ids = sorted({h["column_id"] for h in hits})
+        return JsonResponse({"card_ids": card_ids, "column_ids": column_ids})
+
+    # fallback (banco sem FTS5): icontains em todos os campos — ignorar acento
+    # só com o índice (unicode61 remove_diacritics)
     qs = (
         Card.objects
         .filter(column__board_id=board_id, column__is_deleted=False, is_deleted=False)
@@ -153,6 +192,59 @@ def home_search(request):
         .order_by("name")
     )
 
+    if search_index.is_available():
+        cards_payload = _home_search_fts(request, q)
+    else:
+        cards_payload = _home_search_icontains(request, q)
+
+    boards_payload = [{"id": b.id, "name": b.name} for b in boards_qs.filter(name__icontains=q)[:20]]
+
+    return JsonResponse({"cards": cards_payload, "boards": boards_payload})
+
+
+def _card_payload(c: Card, match_in: str, excerpt: str) -> dict:
+    return {
+        "id": c.id,
+        "title": c.title or "(sem título)",
+        "board_id": c.column.board_id,
+        "board_name": c.column.board.name or "",
+        "column_id": c.column_id,
+        "column_title": c.column.name or "",  # mantém a chave pro seu JS
+        "match_in": match_in,
+        "excerpt": excerpt,
+    }
+
+
+def _home_search_fts(request, q: str) -> list[dict]:
+    # mesmo recorte do caminho antigo: boards não excluídos onde sou membro
+    board_ids = list(
+        BoardMembership.objects
+        .filter(user=request.user, board__is_deleted=False)
+        .values_list("board_id", flat=True)
+        .distinct()
+    )
+    hits = search_index.search_cards(q, board_ids=board_ids, limit=SEARCH_LIMIT)
+
+    cards_by_id = (
+        Card.objects
+        .filter(id__in=[h["id"] for h in hits])
+        .select_related("column", "column__board")
+        .only(
+            "id", "title",
+            "column_id", "column__name",
+            "column__board_id", "column__board__name",
+        )
+        .in_bulk()
+    )
+
+    return [
+        _card_payload(cards_by_id[h["id"]], h["match_in"], h["excerpt"])
+        for h in hits
+        if h["id"] in cards_by_id
+    ]
+
+
+def _home_search_icontains(request, q: str) -> list[dict]:
     attachments_pf = Prefetch(
         "attachments",
         queryset=CardAttachment.objects.only("id", "card_id", "description", "file"),
@@ -198,24 +290,12 @@ def home_search(request):
             "column_id", "column__name",          # <<<<<<<<<<
             "column__board_id", "column__board__name",
         )
-        .order_by("-id")[:40]
+        .order_by("-id")[:SEARCH_LIMIT]
     )
 
     cards_payload = []
     for c in cards_qs:
         match_in, excerpt = _best_card_match(c, q)
+        cards_payload.append(_card_payload(c, match_in, excerpt))
 
-        cards_payload.append({
-            "id": c.id,
-            "title": c.title or "(sem título)",
-            "board_id": c.column.board_id,
-            "board_name": c.column.board.name or "",
-            "column_id": c.column_id,
-            "column_title": c.column.name or "",  # mantém a chave pro seu JS
-            "match_in": match_in,
-            "excerpt": excerpt,
-        })
-
-    boards_payload = [{"id": b.id, "name": b.name} for b in boards_qs.filter(name__icontains=q)[:20]]
-
-    return JsonResponse({"cards": cards_payload, "boards": boards_payload})
+    return cards_payload
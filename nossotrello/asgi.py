@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from dotenv import load_dotenv
 from django.core.asgi import get_asgi_application
 
+# carrega variáveis do .env a partir da raiz do projeto (igual ao wsgi.py)
+load_dotenv()
+
+# ASGI é necessário para o stream SSE do board (/board/<id>/events/):
+# gunicorn nossotrello.asgi:application -k uvicorn.workers.UvicornWorker
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nossotrello.settings')
 
 application = get_asgi_application()
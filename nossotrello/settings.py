@@ -241,6 +241,10 @@ if EMAIL_USE_TLS and EMAIL_USE_SSL:
 
 DEFAULT_FROM_EMAIL = (os.getenv("DEFAULT_FROM_EMAIL") or "no-reply@clinicacamim.com.br").strip()
 
+# envio em lote (boards/services/mail.py): mensagens por conexão SMTP e pausa entre lotes
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE") or 50)
+EMAIL_BATCH_THROTTLE_SECONDS = float(os.getenv("EMAIL_BATCH_THROTTLE_SECONDS") or 0)
+
 
 # ============================================================
 # WHATSAPP -
@@ -253,6 +257,38 @@ PRESSTICKET_BASE_URL = os.getenv("PRESSTICKET_BASE_URL", "https://api.atendiment
 PRESSTICKET_USER_ID = int(os.getenv("PRESSTICKET_USER_ID", "0") or 0)
 PRESSTICKET_QUEUE_ID = int(os.getenv("PRESSTICKET_QUEUE_ID", "0") or 0)
 PRESSTICKET_WHATSAPP_ID = int(os.getenv("PRESSTICKET_WHATSAPP_ID", "0") or 0)
+# envios simultâneos (threads) do cliente PressTicket em lotes (run_outbox)
+PRESSTICKET_MAX_WORKERS = int(os.getenv("PRESSTICKET_MAX_WORKERS", "4") or 4)
+
+# Outbox de notificações: views só enfileiram; envio pelo worker
+# "python manage.py run_outbox". False = envia na hora (dev sem worker).
+NOTIFICATION_OUTBOX_ENABLED = _env_bool("NOTIFICATION_OUTBOX_ENABLED", default=True)
+
+# Limite de envio (boards/services/rate_limit.py), token bucket no cache
+# (Redis => compartilhado entre workers/commands). rate em msgs/s; burst =
+# rajada aceita; max_wait = quanto um envio pode esperar antes de ser
+# barrado (a outbox reagenda). Remova o canal p/ desligar o limite.
+OUTBOUND_RATE_LIMITS = {
+    "whatsapp": {
+        "global_rate": float(os.getenv("WHATSAPP_RATE_PER_SECOND") or 5),
+        "global_burst": int(os.getenv("WHATSAPP_RATE_BURST") or 10),
+        "dest_rate": float(os.getenv("WHATSAPP_RATE_PER_NUMBER_PER_MINUTE") or 20) / 60,
+        "dest_burst": int(os.getenv("WHATSAPP_RATE_PER_NUMBER_BURST") or 6),
+        "max_wait": float(os.getenv("WHATSAPP_RATE_MAX_WAIT") or 10),
+    },
+    "email": {
+        "global_rate": float(os.getenv("EMAIL_RATE_PER_SECOND") or 10),
+        "global_burst": int(os.getenv("EMAIL_RATE_BURST") or 20),
+        "dest_rate": float(os.getenv("EMAIL_RATE_PER_ADDRESS_PER_MINUTE") or 20) / 60,
+        "dest_burst": int(os.getenv("EMAIL_RATE_PER_ADDRESS_BURST") or 6),
+        "max_wait": float(os.getenv("EMAIL_RATE_MAX_WAIT") or 10),
+    },
+}
+
+# Journal de mudanças dos boards (BoardChange, endpoint board_changes):
+# entradas mais velhas que isso são apagadas (prune_board_changes, também
+# rodado pelo tracktime_tick). Cursor anterior ao que sobrou => "reset".
+BOARD_CHANGES_RETENTION_HOURS = int(os.getenv("BOARD_CHANGES_RETENTION_HOURS") or 48)
 
 
 
@@ -284,6 +320,13 @@ SITE_URL = (os.getenv("SITE_URL") or "http://localhost:8000").strip().rstrip("/"
 
 REDIS_URL = (os.getenv("REDIS_URL") or "").strip()
 
+# Vários processos (gunicorn --workers N, outbox, tracktime_tick) só enxergam
+# o mesmo SSE/presença/snapshot de timers via Redis; LocMem é por processo.
+# Dockerfile/compose ligam REDIS_REQUIRED: sem REDIS_URL, falha na subida.
+REDIS_REQUIRED = _env_bool("REDIS_REQUIRED", default=False)
+if REDIS_REQUIRED and not REDIS_URL:
+    raise RuntimeError("REDIS_REQUIRED=1 mas REDIS_URL não configurada")
+
 if REDIS_URL:
     CACHES = {
         "default": {
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Project, ActivityType, Team, TimeEntry
+from .models import Project, ActivityType, Team, TimeEntry, TimeEntryDailyRollup
 
 
 @admin.register(Project)
@@ -34,3 +34,10 @@ class TimeEntryAdmin(admin.ModelAdmin):
     )
     list_filter = ("project", "activity_type", "created_at")
     search_fields = ("card_title_cache",)
+
+
+@admin.register(TimeEntryDailyRollup)
+class TimeEntryDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("date", "user", "project", "activity_type", "board_id", "minutes")
+    list_filter = ("date", "project")
+    date_hierarchy = "date"
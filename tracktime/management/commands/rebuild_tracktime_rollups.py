@@ -0,0 +1,75 @@
+# tracktime/management/commands/rebuild_tracktime_rollups.py
+
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from tracktime.models import TimeEntry, TimeEntryDailyRollup
+
+BATCH = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula TimeEntryDailyRollup a partir de TimeEntry (após import, "
+        "edição pelo admin ou para conferir o incremental)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="YYYY-MM-DD: recalcula só a partir deste dia.")
+
+    def handle(self, *args, **opts):
+        since = None
+        if opts["since"]:
+            try:
+                since = date.fromisoformat(opts["since"])
+            except ValueError:
+                raise CommandError("--since inválido (use YYYY-MM-DD)")
+
+        # mesma regra de dia do incremental (TimeEntryDailyRollup.day_for)
+        day = TimeEntryDailyRollup.day_expression()
+
+        qs = (
+            TimeEntry.objects
+            # timer ainda rodando não conta (entra no rollup quando parar)
+            .exclude(Q(ended_at__isnull=True) & Q(started_at__isnull=False))
+            .filter(minutes__gt=0)
+            .annotate(day=day, board=Coalesce("board_id", Value(0)))
+        )
+        if since:
+            qs = qs.filter(day__gte=since)
+
+        rows = (
+            qs.values("user_id", "project_id", "activity_type_id", "board", "day")
+            .annotate(total=Sum("minutes"))
+            .order_by()
+        )
+
+        with transaction.atomic():
+            old = TimeEntryDailyRollup.objects.all()
+            if since:
+                old = old.filter(date__gte=since)
+            deleted, _ = old.delete()
+
+            objs = [
+                TimeEntryDailyRollup(
+                    user_id=r["user_id"],
+                    project_id=r["project_id"],
+                    activity_type_id=r["activity_type_id"],
+                    board_id=r["board"],
+                    date=r["day"],
+                    minutes=r["total"],
+                )
+                for r in rows.iterator()
+            ]
+            TimeEntryDailyRollup.objects.bulk_create(objs, batch_size=BATCH)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"rebuild_tracktime_rollups: removidas={deleted} criadas={len(objs)}"
+            + (f" desde={since}" if since else "")
+        ))
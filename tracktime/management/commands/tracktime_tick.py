@@ -1,34 +1,143 @@
-from django.core.management.base import BaseCommand
-from django.utils import timezone
+
+from __future__ import annotations
+
+import signal
+import threading
+from collections import defaultdict
+
 from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.db.models import BigIntegerField, DateTimeField, DurationField, ExpressionWrapper, F, Min, Q, Value
+from django.db.models.functions import Cast, Greatest
 from django.urls import reverse
-from django.core.mail import send_mail
+from django.utils import timezone
 
-from tracktime.models import TimeEntry
+from boards.services.board_version import prune_changes
+from boards.services.outbox import enqueue_email
+from tracktime.models import TimeEntry, TimeEntryDailyRollup
+from tracktime.services import running as running_timers
+from tracktime.services.presence import snapshot_to_db
+
+DEFAULT_MAX_SLEEP = 300  # novos timers só vencem em >= 1h; isso só limita a espera
+PRUNE_CHANGES_EVERY = 3600
 
 
 class Command(BaseCommand):
-    help = "Processa timers longos: envia email em 1h e auto-stop em 1h15."
+    help = (
+        "Processa timers longos: envia email em 1h e auto-stop em 1h15. "
+        "--loop: fica rodando e dorme até o próximo vencimento (sem cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Modo daemon: acorda no próximo confirm_due_at/auto_stop_at.")
+        parser.add_argument(
+            "--max-sleep",
+            type=float,
+            default=DEFAULT_MAX_SLEEP,
+            help="Espera máxima (s) entre ciclos no --loop.",
+        )
 
     def handle(self, *args, **options):
+        if not options["loop"]:
+            self._tick()
+            return
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+        max_sleep = max(1.0, float(options["max_sleep"]))
+        while not stop.is_set():
+            close_old_connections()
+            now = self._tick()
+
+            deadline = self._next_deadline(after=now)
+            wait = max_sleep
+            if deadline is not None:
+                wait = min(max_sleep, max(0.5, (deadline - timezone.now()).total_seconds()))
+            stop.wait(wait)
+
+    # ------------------------------------------------------------
+    # 1 ciclo
+    # ------------------------------------------------------------
+    def _tick(self):
         now = timezone.now()
 
         base_url = (getattr(settings, "SITE_URL", "") or "").strip()
         if not base_url:
             base_url = "http://localhost:8000"
 
-        # 1) Auto-stop (>= auto_stop_at)
-        stop_qs = TimeEntry.objects.filter(
+        stopped = self._auto_stop(now)
+        emailed = self._send_confirmations(now, base_url)
+
+        # presença vive no cache; grava o "último visto" no banco de tempos em tempos
+        snapshot = snapshot_to_db()
+
+        # journal dos boards (board_changes) não cresce sem limite
+        pruned = prune_changes(every_seconds=PRUNE_CHANGES_EVERY)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"tracktime_tick: stopped={stopped} emailed={emailed} presence_snapshot={snapshot} "
+            f"board_changes_pruned={pruned}"
+        ))
+        return now
+
+    def _auto_stop(self, now) -> int:
+        """
+        1 UPDATE p/ todos os vencidos (>= auto_stop_at), minutos calculados no
+        SQL com a mesma regra do TimeEntry.stop(): max(minutos inteiros, 1).
+        """
+        due = TimeEntry.objects.filter(
             ended_at__isnull=True,
+            started_at__isnull=False,
             auto_stop_at__isnull=False,
             auto_stop_at__lte=now,
         )
-        stopped = 0
-        for entry in stop_qs.iterator():
-            entry.stop()
-            stopped += 1
 
-        # 2) Email de confirmação (>= confirm_due_at e ainda antes do auto_stop_at)
+        with transaction.atomic():
+            rows = {
+                r["id"]: r
+                for r in due.values("id", "user_id", "project_id", "activity_type_id", "board_id", "started_at")
+            }
+            if not rows:
+                return 0
+
+            # SQLite: datetime - datetime => microssegundos (inteiro)
+            elapsed_us = Cast(
+                ExpressionWrapper(Value(now, output_field=DateTimeField()) - F("started_at"), output_field=DurationField()),
+                BigIntegerField(),
+            )
+            TimeEntry.objects.filter(id__in=list(rows), ended_at__isnull=True).update(
+                minutes=F("minutes") + Greatest(elapsed_us / 60_000_000, Value(1)),
+                ended_at=now,
+                started_at=None,
+            )
+
+            # só os que ESTE update parou (outro processo pode ter parado algum antes)
+            stopped_ids = set(
+                TimeEntry.objects.filter(id__in=list(rows), ended_at=now).values_list("id", flat=True)
+            )
+
+            # rollups diários em lote (mesma regra de minutos do TimeEntry.stop())
+            day = TimeEntryDailyRollup.day_for(ended_at=now)  # ended_at dos parados
+            increments = defaultdict(int)
+            for entry_id in stopped_ids:
+                r = rows[entry_id]
+                extra = max(int((now - r["started_at"]).total_seconds() // 60), 1)
+                increments[(r["user_id"], r["project_id"], r["activity_type_id"], r["board_id"] or 0, day)] += extra
+            TimeEntryDailyRollup.add_many(increments)
+            if stopped_ids:
+                running_timers.invalidate()
+
+        return len(stopped_ids)
+
+    def _send_confirmations(self, now, base_url) -> int:
+        """
+        E-mail de confirmação (>= confirm_due_at e ainda antes do auto_stop_at).
+        Tokens gravados em lote e e-mails enfileirados na outbox na mesma
+        transação (o run_outbox envia em lote) — SMTP lento não atrasa o tick.
+        """
         confirm_qs = TimeEntry.objects.filter(
             ended_at__isnull=True,
             confirm_due_at__isnull=False,
@@ -40,28 +149,51 @@ class Command(BaseCommand):
             confirmation_sent_at__isnull=True
         )
 
-        emailed = 0
-        for entry in confirm_qs.iterator():
-            to_email = (getattr(entry.user, "email", "") or "").strip()
-            if not to_email:
-                continue
-
-            raw = entry.generate_confirmation_token()
-            entry.confirmation_sent_at = now
-            entry.save(update_fields=["confirmation_token_hash", "confirmation_sent_at"])
-
-            link_path = reverse("tracktime:confirm_link", kwargs={"entry_id": entry.id, "token": raw})
-            confirm_url = f"{base_url}{link_path}"
-
-            subject = "Você ainda está nesta tarefa?"
-            body = (
-                "Estamos com um timer rodando há 1h.\n\n"
-                "Confirme para adicionar mais 1h:\n"
-                f"{confirm_url}\n\n"
-                "Se você não confirmar, vamos parar automaticamente em 15 minutos."
-            )
+        with transaction.atomic():
+            entries = []
+            messages = []
+            for entry in confirm_qs.select_related("user"):
+                to_email = (getattr(entry.user, "email", "") or "").strip()
+                if not to_email:
+                    continue
+
+                raw = entry.generate_confirmation_token()
+                entry.confirmation_sent_at = now
+                entries.append(entry)
+
+                link_path = reverse("tracktime:confirm_link", kwargs={"entry_id": entry.id, "token": raw})
+                confirm_url = f"{base_url}{link_path}"
 
-            send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [to_email], fail_silently=True)
-            emailed += 1
+                body = (
+                    "Estamos com um timer rodando há 1h.\n\n"
+                    "Confirme para adicionar mais 1h:\n"
+                    f"{confirm_url}\n\n"
+                    "Se você não confirmar, vamos parar automaticamente em 15 minutos."
+                )
+                messages.append((to_email, body))
 
-        self.stdout.write(self.style.SUCCESS(f"tracktime_tick: stopped={stopped} emailed={emailed}"))
+            if not entries:
+                return 0
+
+            TimeEntry.objects.bulk_update(entries, ["confirmation_token_hash", "confirmation_sent_at"])
+            for to_email, body in messages:
+                enqueue_email(
+                    to=to_email,
+                    subject="Você ainda está nesta tarefa?",
+                    body=body,
+                    kind="tracktime_confirm",
+                )
+
+        return len(entries)
+
+    def _next_deadline(self, *, after):
+        """
+        Próximo confirm_due_at (ainda sem e-mail) ou auto_stop_at de timer
+        rodando, depois do último tick (os já vencidos foram tratados nele).
+        """
+        agg = TimeEntry.objects.filter(ended_at__isnull=True, started_at__isnull=False).aggregate(
+            stop=Min("auto_stop_at", filter=Q(auto_stop_at__gt=after)),
+            confirm=Min("confirm_due_at", filter=Q(confirm_due_at__gt=after, confirmation_sent_at__isnull=True)),
+        )
+        candidates = [d for d in (agg["stop"], agg["confirm"]) if d is not None]
+        return min(candidates) if candidates else None
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracktime', '0006_trackpresence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeEntryDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board_id', models.PositiveIntegerField(default=0)),
+                ('date', models.DateField()),
+                ('minutes', models.PositiveIntegerField(default=0)),
+                ('activity_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='tracktime.activitytype')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='tracktime.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'date'], name='tracktime_t_user_id_3e5051_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='timeentrydailyrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'project', 'activity_type', 'board_id', 'date'), name='uniq_tt_rollup_key'),
+        ),
+    ]
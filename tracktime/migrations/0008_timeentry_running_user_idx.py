@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracktime', '0007_timeentrydailyrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(condition=models.Q(('ended_at__isnull', True)), fields=['user'], name='tt_entry_running_user_idx'),
+        ),
+    ]
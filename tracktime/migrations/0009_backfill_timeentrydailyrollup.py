@@ -0,0 +1,56 @@
+# Preenche TimeEntryDailyRollup com o histórico (a 0007 só criou a tabela).
+# Mesma conta do rebuild_tracktime_rollups, com os modelos históricos.
+
+from django.db import migrations
+from django.db.models import Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+BATCH = 1000
+
+
+def forward_fill_rollups(apps, schema_editor):
+    TimeEntry = apps.get_model("tracktime", "TimeEntry")
+    TimeEntryDailyRollup = apps.get_model("tracktime", "TimeEntryDailyRollup")
+
+    # cópia congelada de TimeEntryDailyRollup.day_expression(): ended_at (ou
+    # created_at) no fuso local, a entrada inteira nesse dia
+    day = TruncDate(Coalesce("ended_at", "created_at"), tzinfo=timezone.get_current_timezone())
+
+    rows = (
+        TimeEntry.objects
+        # timer ainda rodando não conta (entra no rollup quando parar)
+        .exclude(Q(ended_at__isnull=True) & Q(started_at__isnull=False))
+        .filter(minutes__gt=0)
+        .annotate(day=day, board=Coalesce("board_id", Value(0)))
+        .values("user_id", "project_id", "activity_type_id", "board", "day")
+        .annotate(total=Sum("minutes"))
+        .order_by()
+    )
+
+    TimeEntryDailyRollup.objects.all().delete()
+    TimeEntryDailyRollup.objects.bulk_create(
+        [
+            TimeEntryDailyRollup(
+                user_id=r["user_id"],
+                project_id=r["project_id"],
+                activity_type_id=r["activity_type_id"],
+                board_id=r["board"],
+                date=r["day"],
+                minutes=r["total"],
+            )
+            for r in rows.iterator()
+        ],
+        batch_size=BATCH,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracktime", "0008_timeentry_running_user_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward_fill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,9 @@
 #tracktime/models.py
 
 from django.conf import settings
-from django.db import models
-from django.db.models import Q, UniqueConstraint
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q, UniqueConstraint
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
 import hashlib
 import secrets
@@ -152,6 +153,12 @@ class TimeEntry(models.Model):
             models.Index(fields=["project"]),
             models.Index(fields=["user"]),
             models.Index(fields=["card_id"]),
+            # timers rodando (fallback do snapshot em tracktime/services/running.py)
+            models.Index(
+                fields=["user"],
+                condition=Q(ended_at__isnull=True),
+                name="tt_entry_running_user_idx",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -194,6 +201,7 @@ class TimeEntry(models.Model):
         self.started_at = None
 
         self.save(update_fields=["minutes", "ended_at", "started_at"])
+        TimeEntryDailyRollup.add_for_entry(self, minutes=extra_minutes)
 
     @classmethod
     def create_manual(
@@ -211,7 +219,7 @@ class TimeEntry(models.Model):
         """
         Criação manual (sem timer).
         """
-        return cls.objects.create(
+        entry = cls.objects.create(
             user=user,
             project=project,
             activity_type=activity_type,
@@ -221,6 +229,8 @@ class TimeEntry(models.Model):
             card_title_cache=card_title_cache or "",
             card_url_cache=card_url_cache or "",
         )
+        TimeEntryDailyRollup.add_for_entry(entry, minutes=entry.minutes)
+        return entry
 
     @classmethod
     def create_from_timer(
@@ -243,7 +253,7 @@ class TimeEntry(models.Model):
         delta = end - started_at
         minutes = max(int(delta.total_seconds() // 60), 1)
 
-        return cls.objects.create(
+        entry = cls.objects.create(
             user=user,
             project=project,
             activity_type=activity_type,
@@ -255,6 +265,8 @@ class TimeEntry(models.Model):
             card_title_cache=card_title_cache or "",
             card_url_cache=card_url_cache or "",
         )
+        TimeEntryDailyRollup.add_for_entry(entry, minutes=entry.minutes)
+        return entry
 
 
     # =========================================================
@@ -335,6 +347,139 @@ class TimeEntry(models.Model):
 
 
 
+class TimeEntryDailyRollup(models.Model):
+    """
+    Minutos por dia / usuário / projeto / atividade / board — base dos
+    relatórios de semana e mês (não varre TimeEntry).
+
+    Mantido incrementalmente no stop do timer e no lançamento manual. Edições
+    fora desse fluxo (admin, scripts): python manage.py rebuild_tracktime_rollups.
+
+    Dia de uma entrada: o de ended_at (ou created_at), no fuso local — a
+    entrada inteira, mesmo que tenha começado no dia anterior. day_for() e
+    day_expression() são essa regra (Python/SQL): incremental (stop, auto-stop
+    do tick, manual) e rebuild usam só elas, então o rebuild não move minutos
+    entre dias.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="time_rollups",
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="daily_rollups",
+    )
+    activity_type = models.ForeignKey(
+        ActivityType,
+        on_delete=models.CASCADE,
+        related_name="daily_rollups",
+    )
+    # mesmo "board_id" solto do TimeEntry; 0 = sem board (NULL quebraria o unique)
+    board_id = models.PositiveIntegerField(default=0)
+    date = models.DateField()
+    minutes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user", "project", "activity_type", "board_id", "date"],
+                name="uniq_tt_rollup_key",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "date"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} • {self.date} • {self.minutes}min"
+
+    @staticmethod
+    def day_for(*, ended_at=None, created_at=None):
+        """Dia do rollup de uma entrada (ver docstring da classe)."""
+        return timezone.localdate(ended_at or created_at or timezone.now())
+
+    @staticmethod
+    def day_expression():
+        """day_for() em SQL, p/ agregar TimeEntry por dia (rebuild)."""
+        return TruncDate(Coalesce("ended_at", "created_at"), tzinfo=timezone.get_current_timezone())
+
+    @classmethod
+    def add(cls, *, user_id, project_id, activity_type_id, board_id, date, minutes: int) -> None:
+        """Soma minutos na linha do dia (cria se não existir)."""
+        minutes = int(minutes or 0)
+        if minutes <= 0:
+            return
+
+        key = {
+            "user_id": user_id,
+            "project_id": project_id,
+            "activity_type_id": activity_type_id,
+            "board_id": board_id or 0,
+            "date": date,
+        }
+        if cls.objects.filter(**key).update(minutes=F("minutes") + minutes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(minutes=minutes, **key)
+        except IntegrityError:
+            # outro processo criou a linha entre o update e o create
+            cls.objects.filter(**key).update(minutes=F("minutes") + minutes)
+
+    @classmethod
+    def add_many(cls, increments: dict) -> None:
+        """
+        Versão em lote do add(): {(user_id, project_id, activity_type_id,
+        board_id, date): minutos}. 1 SELECT + bulk_update + bulk_create —
+        chamar dentro de uma transação que já escreveu (SQLite serializa).
+        """
+        increments = {k: int(m) for k, m in increments.items() if int(m or 0) > 0}
+        if not increments:
+            return
+
+        existing = {
+            (r.user_id, r.project_id, r.activity_type_id, r.board_id, r.date): r
+            for r in cls.objects.filter(
+                user_id__in={k[0] for k in increments},
+                date__in={k[4] for k in increments},
+            )
+        }
+
+        to_update, to_create = [], []
+        for key, minutes in increments.items():
+            row = existing.get(key)
+            if row is not None:
+                row.minutes += minutes
+                to_update.append(row)
+            else:
+                user_id, project_id, activity_type_id, board_id, date = key
+                to_create.append(cls(
+                    user_id=user_id,
+                    project_id=project_id,
+                    activity_type_id=activity_type_id,
+                    board_id=board_id,
+                    date=date,
+                    minutes=minutes,
+                ))
+
+        cls.objects.bulk_update(to_update, ["minutes"], batch_size=500)
+        cls.objects.bulk_create(to_create, batch_size=500)
+
+    @classmethod
+    def add_for_entry(cls, entry, *, minutes: int) -> None:
+        cls.add(
+            user_id=entry.user_id,
+            project_id=entry.project_id,
+            activity_type_id=entry.activity_type_id,
+            board_id=entry.board_id,
+            date=cls.day_for(ended_at=entry.ended_at, created_at=entry.created_at),
+            minutes=minutes,
+        )
+
+
 class TrackPresence(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="track_presence")
     last_ping_at = models.DateTimeField(default=timezone.now)
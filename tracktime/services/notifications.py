@@ -6,10 +6,9 @@ from dataclasses import dataclass
 from typing import Optional, Tuple
 
 from django.conf import settings
-from django.core.mail import send_mail
 from django.urls import reverse
 
-from tracktime.services.pressticket import send_text_message, PressTicketError
+from boards.services.outbox import enqueue_email, enqueue_whatsapp
 
 import html
 import re
@@ -121,16 +120,6 @@ def _user_prefs(user) -> Tuple[bool, bool, str]:
     return allow_whatsapp, allow_email, phone
 
 
-def _pressticket_base_url() -> str:
-    base = _safe_str(getattr(settings, "PRESSTICKET_BASE_URL", ""))
-    base = base.rstrip("/")
-    if not base:
-        return ""
-    if base.endswith("/api/messages/send"):
-        return base
-    return base + "/api/messages/send"
-
-
 def send_whatsapp(*, user, phone: str, kind: str, message: str) -> None:
     allow_whatsapp, _, phone_cfg = _user_prefs(user)
 
@@ -155,42 +144,9 @@ def send_whatsapp(*, user, phone: str, kind: str, message: str) -> None:
         logger.info("notify: whatsapp skipped (no token) user_id=%s kind=%s", user.id, kind)
         return
 
-    user_id = int(getattr(settings, "PRESSTICKET_USER_ID", 0) or 0)
-    queue_id = int(getattr(settings, "PRESSTICKET_QUEUE_ID", 0) or 0)
-    whatsapp_id = int(getattr(settings, "PRESSTICKET_WHATSAPP_ID", 0) or 0)
-
-    base_url = _pressticket_base_url()
-
-    logger.warning(
-        "pressticket: sending kind=%s number=%r base_url=%r user_id=%s queue_id=%s whatsapp_id=%s",
-        kind, phone, base_url, user_id, queue_id, whatsapp_id
-    )
-
-    resp = send_text_message(
-        base_url=base_url,
-        token=token,
-        number=phone,
-        body=_safe_str(message),
-        user_id=user_id,
-        queue_id=queue_id,
-        whatsapp_id=whatsapp_id,
-    )
-
-    # A API do PressTicket parece responder sempre com "error", mas contém id/ack (você já viu isso).
-    try:
-        msg_id = (
-            (resp or {})
-            .get("error", {})
-            .get("_data", {})
-            .get("id", {})
-            .get("_serialized")
-        )
-        if msg_id:
-            logger.warning("pressticket: api ok msg_id=%r", msg_id)
-    except Exception:
-        pass
-
-    logger.warning("pressticket: sent ok kind=%s number=%r resp_keys=%s", kind, phone, list((resp or {}).keys())[:15])
+    # só enfileira; o envio (PressTicket) é do worker run_outbox
+    enqueue_whatsapp(number=phone, body=_safe_str(message), kind=kind)
+    logger.info("pressticket: queued kind=%s number=%r", kind, phone)
 
 
 def send_email_notify(*, user, subject: str, body: str) -> None:
@@ -204,15 +160,11 @@ def send_email_notify(*, user, subject: str, body: str) -> None:
         logger.info("notify: email skipped (no email) user_id=%s", user.id)
         return
 
-    from_email = _safe_str(getattr(settings, "DEFAULT_FROM_EMAIL", "")) or None
-
-    send_mail(
-        subject=_safe_str(subject),
-        message=_safe_str(body),
-        from_email=from_email,
-        recipient_list=[to_email],
-        fail_silently=True,  # notificação não pode quebrar fluxo
-    )
+    try:
+        enqueue_email(to=to_email, subject=_safe_str(subject), body=_safe_str(body), kind="tracktime")
+    except Exception:
+        # notificação não pode quebrar fluxo
+        logger.exception("notify: email enqueue failed user_id=%s", user.id)
 
 
 def notify_tracktime_extended(*, entry, request_user=None) -> None:
@@ -253,10 +205,8 @@ def notify_tracktime_extended(*, entry, request_user=None) -> None:
     try:
         send_whatsapp(user=user, phone="", kind="extend_message", message=msg)
         send_whatsapp(user=user, phone="", kind="extend_url", message=track_url)
-    except PressTicketError:
-        logger.exception("notify: whatsapp extend failed (PressTicketError) entry_id=%s", getattr(entry, "id", None))
     except Exception:
-        logger.exception("notify: whatsapp extend failed (unexpected) entry_id=%s", getattr(entry, "id", None))
+        logger.exception("notify: whatsapp extend enqueue failed entry_id=%s", getattr(entry, "id", None))
 
     # Email: assunto + corpo + link
     subj = f"[NossoTrello] Track-time estendido (+1h) — {title}"
@@ -305,10 +255,8 @@ def notify_card_deadline(*, user, card, kind: str) -> None:
     try:
         send_whatsapp(user=user, phone="", kind=f"card_{kind}_message", message=msg)
         send_whatsapp(user=user, phone="", kind=f"card_{kind}_url", message=track_url)
-    except PressTicketError:
-        logger.exception("notify: whatsapp card deadline failed (PressTicketError) user_id=%s card_id=%s kind=%s", user.id, card.id, kind)
     except Exception:
-        logger.exception("notify: whatsapp card deadline failed (unexpected) user_id=%s card_id=%s kind=%s", user.id, card.id, kind)
+        logger.exception("notify: whatsapp card deadline enqueue failed user_id=%s card_id=%s kind=%s", user.id, card.id, kind)
 
     subj = f"[NossoTrello] {kind_label} — {title}"
     body = msg + "\nAbrir card (Track-time):\n" + track_url + "\n"
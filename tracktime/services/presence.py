@@ -0,0 +1,146 @@
+# tracktime/services/presence.py
+"""
+Presença do painel "Online" no Redis, não no banco.
+
+Cada ping era um update_or_create em TrackPresence (1 escrita no SQLite por
+aba aberta a cada poucos segundos). Com Redis (REDIS_URL): sorted set
+user_id -> timestamp do último ping + hash com tab/path; expira sozinho
+(PRESENCE_TTL_SECONDS). snapshot_to_db() grava o estado atual em
+TrackPresence (último visto durável, admin); o tracktime_tick chama no
+máximo a cada PRESENCE_SNAPSHOT_INTERVAL segundos.
+
+Sem Redis o cache é por processo (LocMem): web e tracktime_tick não veriam
+os mesmos pings, então ping/online voltam a usar TrackPresence direto (o
+comportamento antigo). Deploy com vários processos liga REDIS_REQUIRED.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import transaction
+
+from tracktime.models import TrackPresence
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_TTL_SECONDS = 9 * 60
+PRESENCE_SNAPSHOT_INTERVAL = 5 * 60
+
+_ZSET_KEY = "tracktime:presence"
+_INFO_KEY = "tracktime:presence:info"
+_SNAPSHOT_KEY = "tracktime:presence:snapshot"
+
+
+def _redis():
+    # `cache` é um proxy; o backend de verdade está em caches["default"]
+    if "django_redis" not in type(caches["default"]).__module__:
+        return None
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+    except Exception:
+        return None
+
+
+def _as_datetime(ts: float) -> datetime:
+    return datetime.fromtimestamp(float(ts), tz=dt_timezone.utc)
+
+
+def ping(user_id: int, *, tab: str = "", path: str = "", at: float | None = None) -> None:
+    ts = time.time() if at is None else float(at)
+    info = json.dumps({"tab": (tab or "")[:40], "path": (path or "")[:200]})
+
+    conn = _redis()
+    if conn is not None:
+        zkey, hkey = cache.make_key(_ZSET_KEY), cache.make_key(_INFO_KEY)
+        pipe = conn.pipeline()
+        pipe.zadd(zkey, {str(user_id): ts})
+        pipe.hset(hkey, str(user_id), info)
+        pipe.zremrangebyscore(zkey, "-inf", ts - PRESENCE_TTL_SECONDS)
+        pipe.expire(zkey, PRESENCE_TTL_SECONDS * 2)
+        pipe.expire(hkey, PRESENCE_TTL_SECONDS * 2)
+        pipe.execute()
+        return
+
+    # sem Redis: banco (cache local não é visto pelos outros processos)
+    TrackPresence.objects.update_or_create(
+        user_id=user_id,
+        defaults={"last_ping_at": _as_datetime(ts), "tab": (tab or "")[:40], "path": (path or "")[:200]},
+    )
+
+
+def online(*, within_seconds: int = PRESENCE_TTL_SECONDS) -> list[dict]:
+    """
+    Quem pingou nos últimos within_seconds, do mais recente p/ o mais antigo:
+    [{"user_id", "last_ping_at" (datetime), "tab", "path"}].
+    """
+    cutoff = time.time() - within_seconds
+
+    conn = _redis()
+    if conn is not None:
+        zkey, hkey = cache.make_key(_ZSET_KEY), cache.make_key(_INFO_KEY)
+        rows = conn.zrevrangebyscore(zkey, "+inf", cutoff, withscores=True)
+        if not rows:
+            return []
+        uids = [r[0].decode() if isinstance(r[0], bytes) else str(r[0]) for r in rows]
+        infos = conn.hmget(hkey, uids)
+        out = []
+        for uid, (_, score), raw in zip(uids, rows, infos):
+            try:
+                info = json.loads(raw) if raw else {}
+            except ValueError:
+                info = {}
+            out.append({
+                "user_id": int(uid),
+                "last_ping_at": _as_datetime(score),
+                "tab": info.get("tab", ""),
+                "path": info.get("path", ""),
+            })
+        return out
+
+    return [
+        {"user_id": p.user_id, "last_ping_at": p.last_ping_at, "tab": p.tab, "path": p.path}
+        for p in TrackPresence.objects.filter(last_ping_at__gte=_as_datetime(cutoff)).order_by("-last_ping_at")
+    ]
+
+
+def snapshot_to_db(*, force: bool = False) -> int:
+    """
+    Grava a presença do Redis em TrackPresence (1 upsert em lote). Sem force,
+    roda no máximo 1x por PRESENCE_SNAPSHOT_INTERVAL (entre todos os processos).
+    Retorna quantas linhas gravou.
+    """
+    if _redis() is None:
+        return 0  # sem Redis os pings já vão direto p/ TrackPresence
+
+    if not force and not cache.add(_SNAPSHOT_KEY, 1, timeout=PRESENCE_SNAPSHOT_INTERVAL):
+        return 0
+
+    rows = online()
+    if not rows:
+        return 0
+
+    # usuário pode ter sido apagado depois do ping
+    existing = set(
+        get_user_model().objects.filter(id__in=[r["user_id"] for r in rows]).values_list("id", flat=True)
+    )
+    rows = [r for r in rows if r["user_id"] in existing]
+
+    objs = [
+        TrackPresence(user_id=r["user_id"], last_ping_at=r["last_ping_at"], tab=r["tab"], path=r["path"])
+        for r in rows
+    ]
+    with transaction.atomic():
+        TrackPresence.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["last_ping_at", "tab", "path"],
+        )
+    return len(objs)
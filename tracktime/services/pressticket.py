@@ -1,17 +1,269 @@
 # tracktime/services/pressticket.py
+"""
+Cliente do PressTicket (WhatsApp).
+
+PressTicketClient mantém uma requests.Session com pool de conexões
+keep-alive (sem TCP/TLS novo por mensagem), envia lotes em paralelo
+(send_many, thread pool) e mede a latência de cada mensagem (metrics).
+Cada envio passa antes pelo limitador (boards/services/rate_limit.py,
+canal "whatsapp": balde global + por número).
+
+send_text_message() continua com a mesma assinatura/contrato de antes
+(levanta PressTicketError) e usa um cliente compartilhado por processo.
+"""
 from __future__ import annotations
 
 import json
 import logging
-from urllib import request, error
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TIMEOUT_SECONDS = 12
+DEFAULT_MAX_WORKERS = 4
+
 
 class PressTicketError(RuntimeError):
     pass
 
 
+def _send_url(base_url: str) -> str:
+    base = (base_url or "").rstrip("/")
+
+    # Aceita tanto BASE_URL = https://host quanto BASE_URL = https://host/api/messages/send
+    if base.endswith("/api/messages/send"):
+        return base
+    return base + "/api/messages/send"
+
+
+def _parse_response(raw: str) -> dict:
+    raw = (raw or "").strip()
+    if not raw:
+        return {}
+    try:
+        obj = json.loads(raw)
+    except Exception:
+        return {"raw": raw}
+
+    # PressTicket retorna sucesso dentro de "error" (sim, bizarro)
+    if isinstance(obj, dict) and isinstance(obj.get("error"), dict):
+        data = obj["error"].get("_data")
+        msg_id = None
+        if isinstance(data, dict):
+            _id = data.get("id")
+            if isinstance(_id, dict):
+                msg_id = _id.get("_serialized") or _id.get("id")
+        logger.info("pressticket: api ok msg_id=%r", msg_id)
+    return obj
+
+
+class PressTicketMetrics:
+    """Contadores + latências recentes (ms) das mensagens enviadas."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.sent = 0
+        self.failed = 0
+
+    def record(self, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            self._latencies.append(latency_ms)
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lat = sorted(self._latencies)
+            sent, failed = self.sent, self.failed
+
+        def pct(p):
+            if not lat:
+                return 0.0
+            return round(lat[min(len(lat) - 1, int(len(lat) * p))], 1)
+
+        return {
+            "sent": sent,
+            "failed": failed,
+            "avg_ms": round(sum(lat) / len(lat), 1) if lat else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(lat[-1], 1) if lat else 0.0,
+        }
+
+
+class PressTicketClient:
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        token: str,
+        user_id: int,
+        queue_id: int,
+        whatsapp_id: int,
+        timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        self.base_url = (base_url or "").strip()
+        self.token = (token or "").strip()
+        self.user_id = int(user_id or 0)
+        self.queue_id = int(queue_id or 0)
+        self.whatsapp_id = int(whatsapp_id or 0)
+        self.timeout_seconds = timeout_seconds
+        self.max_workers = max(1, int(max_workers or 1))
+        self.metrics = PressTicketMetrics()
+
+        self._session = requests.Session()
+        # 1 host só; o pool precisa comportar as threads do send_many
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+        })
+
+    @classmethod
+    def from_settings(cls, **overrides) -> "PressTicketClient":
+        return cls(**_config(**overrides))
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _validate(self, number: str) -> None:
+        if not self.token:
+            raise PressTicketError("PRESSTICKET_TOKEN vazio")
+        if not self.base_url:
+            raise PressTicketError("PRESSTICKET_BASE_URL vazio")
+        if not number or not number.isdigit():
+            raise PressTicketError("Número inválido (esperado somente dígitos, ex: 5521999999999)")
+        if not self.user_id or not self.queue_id or not self.whatsapp_id:
+            raise PressTicketError("IDs do PressTicket não configurados (user/queue/whatsapp)")
+
+    def send_text(self, *, number: str, body: str) -> dict:
+        """
+        Envia mensagem de texto. number: 55 + DDD + número (apenas dígitos).
+        Levanta PressTicketError em qualquer falha.
+        """
+        self._validate(number)
+
+        from boards.services.rate_limit import RateLimited, acquire, record_sent
+
+        try:
+            acquire("whatsapp", number)
+        except RateLimited as e:
+            raise PressTicketError(str(e)) from e
+
+        payload = {
+            "number": number,
+            "body": body,
+            "userId": self.user_id,
+            "queueId": self.queue_id,
+            "whatsappId": self.whatsapp_id,
+        }
+
+        started = time.monotonic()
+        ok = False
+        try:
+            try:
+                resp = self._session.post(
+                    _send_url(self.base_url),
+                    data=json.dumps(payload).encode("utf-8"),
+                    timeout=self.timeout_seconds,
+                )
+            except Exception as e:
+                raise PressTicketError(f"Falha ao enviar WhatsApp: {e}") from e
+
+            raw = resp.content.decode("utf-8", errors="replace")
+            if resp.status_code >= 400:
+                raise PressTicketError(f"HTTP {resp.status_code} ao enviar WhatsApp: {raw or resp.reason}")
+
+            result = _parse_response(raw)
+            ok = True
+            record_sent("whatsapp")
+            return result
+        finally:
+            latency_ms = (time.monotonic() - started) * 1000
+            self.metrics.record(latency_ms, ok)
+            logger.debug("pressticket: number=%r ok=%s latency_ms=%.1f", number, ok, latency_ms)
+
+    def send_many(self, messages: Iterable[tuple[str, str]]) -> list[dict | PressTicketError]:
+        """
+        Envia (number, body) em paralelo. Mensagens do mesmo número saem em
+        sequência, na ordem recebida (texto antes do link); se uma falha, as
+        seguintes daquele número nem saem (sem link órfão) e voltam com
+        PressTicketError também. Retorna, na ordem de entrada, a resposta ou
+        a PressTicketError de cada mensagem.
+        """
+        messages = list(messages)
+        results: list[dict | PressTicketError | None] = [None] * len(messages)
+
+        by_number: dict[str, list[int]] = {}
+        for idx, (number, _) in enumerate(messages):
+            by_number.setdefault(number, []).append(idx)
+
+        def run(indexes):
+            failed = None
+            for idx in indexes:
+                number, body = messages[idx]
+                if failed is not None:
+                    results[idx] = PressTicketError(f"Não enviada: mensagem anterior p/ o número falhou ({failed})")
+                    continue
+                try:
+                    results[idx] = self.send_text(number=number, body=body)
+                except PressTicketError as e:
+                    results[idx] = failed = e
+
+        groups = list(by_number.values())
+        if len(groups) <= 1 or self.max_workers == 1:
+            for g in groups:
+                run(g)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as pool:
+                list(pool.map(run, groups))
+        return results
+
+
+def _config(**overrides) -> dict:
+    from django.conf import settings
+
+    cfg = {
+        "base_url": getattr(settings, "PRESSTICKET_BASE_URL", ""),
+        "token": getattr(settings, "PRESSTICKET_TOKEN", ""),
+        "user_id": getattr(settings, "PRESSTICKET_USER_ID", 0),
+        "queue_id": getattr(settings, "PRESSTICKET_QUEUE_ID", 0),
+        "whatsapp_id": getattr(settings, "PRESSTICKET_WHATSAPP_ID", 0),
+        "timeout_seconds": DEFAULT_TIMEOUT_SECONDS,
+        "max_workers": getattr(settings, "PRESSTICKET_MAX_WORKERS", DEFAULT_MAX_WORKERS),
+    }
+    cfg.update(overrides)
+    return cfg
+
+
+_clients: dict[tuple, PressTicketClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(**overrides) -> PressTicketClient:
+    """Cliente compartilhado do processo (1 pool por configuração)."""
+    cfg = _config(**overrides)
+    key = tuple(sorted(cfg.items()))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = PressTicketClient(**cfg)
+        return client
+
+
 def send_text_message(
     *,
     base_url: str,
@@ -21,78 +273,18 @@ def send_text_message(
     user_id: int,
     queue_id: int,
     whatsapp_id: int,
-    timeout_seconds: int = 12,
+    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
 ) -> dict:
     """
     Envia mensagem de texto pelo PressTicket.
     number deve estar no formato: 55 + DDD + número (apenas dígitos).
     """
-    if not token:
-        raise PressTicketError("PRESSTICKET_TOKEN vazio")
-    if not base_url:
-        raise PressTicketError("PRESSTICKET_BASE_URL vazio")
-    if not number or not number.isdigit():
-        raise PressTicketError("Número inválido (esperado somente dígitos, ex: 5521999999999)")
-    if not user_id or not queue_id or not whatsapp_id:
-        raise PressTicketError("IDs do PressTicket não configurados (user/queue/whatsapp)")
-
-    base = (base_url or "").rstrip("/")
-
-    # Aceita tanto BASE_URL = https://host quanto BASE_URL = https://host/api/messages/send
-    if base.endswith("/api/messages/send"):
-        url = base
-    else:
-        url = base + "/api/messages/send"
-
-
-    payload = {
-        "number": number,
-        "body": body,
-        "userId": int(user_id),
-        "queueId": int(queue_id),
-        "whatsappId": int(whatsapp_id),
-    }
-
-    data = json.dumps(payload).encode("utf-8")
-
-    req = request.Request(
-        url=url,
-        data=data,
-        method="POST",
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        },
-
+    client = get_client(
+        base_url=base_url,
+        token=token,
+        user_id=user_id,
+        queue_id=queue_id,
+        whatsapp_id=whatsapp_id,
+        timeout_seconds=timeout_seconds,
     )
-
-    try:
-        with request.urlopen(req, timeout=timeout_seconds) as resp:
-            raw = resp.read().decode("utf-8", errors="replace").strip()
-            if not raw:
-                return {}
-            try:
-                obj = json.loads(raw)
-
-                # PressTicket retorna sucesso dentro de "error" (sim, bizarro)
-                if isinstance(obj, dict) and "error" in obj and isinstance(obj["error"], dict):
-                    data = obj["error"].get("_data") if isinstance(obj["error"], dict) else None
-                    msg_id = None
-                    if isinstance(data, dict):
-                        _id = data.get("id")
-                        if isinstance(_id, dict):
-                            msg_id = _id.get("_serialized") or _id.get("id")
-                    logger.warning("pressticket: api ok msg_id=%r", msg_id)
-                return obj
-
-            except Exception:
-                return {"raw": raw}
-    except error.HTTPError as e:
-        raw = ""
-        try:
-            raw = e.read().decode("utf-8", errors="replace")
-        except Exception:
-            pass
-        raise PressTicketError(f"HTTP {e.code} ao enviar WhatsApp: {raw or e.reason}") from e
-    except Exception as e:
-        raise PressTicketError(f"Falha ao enviar WhatsApp: {e}") from e
+    return client.send_text(number=number, body=body)
@@ -0,0 +1,97 @@
+# tracktime/services/reports.py
+"""
+Matrizes de semana/mês a partir de TimeEntryDailyRollup (1 query agregada
+no índice (user, date) — não varre TimeEntry).
+
+- user_matrix: linhas = projetos do usuário, colunas = dias
+- team_matrix: linhas = membros do Team, colunas = dias
+"""
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+
+from django.db.models import Sum
+
+from tracktime.models import TimeEntryDailyRollup
+
+
+def week_bounds(day: date) -> tuple[date, date]:
+    start = day - timedelta(days=day.weekday())  # segunda
+    return start, start + timedelta(days=6)
+
+
+def month_bounds(day: date) -> tuple[date, date]:
+    last = calendar.monthrange(day.year, day.month)[1]
+    return day.replace(day=1), day.replace(day=last)
+
+
+def _days(start: date, end: date) -> list[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _matrix(rows: dict, labels: dict, start: date, end: date) -> dict:
+    days = _days(start, end)
+    col = {d: i for i, d in enumerate(days)}
+
+    out_rows = []
+    totals = [0] * len(days)
+    for row_id, label in labels.items():
+        minutes = [0] * len(days)
+        for d, m in rows.get(row_id, {}).items():
+            minutes[col[d]] += m
+            totals[col[d]] += m
+        out_rows.append({"id": row_id, "label": label, "minutes": minutes, "total": sum(minutes)})
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": [d.isoformat() for d in days],
+        "rows": out_rows,
+        "totals": totals,
+        "total": sum(totals),
+    }
+
+
+def user_matrix(user, start: date, end: date) -> dict:
+    qs = (
+        TimeEntryDailyRollup.objects
+        .filter(user_id=user.id, date__gte=start, date__lte=end)
+        .values("project_id", "project__name", "date")
+        .annotate(total=Sum("minutes"))
+        .order_by()
+    )
+
+    rows: dict = {}
+    labels: dict = {}
+    for r in qs:
+        labels[r["project_id"]] = r["project__name"]
+        rows.setdefault(r["project_id"], {})[r["date"]] = r["total"]
+
+    labels = dict(sorted(labels.items(), key=lambda kv: (kv[1] or "").lower()))
+    return _matrix(rows, labels, start, end)
+
+
+def _user_label(user) -> str:
+    prof = getattr(user, "profile", None)
+    label = (getattr(prof, "display_name", "") or "").strip() if prof else ""
+    return label or (user.get_full_name() or "").strip() or (user.email or user.get_username())
+
+
+def team_matrix(team, start: date, end: date) -> dict:
+    members = list(team.members.select_related("profile"))
+    labels = dict(sorted(((u.id, _user_label(u)) for u in members), key=lambda kv: kv[1].lower()))
+
+    qs = (
+        TimeEntryDailyRollup.objects
+        .filter(user_id__in=list(labels), date__gte=start, date__lte=end)
+        .values("user_id", "date")
+        .annotate(total=Sum("minutes"))
+        .order_by()
+    )
+
+    rows: dict = {}
+    for r in qs:
+        rows.setdefault(r["user_id"], {})[r["date"]] = r["total"]
+
+    return _matrix(rows, labels, start, end)
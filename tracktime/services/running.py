@@ -0,0 +1,98 @@
+# tracktime/services/running.py
+"""
+Snapshot dos timers rodando, no cache, compartilhado pelos pollings
+(board_running, me_running_json, card_elapsed_json) — em vez de 1 query em
+TimeEntry (ended_at IS NULL) por chamada de cada aba aberta.
+
+1 chave com os timers indexados por board e por usuário; elapsed é sempre
+calculado na leitura (a partir de started_at). invalidate() roda após o
+commit de start/stop/auto-stop (inclusive no tracktime_tick, outro
+processo); RUNNING_TTL cobre o resto (admin, scripts).
+
+Só com Redis: num cache por processo (LocMem) a invalidação do tick não
+chegaria aos workers web. Sem Redis cada chamada lê direto do banco, só
+o usuário/board pedido (por usuário: índice parcial tt_entry_running_user_idx).
+"""
+from __future__ import annotations
+
+from django.core.cache import cache, caches
+from django.db import transaction
+
+from tracktime.models import TimeEntry
+
+RUNNING_TTL = 60
+_KEY = "tracktime:running:v1"
+
+
+def _user_name(user) -> str:
+    name = (getattr(user, "get_full_name", lambda: "")() or "").strip()
+    if not name:
+        name = (getattr(user, "email", "") or "Usuário").strip()
+    return name
+
+
+def _build(**filters) -> dict:
+    by_board: dict[int, list[dict]] = {}
+    by_user: dict[int, list[dict]] = {}
+
+    qs = (
+        TimeEntry.objects
+        .filter(ended_at__isnull=True, started_at__isnull=False, **filters)
+        .select_related("user")
+        .only(
+            "id", "user_id", "board_id", "card_id", "started_at", "created_at",
+            "user__email", "user__first_name", "user__last_name",
+        )
+        .order_by("-created_at")  # ordem que o board_running sempre devolveu
+    )
+    for e in qs:
+        item = {
+            "id": e.id,
+            "user_id": e.user_id,
+            "board_id": e.board_id,
+            "card_id": e.card_id,
+            "started_at": e.started_at,
+            "user": _user_name(e.user),
+        }
+        by_user.setdefault(e.user_id, []).append(item)
+        if e.board_id:
+            by_board.setdefault(e.board_id, []).append(item)
+
+    for items in by_user.values():
+        items.sort(key=lambda x: x["started_at"], reverse=True)
+
+    return {"by_board": by_board, "by_user": by_user}
+
+
+def _shared_cache() -> bool:
+    # `cache` é um proxy; o backend de verdade está em caches["default"]
+    return "django_redis" in type(caches["default"]).__module__
+
+
+def snapshot() -> dict:
+    if not _shared_cache():
+        return _build()
+
+    data = cache.get(_KEY)
+    if data is None:
+        data = _build()
+        cache.set(_KEY, data, timeout=RUNNING_TTL)
+    return data
+
+
+def for_board(board_id: int) -> list[dict]:
+    data = snapshot() if _shared_cache() else _build(board_id=int(board_id))
+    return data["by_board"].get(int(board_id), [])
+
+
+def for_user(user_id: int) -> list[dict]:
+    """Timers rodando do usuário, mais recente primeiro."""
+    data = snapshot() if _shared_cache() else _build(user_id=int(user_id))
+    return data["by_user"].get(int(user_id), [])
+
+
+def invalidate() -> None:
+    if not _shared_cache():
+        return
+    # depois do commit: antes disso outro request poderia recachear o estado velho
+    transaction.on_commit(lambda: cache.delete(_KEY))
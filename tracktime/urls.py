@@ -42,6 +42,10 @@ urlpatterns = [
     # Dados (JSON) para polling do “Ao vivo”
     path("live.json", views.tracktime_live_json, name="live_json"),
 
+    # Relatórios semana/mês (TimeEntryDailyRollup)
+    path("reports/week.json", views.tracktime_week_json, name="week_json"),
+    path("reports/month.json", views.tracktime_month_json, name="month_json"),
+
     # Painel de atividades fora do track-time 
     # Presença / Online
     path("modal/tab/online/", views.tracktime_tab_online, name="tab_online"),
@@ -7,20 +7,23 @@ from django.contrib.auth.decorators import login_required
 from django.urls import reverse
 from django.conf import settings
 from django.core.mail import send_mail
-from .models import Project, ActivityType, TimeEntry
-from boards.models import Card, Board, CardLog
+from .models import Project, ActivityType, Team, TimeEntry, TimeEntryDailyRollup
+from boards.models import Card, Board, CardAttachment, CardLog, Checklist
 import re
 from boards.models import UserProfile
-from tracktime.services.pressticket import send_text_message, PressTicketError
+from boards.services.outbox import enqueue_whatsapp
 import logging
 from django.db import IntegrityError, transaction
-from django.db.models import Max
+from django.db.models import Exists, F, Max, OuterRef
+from django.templatetags.static import static as static_url
 from django.views.decorators.http import require_http_methods
-from datetime import timedelta
+from datetime import date, timedelta
 from django.contrib.auth import get_user_model
 User = get_user_model()
-from .models import TrackPresence
+from tracktime.services import presence, reports
+from tracktime.services import running as running_timers
 from tracktime.services.notifications import notify_tracktime_extended
+from boards.services.board_access import visible_board_ids
 
 from boards.services.notifications import (
     get_board_recipients_for_card,
@@ -47,51 +50,11 @@ def _send_whatsapp_two_messages(*, number: str, message: str, url: str) -> None:
     if not number or not getattr(settings, "PRESSTICKET_TOKEN", "").strip():
         return
 
-    base_url = getattr(settings, "PRESSTICKET_BASE_URL", "https://api.atendimento.camim.com.br")
-    token = getattr(settings, "PRESSTICKET_TOKEN", "")
-    user_id = getattr(settings, "PRESSTICKET_USER_ID", 0)
-    queue_id = getattr(settings, "PRESSTICKET_QUEUE_ID", 0)
-    whatsapp_id = getattr(settings, "PRESSTICKET_WHATSAPP_ID", 0)
-
-    # 1) comunicado
+    # enfileira na outbox (na ordem: comunicado, depois link); envio é do run_outbox
     if message:
-        logger.warning(
-            "pressticket: sending kind=message number=%r base_url=%r user_id=%s queue_id=%s whatsapp_id=%s",
-            number, base_url, user_id, queue_id, whatsapp_id
-        )
-        resp = send_text_message(
-            base_url=base_url,
-            token=token,
-            number=number,
-            body=message,
-            user_id=user_id,
-            queue_id=queue_id,
-            whatsapp_id=whatsapp_id,
-        )
-        logger.warning(
-            "pressticket: sent ok kind=message number=%r resp_keys=%s",
-            number, list((resp or {}).keys())[:15]
-        )
-
-    # 2) link puro (sem texto)
+        enqueue_whatsapp(number=number, body=message, kind="tracktime_message")
     if url:
-        logger.warning(
-            "pressticket: sending kind=url number=%r base_url=%r user_id=%s queue_id=%s whatsapp_id=%s",
-            number, base_url, user_id, queue_id, whatsapp_id
-        )
-        resp = send_text_message(
-            base_url=base_url,
-            token=token,
-            number=number,
-            body=url,
-            user_id=user_id,
-            queue_id=queue_id,
-            whatsapp_id=whatsapp_id,
-        )
-        logger.warning(
-            "pressticket: sent ok kind=url number=%r resp_keys=%s",
-            number, list((resp or {}).keys())[:15]
-        )
+        enqueue_whatsapp(number=number, body=url, kind="tracktime_url")
 
 
 def _get_or_create_activity_type_for_user(*, user, name: str) -> ActivityType:
@@ -298,8 +261,21 @@ def card_tracktime_start(request, card_id):
         try:
             r.stop()
         except Exception:
-            # fallback duro: ao menos encerra
-            TimeEntry.objects.filter(pk=r.pk).update(ended_at=timezone.now())
+            logger.exception("[tracktime] stop() falhou entry=%s; encerrando pelo fallback", r.pk)
+            # fallback duro: encerra pela mesma regra do stop() e lança no rollup
+            # (senão semana/mês ficam sem esses minutos). stop() pode ter mexido
+            # na instância antes de falhar: relê do banco.
+            r.refresh_from_db(fields=["started_at", "ended_at"])
+            end = timezone.now()
+            extra = max(int((end - r.started_at).total_seconds() // 60), 1) if r.started_at else 0
+            closed = TimeEntry.objects.filter(pk=r.pk, ended_at__isnull=True).update(
+                ended_at=end,
+                started_at=None,
+                minutes=F("minutes") + extra,
+            )
+            if closed and extra:
+                r.ended_at = end
+                TimeEntryDailyRollup.add_for_entry(r, minutes=extra)
 
     now = timezone.now()
 
@@ -322,6 +298,7 @@ def card_tracktime_start(request, card_id):
 
     entry.set_confirmation_window(now=now)
     entry.save(update_fields=["confirm_due_at", "auto_stop_at"])
+    running_timers.invalidate()
 
         # ✅ WhatsApp (MVP): dispara mensagem no start, sem quebrar o track-time se falhar
        # ✅ WhatsApp no START (2 mensagens: comunicado + link puro)
@@ -369,6 +346,7 @@ def card_tracktime_stop(request, card_id):
 
     if entry:
         entry.stop()
+        running_timers.invalidate()
 
         card = None
         try:
@@ -454,7 +432,7 @@ def card_tracktime_manual(request, card_id):
 
     now = timezone.now()
 
-    TimeEntry.objects.create(
+    entry = TimeEntry.objects.create(
     user=request.user,
     project_id=project.id,
     activity_type_id=activity.id,
@@ -470,6 +448,7 @@ def card_tracktime_manual(request, card_id):
         + f"?card={card.id}"
     ),
 )
+    TimeEntryDailyRollup.add_for_entry(entry, minutes=entry.minutes)
 
 
     return card_tracktime_panel(request, card_id)
@@ -638,26 +617,15 @@ def board_running(request, board_id: int):
 
     now = timezone.now()
 
-    qs = (
-        TimeEntry.objects
-        .filter(board_id=board_id, ended_at__isnull=True)
-        .select_related("user")
-        .only("id", "card_id", "started_at", "user__email", "user__first_name", "user__last_name")
-    )
-
     cards = {}
-    for e in qs:
-        if not e.card_id or not e.started_at:
+    for e in running_timers.for_board(board_id):  # snapshot em cache (sem query em TimeEntry)
+        if not e["card_id"]:
             continue
 
-        elapsed = int((now - e.started_at).total_seconds())
-
-        name = (getattr(e.user, "get_full_name", lambda: "")() or "").strip()
-        if not name:
-            name = (getattr(e.user, "email", "") or "Usuário").strip()
+        elapsed = int((now - e["started_at"]).total_seconds())
 
-        cards.setdefault(str(e.card_id), []).append({
-            "user": name,
+        cards.setdefault(str(e["card_id"]), []).append({
+            "user": e["user"],
             "elapsed_seconds": elapsed,
         })
 
@@ -727,9 +695,8 @@ def tracktime_live_json(request):
     }
     """
     now = timezone.now()
-    from django.urls import reverse
 
-    qs = (
+    entries = list(
         TimeEntry.objects
         .filter(
             ended_at__isnull=True,
@@ -741,54 +708,55 @@ def tracktime_live_json(request):
         .order_by("-started_at")
     )
 
+    # Carrega tudo do lote de uma vez (nº fixo de queries, não por timer):
+    # boards vivos, cards (+ flags de checklist/anexo) e boards visíveis (cache)
+    visible = visible_board_ids(request.user)  # None = superuser (vê tudo)
+
+    live_board_ids = set(
+        Board.objects
+        .filter(id__in={e.board_id for e in entries})
+        .values_list("id", flat=True)
+    )
+
+    cards = {
+        c.id: c
+        for c in (
+            Card.objects
+            .filter(id__in={e.card_id for e in entries})
+            .select_related("column", "column__board")
+            .annotate(
+                live_has_checklist=Exists(Checklist.objects.filter(card_id=OuterRef("pk"))),
+                live_has_attachments=Exists(CardAttachment.objects.filter(card_id=OuterRef("pk"))),
+            )
+        )
+    }
+
+    def can_view(board_id):
+        return visible is None or board_id in visible
 
     by_board = {}
-    boards_cache = {}
 
-    for e in qs:
+    for e in entries:
         board_id = e.board_id
         card_id = e.card_id
 
         if not board_id or not card_id:
             continue
 
-        # cache board + permissão (barato)
-        if board_id not in boards_cache:
-            try:
-                b = Board.objects.get(id=board_id)
-            except Board.DoesNotExist:
-                boards_cache[board_id] = None
-            else:
-                boards_cache[board_id] = b
-
-        board = boards_cache.get(board_id)
-        if not board:
-            continue
-        if not _can_view_board(request.user, board):
+        if board_id not in live_board_ids or not can_view(board_id):
             continue
 
-        # ✅ pega o card aqui (sem isso dá 500)
-        try:
-            card = (
-                Card.objects
-                .select_related("column", "column__board")
-                .prefetch_related("checklists", "attachments")
-                .get(id=card_id)
-            )
-        except Card.DoesNotExist:
+        card = cards.get(card_id)
+        if card is None:
             continue
 
-        # por segurança: board real do card (não confia só no cache)
+        # por segurança: board real do card (não confia só no board_id do lançamento)
         board = card.column.board
-        if not _can_view_board(request.user, board):
+        if not can_view(board.id):
             continue
 
         elapsed = int((now - e.started_at).total_seconds())
 
-        name = (getattr(e.user, "get_full_name", lambda: "")() or "").strip()
-        if not name:
-            name = (getattr(e.user, "email", "") or "Usuário").strip()
-
         board_key = str(board.id)
 
         by_board.setdefault(board_key, {
@@ -812,7 +780,6 @@ def tracktime_live_json(request):
                 card_cover = cover_field.url
             except Exception:
                 card_cover = None
-        from django.templatetags.static import static as static_url
 
         profile = getattr(e.user, "profile", None)
 
@@ -851,8 +818,8 @@ def tracktime_live_json(request):
             "card_description": card_description,
             "started_at": e.started_at.isoformat(),
 
-            "has_checklist": card.checklists.exists(),
-            "has_attachments": card.attachments.exists(),
+            "has_checklist": card.live_has_checklist,
+            "has_attachments": card.live_has_attachments,
 
             # ✅ usuário completo
             "user": user_display,
@@ -886,23 +853,57 @@ def tracktime_tab_month(request):
     return render(request, "tracktime/modal/tabs/month.html", {})
 
 
+def _report_json(request, *, period: str):
+    """
+    Matriz semana/mês (TimeEntryDailyRollup).
+    ?date=YYYY-MM-DD (semana do dia) | ?month=YYYY-MM ; ?team=<id> p/ o time.
+    """
+    today = timezone.localdate()
+    try:
+        if period == "week":
+            raw = (request.GET.get("date") or "").strip()
+            day = date.fromisoformat(raw) if raw else today
+            start, end = reports.week_bounds(day)
+        else:
+            raw = (request.GET.get("month") or "").strip()
+            day = date.fromisoformat(f"{raw}-01") if raw else today
+            start, end = reports.month_bounds(day)
+    except ValueError:
+        return HttpResponseBadRequest("Data inválida")
+
+    team_id = (request.GET.get("team") or "").strip()
+    if team_id:
+        team = get_object_or_404(Team, pk=team_id, is_active=True)
+        if not request.user.is_superuser and not team.members.filter(pk=request.user.pk).exists():
+            return HttpResponseForbidden("Sem acesso a este time")
+        data = reports.team_matrix(team, start, end)
+        data.update({"scope": "team", "team_id": team.id, "team_name": team.name})
+    else:
+        data = reports.user_matrix(request.user, start, end)
+        data.update({"scope": "user", "user_id": request.user.id})
+
+    data["period"] = period
+    return JsonResponse(data)
+
+
+@login_required
+def tracktime_week_json(request):
+    return _report_json(request, period="week")
+
+
+@login_required
+def tracktime_month_json(request):
+    return _report_json(request, period="month")
+
+
 @login_required
 def me_running_json(request):
     """
     Retorna o card/board do timer rodando do usuário logado (se existir).
     """
-    e = (
-        TimeEntry.objects
-        .filter(
-            user=request.user,
-            ended_at__isnull=True,
-            board_id__isnull=False,
-            card_id__isnull=False,
-            started_at__isnull=False,
-        )
-        .order_by("-started_at")
-        .only("board_id", "card_id", "started_at")
-        .first()
+    e = next(
+        (x for x in running_timers.for_user(request.user.id) if x["board_id"] and x["card_id"]),
+        None,
     )
 
     if not e:
@@ -910,8 +911,8 @@ def me_running_json(request):
 
     return JsonResponse({
         "running": True,
-        "board_id": int(e.board_id),
-        "card_id": int(e.card_id),
+        "board_id": int(e["board_id"]),
+        "card_id": int(e["card_id"]),
         "ts": timezone.now().isoformat(),
     })
 
@@ -965,18 +966,13 @@ def card_elapsed_json(request, card_id: int):
     """
     now = timezone.now()
 
-    running = (
-        TimeEntry.objects
-        .filter(user=request.user, ended_at__isnull=True, started_at__isnull=False)
-        .order_by("-started_at")
-        .first()
-    )
-
-    if not running:
+    entries = running_timers.for_user(request.user.id)
+    if not entries:
         return JsonResponse({"running": False, "reason": "no_running"})
+    current = entries[0]
 
     # se está rodando mas em outro card, avisa
-    running_card_id = int(running.card_id or 0)
+    running_card_id = int(current["card_id"] or 0)
     if running_card_id != int(card_id):
         return JsonResponse({
             "running": True,
@@ -985,8 +981,8 @@ def card_elapsed_json(request, card_id: int):
             "reason": "running_other_card",
         })
 
-    elapsed_seconds = int((now - running.started_at).total_seconds())
-    started_local = timezone.localtime(running.started_at)
+    elapsed_seconds = int((now - current["started_at"]).total_seconds())
+    started_local = timezone.localtime(current["started_at"])
     started_hhmm = started_local.strftime("%H:%M")
 
     return JsonResponse({
@@ -1104,10 +1100,8 @@ def tracktime_presence_ping(request):
     path = (request.POST.get("path") or "").strip()[:200]
 
     now = timezone.now()
-    TrackPresence.objects.update_or_create(
-        user=request.user,
-        defaults={"last_ping_at": now, "tab": tab, "path": path},
-    )
+    # cache (Redis), não banco: o tracktime_tick faz snapshot em TrackPresence
+    presence.ping(request.user.id, tab=tab, path=path, at=now.timestamp())
     return JsonResponse({"ok": True, "ts": now.isoformat()})
 
 
@@ -1135,18 +1129,14 @@ def tracktime_online_json(request):
     now = timezone.now()
 
     # Quem "pode aparecer" no painel (presença recente)
-    presence_after = now - timedelta(minutes=9)
-    presences = (
-        TrackPresence.objects
-        .filter(last_ping_at__gte=presence_after)
-        .select_related("user", "user__profile")
-        .order_by("-last_ping_at")
-    )
+    presences = presence.online(within_seconds=9 * 60)  # mais recente primeiro
 
-    user_ids = list(presences.values_list("user_id", flat=True))
+    user_ids = [p["user_id"] for p in presences]
     if not user_ids:
         return JsonResponse({"ts": now.isoformat(), "items": []})
 
+    users_by_id = User.objects.select_related("profile").in_bulk(user_ids)
+
     # 1) Timers rodando => sempre "ativo" (independente de 9 min)
     running_qs = (
         TimeEntry.objects
@@ -1217,7 +1207,9 @@ def tracktime_online_json(request):
     items = []
 
     for p in presences:
-        u = p.user
+        u = users_by_id.get(p["user_id"])
+        if u is None:
+            continue
         prof = getattr(u, "profile", None)
 
         display = (getattr(u, "get_full_name", lambda: "")() or "").strip()
@@ -1277,7 +1269,7 @@ def tracktime_online_json(request):
             "user_id": u.id,
             "user": display,
             "handle": handle,
-            "last_ping_at": p.last_ping_at.isoformat(),
+            "last_ping_at": p["last_ping_at"].isoformat(),
             "activities": activities[:20],
             "last_activity_at": last_activity_at,
         })